@@ -0,0 +1,76 @@
+"""
+Recall@k versus latency for the index types in fomc_dashboard.modules.index_factory.
+
+Builds every index type over the same synthetic, clustered corpus, sweeps the
+search parameter of each approximate index (nprobe for IVF, efSearch for HNSW)
+and compares it against the exact flat index.
+
+Usage:
+    python benchmarks/ann_comparison.py [--size 100000] [--queries 500] [--k 5] [--json out.json]
+"""
+import json
+import sys
+import time
+
+from common import clustered_vectors, percentile_ms, recall_at_k, time_single_queries
+
+from fomc_dashboard.modules.index_factory import apply_search_params, build_index, make_index_config
+
+SWEEPS = {
+    "flat": [{}],
+    "hnsw": [{"ef_search": ef} for ef in (16, 32, 64, 128, 256)],
+    "ivf_flat": [{"nprobe": nprobe} for nprobe in (1, 4, 16, 64)],
+    "ivf_pq": [{"nprobe": nprobe} for nprobe in (1, 4, 16, 64)],
+}
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def run(size, n_queries, k):
+    corpus = clustered_vectors(size, seed=0)
+    # Queries come from the same distribution as the corpus but are not in it
+    queries = clustered_vectors(size + n_queries, seed=0)[size:]
+
+    rows = []
+    truth = None
+    for index_type, sweep in SWEEPS.items():
+        config = make_index_config(index_type)
+        start = time.perf_counter()
+        index = build_index(config, training_vectors=corpus)
+        index.add(corpus)
+        build_seconds = time.perf_counter() - start
+
+        for search_params in sweep:
+            config.update(search_params)
+            apply_search_params(index, config)
+            found, latencies = time_single_queries(index, queries, k)
+            if truth is None:
+                truth = found  # The flat index runs first and is exact
+            rows.append({
+                "index_type": index_type,
+                **search_params,
+                "build_s": round(build_seconds, 3),
+                f"recall@{k}": round(recall_at_k(found, truth, k), 4),
+                "p50_ms": round(percentile_ms(latencies, 50), 3),
+                "p95_ms": round(percentile_ms(latencies, 95), 3),
+            })
+    return rows
+
+
+def main():
+    size = _arg("--size", 100_000)
+    rows = run(size, _arg("--queries", 500), _arg("--k", 5))
+
+    print(f"Corpus size: {size}")
+    for row in rows:
+        print("  ".join(f"{key}={value}" for key, value in row.items()))
+
+    if "--json" in sys.argv:
+        with open(_arg("--json", None, str), "w", encoding="utf-8") as f:
+            json.dump({"size": size, "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Throughput and connection use of the pooled Azure OpenAI helpers, against the
+local stand-in endpoint (fake_openai_server.py).
+
+Compares:
+
+- per_rerun: a new AzureOpenAI client per question, as the app did on every
+  Streamlit rerun (one new connection each time)
+- pooled_threads: AzureOpenAIHelper.get_response from many threads (one
+  shared client and connection pool per API key)
+- async: AzureOpenAIHelper.aget_response from asyncio tasks on one event loop
+
+Usage:
+    python benchmarks/chat_concurrency.py [--requests 200] [--users 32] [--max-concurrency 16] [--latency 0.2]
+"""
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fake_openai_server import FakeOpenAIServer
+
+import common  # noqa: F401  Puts the project root on sys.path
+
+from fomc_dashboard.modules.ai_responder import AzureOpenAIHelper
+
+INSTRUCTION = "You are an assistant providing insights on FOMC meetings."
+QUESTION = "What did the Committee decide about the federal funds rate?"
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def per_rerun(server, n_requests, users):
+    from openai import AzureOpenAI
+
+    def ask(_):
+        client = AzureOpenAI(azure_endpoint=server.url, api_version=AzureOpenAIHelper.API_VERSION, api_key="bench")
+        client.chat.completions.create(model=AzureOpenAIHelper.DEFAULT_MODEL, messages=[
+            {"role": "system", "content": INSTRUCTION}, {"role": "user", "content": QUESTION}
+        ])
+        client.close()
+
+    with ThreadPoolExecutor(users) as pool:
+        list(pool.map(ask, range(n_requests)))
+
+
+def pooled_threads(server, n_requests, users, max_concurrency):
+    helper = AzureOpenAIHelper("bench-threads", endpoint=server.url, max_concurrency=max_concurrency)
+    with ThreadPoolExecutor(users) as pool:
+        list(pool.map(lambda _: helper.get_response(QUESTION, INSTRUCTION), range(n_requests)))
+
+
+def pooled_async(server, n_requests, max_concurrency):
+    async def main():
+        helper = AzureOpenAIHelper("bench-async", endpoint=server.url, max_concurrency=max_concurrency)
+        await asyncio.gather(*(helper.aget_response(QUESTION, INSTRUCTION) for _ in range(n_requests)))
+
+    asyncio.run(main())
+
+
+def main():
+    n_requests, users = _arg("--requests", 200), _arg("--users", 32)
+    max_concurrency = _arg("--max-concurrency", 16)
+    server = FakeOpenAIServer(latency=_arg("--latency", 0.2, float)).start()
+
+    cases = {
+        "per_rerun": lambda: per_rerun(server, n_requests, users),
+        "pooled_threads": lambda: pooled_threads(server, n_requests, users, max_concurrency),
+        "async": lambda: pooled_async(server, n_requests, max_concurrency),
+    }
+    rows = []
+    for name, case in cases.items():
+        server.reset_stats()
+        start = time.perf_counter()
+        case()
+        seconds = time.perf_counter() - start
+        rows.append({
+            "case": name,
+            "requests": server.stats["requests"],
+            "requests_per_s": round(n_requests / seconds, 1),
+            "connections": server.stats["connections"],
+            "max_in_flight": server.stats["max_in_flight"],
+        })
+    server.stop()
+
+    for row in rows:
+        print("  ".join(f"{key}={value}" for key, value in row.items()))
+    if "--json" in sys.argv:
+        with open(_arg("--json", None, str), "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
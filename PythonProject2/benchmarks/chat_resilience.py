@@ -0,0 +1,112 @@
+"""
+Behaviour of AzureOpenAIHelper's rate limiting, retries and hedging under
+injected faults, against the local stand-in endpoint (fake_openai_server.py).
+
+Each scenario sends the same questions from many threads, with and without
+the feature meant to handle the fault:
+
+- throttled: a share of requests gets a 429 with Retry-After (retries vs none)
+- quota: the endpoint enforces a requests-per-minute quota (client-side rate
+  limiter vs retrying after 429s)
+- spikes: a share of requests takes seconds to answer (hedging vs none)
+- disconnects: a share of connections is dropped without a response (retries vs none)
+
+For each run it reports answered / failed questions, latency percentiles and
+what the endpoint saw (requests, 429s sent, connections dropped). The helpers
+get more concurrency slots than there are users, since hedges are only sent
+from spare slots.
+
+Usage:
+    python benchmarks/chat_resilience.py [--requests 200] [--users 16] [--max-concurrency 32] [--latency 0.1]
+        [--quota-rpm 600] [--json out.json]
+"""
+import contextlib
+import io
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from fake_openai_server import FakeOpenAIServer
+
+from common import percentile_ms
+
+from fomc_dashboard.modules.ai_responder import AzureOpenAIHelper
+
+INSTRUCTION = "You are an assistant providing insights on FOMC meetings."
+QUESTION = "What did the Committee decide about the federal funds rate?"
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def scenarios(latency, quota_rpm):
+    """(scenario, variant, server options, helper options) for every run."""
+    throttled = {"throttle_rate": 0.2, "retry_after": 0.2}
+    quota = {"requests_per_minute": quota_rpm}
+    spikes = {"spike_rate": 0.05, "spike_latency": 2.0}
+    disconnects = {"disconnect_rate": 0.1}
+    return [
+        ("throttled", "no_retry", throttled, {"max_retries": 0}),
+        ("throttled", "retry", throttled, {}),
+        ("quota", "retry_only", quota, {}),
+        ("quota", "rate_limited", quota, {"requests_per_minute": quota_rpm}),
+        ("spikes", "no_hedge", spikes, {}),
+        ("spikes", "hedged", spikes, {"hedge_after": latency * 4}),
+        ("disconnects", "no_retry", disconnects, {"max_retries": 0}),
+        ("disconnects", "retry", disconnects, {}),
+    ]
+
+
+def run(server, helper, n_requests, users):
+    def ask(_):
+        start = time.perf_counter()
+        answer = helper.get_response(QUESTION, INSTRUCTION)
+        return answer is not None, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # Error lines of the variants without retries
+        with ThreadPoolExecutor(users) as pool:
+            outcomes = list(pool.map(ask, range(n_requests)))
+    seconds = time.perf_counter() - start
+
+    latencies = np.array([latency for ok, latency in outcomes if ok])
+    answered = len(latencies)
+    return {
+        "answered": answered,
+        "failed": n_requests - answered,
+        "p50_ms": round(percentile_ms(latencies, 50), 1) if answered else None,
+        "p95_ms": round(percentile_ms(latencies, 95), 1) if answered else None,
+        "p99_ms": round(percentile_ms(latencies, 99), 1) if answered else None,
+        "seconds": round(seconds, 2),
+        "server_requests": server.stats["requests"],
+        "throttled": server.stats["throttled"],
+        "disconnects": server.stats["disconnects"],
+    }
+
+
+def main():
+    n_requests, users = _arg("--requests", 200), _arg("--users", 16)
+    max_concurrency = _arg("--max-concurrency", 32)
+    latency = _arg("--latency", 0.1, float)
+
+    rows = []
+    for i, (scenario, variant, faults, options) in enumerate(scenarios(latency, _arg("--quota-rpm", 600, float))):
+        server = FakeOpenAIServer(latency=latency, **faults).start()
+        # A separate key per run, so that runs do not share a client pool or rate limiter
+        helper = AzureOpenAIHelper(f"bench-resilience-{i}", endpoint=server.url, max_concurrency=max_concurrency,
+                                   **options)
+        row = {"scenario": scenario, "variant": variant, **run(server, helper, n_requests, users)}
+        server.stop()
+        print("  ".join(f"{key}={value}" for key, value in row.items()), flush=True)
+        rows.append(row)
+
+    if "--json" in sys.argv:
+        with open(_arg("--json", None, str), "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
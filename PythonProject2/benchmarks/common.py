@@ -0,0 +1,57 @@
+"""Shared helpers for the benchmark scripts."""
+import os
+import sys
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def clustered_vectors(n, dimension=384, n_clusters=None, seed=0):
+    """
+    Generate unit-length vectors grouped around random centroids.
+
+    Sentence embeddings of a topical corpus are clustered rather than uniform,
+    which is what makes IVF/HNSW recall realistic; uniform noise would make
+    every approximate index look worse than it is.
+    """
+    rng = np.random.default_rng(seed)
+    n_clusters = n_clusters or max(1, int(np.sqrt(n)))
+    centroids = rng.standard_normal((n_clusters, dimension)).astype("float32")
+    assignments = rng.integers(0, n_clusters, size=n)
+    vectors = centroids[assignments] + 0.35 * rng.standard_normal((n, dimension)).astype("float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.ascontiguousarray(vectors, dtype="float32")
+
+
+def recall_at_k(found, truth, k):
+    """Average fraction of the true top-k neighbours present in the found top-k."""
+    hits = 0
+    for found_row, truth_row in zip(found[:, :k], truth[:, :k]):
+        hits += len(set(found_row.tolist()) & set(truth_row.tolist()))
+    return hits / (len(truth) * k)
+
+
+def time_single_queries(index, queries, k):
+    """
+    Search queries one at a time, as the chat UI does.
+
+    Returns:
+        tuple: (indices array, per-query latencies in seconds)
+    """
+    latencies = []
+    found = []
+    for query in queries:
+        start = time.perf_counter()
+        _, indices = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - start)
+        found.append(indices[0])
+    return np.array(found), np.array(latencies)
+
+
+def percentile_ms(latencies, q):
+    """Latency percentile in milliseconds."""
+    return float(np.percentile(latencies, q) * 1000)
@@ -0,0 +1,184 @@
+"""
+Document downloader (data_fetcher.sync_documents) against a local stand-in
+for the Fed's file server.
+
+The stand-in serves --documents PDFs of --size bytes with ETag and
+Last-Modified, answers conditional requests with 304, returns 404 for every
+tenth URL (dates with no minutes) and adds --latency seconds to each request.
+Half of the URLs go through 127.0.0.1 and half through localhost, so the
+crawl sees two hosts. Runs:
+
+- sequential: one download at a time, as a plain loop would
+- cold: full sync into an empty cache
+- refresh: same URLs again; everything should be a 304 with no body
+- changed: two documents change on the server; only they are downloaded
+- interrupted: the server starts failing after a third of the documents
+- resumed: the crawl is run again; only the URLs the interrupted crawl did
+  not settle are requested
+
+Each row reports the sync's counts, the requests and body bytes the server
+sent, and the most connections it saw at once per host (at most --per-host).
+
+Usage:
+    python benchmarks/document_sync.py [--documents 200] [--size 200000] [--latency 0.05] [--workers 16]
+        [--per-host 4] [--json out.json]
+"""
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import common  # noqa: F401
+
+from fomc_dashboard.modules.data_fetcher import make_session, sync_documents
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+class FakeDocumentServer:
+    """Threaded HTTP server holding in-memory documents, with request and concurrency counters."""
+
+    def __init__(self, documents, latency=0.0):
+        self.documents = {}  # path -> (body, etag, last modified)
+        for path, body in documents.items():
+            self.update(path, body)
+        self.latency = latency
+        self.fail_after = None  # Serve this many more bodies, then answer 503
+        self._lock = threading.Lock()
+        self.reset()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                host = self.headers.get("Host", "").split(":")[0]
+                with server._lock:
+                    server.stats["requests"] += 1
+                    server._active[host] = server._active.get(host, 0) + 1
+                    server.stats["max_active"][host] = max(server.stats["max_active"].get(host, 0),
+                                                           server._active[host])
+                try:
+                    time.sleep(server.latency)
+                    server.respond(self)
+                finally:
+                    with server._lock:
+                        server._active[host] -= 1
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+    def reset(self):
+        self.stats = {"requests": 0, "ok": 0, "not_modified": 0, "not_found": 0, "errors": 0, "bytes": 0,
+                      "max_active": {}}
+        self._active = {}
+
+    def update(self, path, body):
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        self.documents[path] = (body, etag, formatdate(time.time(), usegmt=True))
+
+    def respond(self, handler):
+        document = self.documents.get(handler.path)
+        if document is None:
+            self._send(handler, 404, "not_found")
+            return
+        body, etag, last_modified = document
+        if handler.headers.get("If-None-Match") == etag:
+            self._send(handler, 304, "not_modified", headers={"ETag": etag})
+            return
+        with self._lock:
+            failing = self.fail_after is not None and self.fail_after <= 0
+            if self.fail_after is not None:
+                self.fail_after -= 1
+        if failing:
+            self._send(handler, 503, "errors")
+            return
+        self._send(handler, 200, "ok", body, {"ETag": etag, "Last-Modified": last_modified,
+                                              "Content-Type": "application/pdf"})
+
+    def _send(self, handler, status, counter, body=b"", headers=None):
+        with self._lock:
+            self.stats[counter] += 1
+            self.stats["bytes"] += len(body)
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        if status != 304:
+            handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    n_documents, size = _arg("--documents", 200), _arg("--size", 200_000)
+    workers, per_host = _arg("--workers", 16), _arg("--per-host", 4)
+
+    paths = [f"/monetarypolicy/files/fomcminutes{2000 + i // 8}{1 + i % 8:02d}15.pdf" for i in range(n_documents)]
+    server = FakeDocumentServer({path: os.urandom(size) for i, path in enumerate(paths) if i % 10 != 9},
+                                latency=_arg("--latency", 0.05, float)).start()
+    urls = [f"http://{'127.0.0.1' if i % 2 else 'localhost'}:{server.port}{path}" for i, path in enumerate(paths)]
+
+    def change_two():
+        for path in paths[:2]:
+            server.update(path, os.urandom(size))
+
+    def interrupt():
+        server.fail_after = len(urls) // 3
+
+    def restore():
+        server.fail_after = None
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        cache_dir = os.path.join(directory, "cache")
+        runs = [
+            ("sequential", os.path.join(directory, "sequential"), {"max_workers": 1}, None),
+            ("cold", cache_dir, {}, None),
+            ("refresh", cache_dir, {}, None),
+            ("changed", cache_dir, {}, change_two),
+            ("interrupted", os.path.join(directory, "resumable"), {"session": make_session(workers, retries=0)},
+             interrupt),
+            ("resumed", os.path.join(directory, "resumable"), {}, restore),
+        ]
+        for name, path, options, before in runs:
+            if before:
+                before()
+            server.reset()
+            with contextlib.redirect_stdout(io.StringIO()):  # Error lines of the interrupted crawl
+                stats = sync_documents(urls, path, **{"max_workers": workers, "per_host": per_host, **options})
+            row = {"run": name, **stats, "server_requests": server.stats["requests"],
+                   "server_bytes": server.stats["bytes"],
+                   "max_per_host": max(server.stats["max_active"].values(), default=0)}
+            print("  ".join(f"{key}={value}" for key, value in row.items()), flush=True)
+            rows.append(row)
+    server.stop()
+
+    if "--json" in sys.argv:
+        with open(_arg("--json", None, str), "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Chunks/s of bulk encoding with 1..N worker processes (fomc_dashboard.modules.encoding_pool).
+
+Encodes the same synthetic chunks in this process (the single-process
+baseline) and then with pools of increasing size. Model loading is excluded:
+every pool is warmed up before it is timed.
+
+Usage:
+    python benchmarks/encoding_scaling.py [--chunks 4096] [--max-workers 8] [--json out.json]
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import common  # noqa: F401  Puts the project root on sys.path
+
+from fomc_dashboard.modules.encoding_pool import EncodingPool
+from fomc_dashboard.modules.sentence_transformer import get_model
+
+SENTENCES = (
+    "The Committee decided to raise the target range for the federal funds rate by 25 basis points.",
+    "Participants noted that inflation remained elevated and well above the 2 percent objective.",
+    "The Desk will continue reducing the System Open Market Account holdings of Treasury securities.",
+    "Labor market conditions remained tight, although job gains had moderated in recent months.",
+    "Several participants judged that risks to the outlook for economic activity were skewed to the downside.",
+)
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def synthetic_chunks(n, seed=0):
+    """Chunks of about 150 words assembled from minutes-like sentences."""
+    rng = np.random.default_rng(seed)
+    return [" ".join(rng.choice(SENTENCES, size=9)) for _ in range(n)]
+
+
+def main():
+    chunks = synthetic_chunks(_arg("--chunks", 4096))
+    max_workers = _arg("--max-workers", os.cpu_count() or 1)
+
+    model = get_model()
+    model.encode(chunks[:64])
+    start = time.perf_counter()
+    model.encode(chunks)
+    baseline = len(chunks) / (time.perf_counter() - start)
+    rows = [{"workers": "in-process", "chunks_per_s": round(baseline, 1), "speedup": 1.0}]
+
+    # 1, 2, 4, ... and max_workers itself
+    counts = [1]
+    while counts[-1] * 2 < max_workers:
+        counts.append(counts[-1] * 2)
+    if max_workers > 1:
+        counts.append(max_workers)
+
+    for workers in counts:
+        with EncodingPool(workers) as pool:
+            pool.warm_up()
+            start = time.perf_counter()
+            pool.encode(chunks)
+            rate = len(chunks) / (time.perf_counter() - start)
+        rows.append({"workers": workers, "chunks_per_s": round(rate, 1), "speedup": round(rate / baseline, 2)})
+
+    for row in rows:
+        print("  ".join(f"{key}={value}" for key, value in row.items()))
+
+    if "--json" in sys.argv:
+        with open(_arg("--json", None, str), "w", encoding="utf-8") as f:
+            json.dump({"chunks": len(chunks), "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
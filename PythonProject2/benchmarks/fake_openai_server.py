@@ -0,0 +1,295 @@
+"""
+Local stand-in for the Azure OpenAI chat-completions endpoint.
+
+Answers POST /openai/deployments/<model>/chat/completions like the real
+service, after a configurable delay (streamed word by word as server-sent
+events when the request asks for ``stream``, after a first chunk holding only
+the prompt's content-filter results as Azure sends it, and followed by a usage
+chunk when it asks for ``stream_options.include_usage``), and counts what it sees: requests, the
+most requests in flight at once and the TCP connections opened (so connection
+reuse by the client is visible). GET /stats returns the counters as JSON.
+
+Faults can be injected to exercise the client's retries, rate limiting and
+hedging: a requests-per-minute quota (a token bucket holding 10 seconds' worth
+of requests, answering 429 with Retry-After when empty), random 429s, latency
+spikes and connections dropped without a response. Subclasses overriding
+fault() can also cut a stream off after a number of words.
+
+Point the helpers at it with ``AzureOpenAIHelper(api_key, endpoint=server.url)``
+or the AZURE_OPENAI_ENDPOINT environment variable.
+
+Usage:
+    python benchmarks/fake_openai_server.py [--port 8765] [--latency 0.2] [--token-delay 0.02] [--rpm 600]
+        [--throttle-rate 0.1] [--spike-rate 0.05] [--spike-latency 3] [--disconnect-rate 0.05]
+"""
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering chat-completion requests with a canned reply."""
+
+    daemon_threads = True
+
+    QUOTA_WINDOW = 10.0  # Seconds of quota that may be used in one burst
+
+    def __init__(self, port=0, latency=0.2, reply="The Committee kept the target range unchanged.",
+                 token_delay=0.02, requests_per_minute=None, throttle_rate=0.0, retry_after=1.0, spike_rate=0.0,
+                 spike_latency=3.0, disconnect_rate=0.0, stream_usage=True, seed=0):
+        """
+        Args:
+            port (int, optional): Port to listen on; 0 picks a free one. Defaults to 0.
+            latency (float, optional): Seconds to wait before answering (or before the
+                first token when streaming). Defaults to 0.2.
+            reply (str, optional): Content of every answer.
+            token_delay (float, optional): Seconds between streamed words. Defaults to 0.02.
+            requests_per_minute (float, optional): Quota; requests over it get a 429. No quota if None.
+            throttle_rate (float, optional): Fraction of requests answered with a 429 regardless of quota.
+            retry_after (float, optional): Retry-After of those random 429s, in seconds. Defaults to 1.0.
+            spike_rate (float, optional): Fraction of requests answered after ``spike_latency`` instead.
+            spike_latency (float, optional): Seconds a latency spike lasts. Defaults to 3.0.
+            disconnect_rate (float, optional): Fraction of requests whose connection is closed unanswered.
+            stream_usage (bool, optional): Honor stream_options.include_usage; False acts like an
+                API version without it. Defaults to True.
+            seed (int, optional): Seed of the fault injection. Defaults to 0.
+        """
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.reply = reply
+        self.token_delay = token_delay
+        self.requests_per_minute = requests_per_minute
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.spike_rate = spike_rate
+        self.spike_latency = spike_latency
+        self.disconnect_rate = disconnect_rate
+        self.stream_usage = stream_usage
+        self.stats = {"requests": 0, "connections": 0, "in_flight": 0, "max_in_flight": 0, "throttled": 0,
+                      "spikes": 0, "disconnects": 0}
+        self._stats_lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._quota = (requests_per_minute or 0) / 60 * self.QUOTA_WINDOW  # Requests left in the bucket
+        self._quota_updated = time.monotonic()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, key, delta=1):
+        with self._stats_lock:
+            self.stats[key] += delta
+            if key == "in_flight":
+                self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.stats.update(requests=0, connections=0, max_in_flight=self.stats["in_flight"], throttled=0,
+                              spikes=0, disconnects=0)
+            self._quota = (self.requests_per_minute or 0) / 60 * self.QUOTA_WINDOW
+            self._quota_updated = time.monotonic()
+
+    def fault(self):
+        """
+        Decide how to treat an incoming request.
+
+        Returns:
+            tuple: (kind, value): ("throttle", retry-after seconds), ("disconnect", None),
+            ("spike", latency) or (None, latency). ("cut", words), never drawn here, streams
+            that many words and then drops the connection.
+        """
+        with self._stats_lock:
+            now = time.monotonic()
+            if self.requests_per_minute:
+                rate = self.requests_per_minute / 60
+                self._quota = min(rate * self.QUOTA_WINDOW, self._quota + (now - self._quota_updated) * rate)
+                self._quota_updated = now
+                if self._quota < 1:
+                    self.stats["throttled"] += 1
+                    return "throttle", (1 - self._quota) / rate
+            draw = self._random.random()
+            if draw < self.throttle_rate:
+                self.stats["throttled"] += 1
+                return "throttle", self.retry_after
+            draw -= self.throttle_rate
+            if draw < self.disconnect_rate:
+                self.stats["disconnects"] += 1
+                return "disconnect", None
+            if self.requests_per_minute:
+                self._quota -= 1
+            draw -= self.disconnect_rate
+            if draw < self.spike_rate:
+                self.stats["spikes"] += 1
+                return "spike", self.spike_latency
+            return None, self.latency
+
+    def start(self):
+        """Serve in a background thread; returns the server."""
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address):
+        # Clients that gave up on a request, e.g. the losing half of a hedge, are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real service
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output readable
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, self.server.stats)
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if "/chat/completions" not in self.path:
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        self.server.count("requests")
+        fault, value = self.server.fault()
+        if fault == "throttle":
+            self._send_json(429, {"error": {
+                "code": "429",
+                "message": "Requests to the ChatCompletions_Create Operation have exceeded call rate limit.",
+            }}, headers={"Retry-After": str(max(1, round(value))), "retry-after-ms": str(int(value * 1000))})
+            return
+        if fault == "disconnect":
+            self.close_connection = True  # Drop the connection without a response
+            return
+
+        self.server.count("in_flight")
+        try:
+            if fault == "cut":
+                self._stream(request, cut_after=value)
+                return
+            time.sleep(value)
+            if request.get("stream"):
+                self._stream(request)
+                return
+            self._send_json(200, {
+                "id": f"chatcmpl-fake-{self.server.stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-4o-mini"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": self.server.reply},
+                    "finish_reason": "stop",
+                }],
+                "usage": self._usage(request),
+            })
+        finally:
+            self.server.count("in_flight", -1)
+
+    def _usage(self, request):
+        prompt_tokens = sum(len(message["content"].split()) for message in request.get("messages", []))
+        completion_tokens = len(self.server.reply.split())
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def _stream(self, request, cut_after=None):
+        """
+        Send the reply as chat.completion.chunk server-sent events, one word per event.
+
+        With ``cut_after``, the connection is dropped after that many words, before the
+        stream is complete.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send(data):
+            event = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(event):x}\r\n".encode("ascii") + event + b"\r\n")
+            self.wfile.flush()
+
+        send(json.dumps({
+            "id": "",
+            "object": "",
+            "created": 0,
+            "model": "",
+            "choices": [],
+            "prompt_filter_results": [{"prompt_index": 0, "content_filter_results": {}}],
+        }))
+        words = self.server.reply.split(" ")
+        for i, word in enumerate(words):
+            if i == cut_after:
+                self.close_connection = True
+                return
+            if i:
+                time.sleep(self.server.token_delay)
+            send(json.dumps({
+                "id": "chatcmpl-fake-stream",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-4o-mini"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else f" {word}"},
+                    "finish_reason": "stop" if i == len(words) - 1 else None,
+                }],
+            }))
+        if self.server.stream_usage and (request.get("stream_options") or {}).get("include_usage"):
+            send(json.dumps({
+                "id": "chatcmpl-fake-stream",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-4o-mini"),
+                "choices": [],
+                "usage": self._usage(request),
+            }))
+        send("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+if __name__ == "__main__":
+    server = FakeOpenAIServer(port=_arg("--port", 8765), latency=_arg("--latency", 0.2, float),
+                              token_delay=_arg("--token-delay", 0.02, float),
+                              requests_per_minute=_arg("--rpm", None, float),
+                              throttle_rate=_arg("--throttle-rate", 0.0, float),
+                              spike_rate=_arg("--spike-rate", 0.0, float),
+                              spike_latency=_arg("--spike-latency", 3.0, float),
+                              disconnect_rate=_arg("--disconnect-rate", 0.0, float))
+    print(f"Fake chat-completions endpoint on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,101 @@
+"""
+Throughput of the PDF ingestion pipeline (pages/s and chunks/s).
+
+Writes synthetic minutes-like PDFs as local fixtures (or uses the PDFs given
+with --pdfs), ingests them into a scratch index and reports the pipeline
+counters. Peak memory stays flat as --pages grows because the pipeline holds
+one page and one batch of chunks at a time.
+
+Usage:
+    python benchmarks/ingestion_throughput.py [--documents 4] [--pages 200] [--batch-size 256]
+    python benchmarks/ingestion_throughput.py --pdfs path/to/minutes/
+"""
+import json
+import os
+import resource
+import sys
+import tempfile
+
+import numpy as np
+
+import common  # noqa: F401  Puts the project root on sys.path
+
+from fomc_dashboard.modules.ingestion import find_pdfs, ingest_pdfs
+
+WORDS = (
+    "committee participants inflation labor market federal funds rate target range basis points "
+    "balance sheet treasury securities agency mortgage-backed soma runoff economic activity "
+    "financial conditions credit tightening projections uncertainty policy restrictive"
+).split()
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_fixture_pdf(path, pages, seed=0, lines_per_page=45):
+    """Write a plain-text PDF with ``pages`` pages of minutes-like sentences."""
+    rng = np.random.default_rng(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for number in range(1, pages + 1):
+        lines = []
+        for _ in range(lines_per_page):
+            words = rng.choice(WORDS, size=12)
+            lines.append(f"{words[0].capitalize()} {' '.join(words[1:])}.")
+        lines.append(f"Page {number} of {pages}")
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(f"({_escape(line)}) Tj T*" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode("latin-1"))
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R "
+            f"/Resources << /Font << /F1 3 0 R >> >> >>".encode("latin-1")
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{object_id} 0 R" for object_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("latin-1")
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for object_id, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(f"{object_id} 0 obj\n".encode("latin-1") + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode("latin-1"))
+        f.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        if "--pdfs" in sys.argv:
+            paths = list(find_pdfs([_arg("--pdfs", None, str)]))
+        else:
+            paths = []
+            for number in range(_arg("--documents", 4)):
+                path = os.path.join(directory, f"fomcminutes2023{number + 1:02d}15.pdf")
+                write_fixture_pdf(path, _arg("--pages", 200), seed=number)
+                paths.append(path)
+
+        stats = ingest_pdfs(
+            paths,
+            metadata_file=os.path.join(directory, "metadata.db"),
+            index_file=os.path.join(directory, "faiss_index"),
+            batch_size=_arg("--batch-size", 256),
+            embedding_cache=None,  # Measure encoding, not cache hits
+        )
+    stats["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    print("  ".join(f"{key}={value}" for key, value in stats.items()))
+
+    if "--json" in sys.argv:
+        with open(_arg("--json", None, str), "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
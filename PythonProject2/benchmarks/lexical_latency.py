@@ -0,0 +1,82 @@
+"""
+Latency and size of the BM25 index used by hybrid search.
+
+Builds a metadata store over synthetic chunks whose word frequencies follow a
+Zipf law (like real text: a few words in nearly every chunk, a long tail of
+rare ones) and times lexical searches for questions mixing common and rare words.
+
+Usage:
+    python benchmarks/lexical_latency.py [--size 100000] [--queries 500] [--k 20] [--json out.json]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from common import percentile_ms
+
+from fomc_dashboard.modules.metadata_store import MetadataStore, build_store
+
+VOCABULARY_SIZE = 30_000
+WORDS_PER_CHUNK = 120
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def zipf_chunks(n, seed=0):
+    """Synthetic chunk texts whose word frequencies fall off as 1 / rank."""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, VOCABULARY_SIZE + 1)
+    words = rng.choice(VOCABULARY_SIZE, size=(n, WORDS_PER_CHUNK), p=weights / weights.sum())
+    return [" ".join(f"w{word}" for word in row) for row in words]
+
+
+def run(size, n_queries, k):
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "metadata.db")
+        chunks = zipf_chunks(size)
+        start = time.perf_counter()
+        build_store(path, chunks)
+        build_seconds = time.perf_counter() - start
+
+        # Two common and two rare words per question
+        queries = [
+            " ".join(f"w{word}" for word in (*rng.integers(0, 50, 2), *rng.integers(500, VOCABULARY_SIZE, 2)))
+            for _ in range(n_queries)
+        ]
+        store = MetadataStore(path)
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            store.lexical_search(query, k)
+            latencies.append(time.perf_counter() - start)
+        store.close()
+
+        return {
+            "size": size,
+            "build_s": round(build_seconds, 3),
+            "text_mb": round(sum(len(chunk) for chunk in chunks) / 1e6, 1),
+            "store_mb": round(os.path.getsize(path) / 1e6, 1),
+            "p50_ms": round(percentile_ms(latencies, 50), 3),
+            "p95_ms": round(percentile_ms(latencies, 95), 3),
+            "p99_ms": round(percentile_ms(latencies, 99), 3),
+        }
+
+
+def main():
+    result = run(_arg("--size", 100_000), _arg("--queries", 500), _arg("--k", 20))
+    print("  ".join(f"{key}={value}" for key, value in result.items()))
+
+    if "--json" in sys.argv:
+        with open(_arg("--json", None, str), "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
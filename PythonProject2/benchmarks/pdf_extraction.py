@@ -0,0 +1,113 @@
+"""
+PDF text extraction: the old page loop against pdf_extraction.PdfExtractor.
+
+Generates a synthetic minutes-like PDF of --pages pages and extracts it:
+
+- loop: PyPDF2 pages concatenated with += on one thread, as
+  semantic_analysis.extract_text_from_pdf used to
+- workers=<n>: PdfExtractor with n worker processes and an empty page cache
+- cached: the same document again (a re-upload); every page comes from the cache
+
+Reports seconds and pages per second and checks that every variant returns
+the same pages, and that PdfExtractor.extract_text returns the loop's text.
+Process-pool speedups need as many free cores as workers.
+
+Usage:
+    python benchmarks/pdf_extraction.py [--pages 200] [--words 600] [--workers 1,2,4] [--json out.json]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import common  # noqa: F401
+
+from fomc_dashboard.modules.pdf_extraction import PdfExtractor, _reader
+
+WORDS = ("inflation", "employment", "Committee", "federal", "funds", "rate", "participants", "policy",
+         "labor", "market", "outlook", "remained", "elevated", "target", "range", "percent")
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def synthetic_pdf(n_pages, words_per_page, seed=0):
+    """A valid PDF of ``n_pages`` pages of random words in lines of 12, written without a PDF library."""
+    rng = np.random.default_rng(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(n_pages):
+        words = [WORDS[i] for i in rng.integers(0, len(WORDS), size=words_per_page)]
+        lines = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+        stream = "BT /F1 9 Tf 11 TL 40 800 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream.encode("ascii")))
+        content = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 3 0 R >> >> >>" % content)
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{kid} 0 R" for kid in kids).encode(),
+                                                                n_pages)
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+def concatenate_pages(data):
+    text = ""
+    for page in _reader(data).pages:
+        text += page.extract_text()
+    return text
+
+
+def main():
+    n_pages, words = _arg("--pages", 200), _arg("--words", 600)
+    worker_counts = [int(value) for value in _arg("--workers", "1,2,4", str).split(",")]
+    data = synthetic_pdf(n_pages, words)
+
+    rows = []
+
+    def report(name, seconds, same):
+        row = {"variant": name, "pages": n_pages, "seconds": round(seconds, 3),
+               "pages_per_s": round(n_pages / seconds, 1), "same_text": same}
+        print("  ".join(f"{key}={value}" for key, value in row.items()), flush=True)
+        rows.append(row)
+
+    start = time.perf_counter()
+    expected = concatenate_pages(data)
+    report("loop", time.perf_counter() - start, True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for workers in worker_counts:
+            cache_path = os.path.join(directory, f"pages-{workers}.db")
+            with PdfExtractor(workers, cache_path) as extractor:
+                extractor.extract_pages(synthetic_pdf(1, 10, seed=1))  # Start the pool outside the timing
+                if workers > 1:
+                    extractor.extract_pages(synthetic_pdf(2 * extractor.pages_per_task, 10, seed=1))
+                start = time.perf_counter()
+                pages = extractor.extract_pages(data)
+                report(f"workers={workers}", time.perf_counter() - start, "".join(pages) == expected)
+
+                start = time.perf_counter()
+                text = extractor.extract_text(data)
+                if workers == worker_counts[-1]:
+                    report("cached", time.perf_counter() - start, text == expected)
+
+    if "--json" in sys.argv:
+        with open(_arg("--json", None, str), "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
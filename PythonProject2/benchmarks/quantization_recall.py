@@ -0,0 +1,72 @@
+"""
+Recall and memory of float16 / int8 vector storage against the float32 baseline.
+
+Builds flat, hnsw and ivf_flat indexes with each codec over the same synthetic,
+clustered corpus. Recall@k is measured against the exact float32 flat index, and
+memory is the size of the serialized index, which is what each worker process
+holds after loading it.
+
+Usage:
+    python benchmarks/quantization_recall.py [--size 100000] [--queries 500] [--k 5] [--json out.json]
+"""
+import json
+import sys
+
+import faiss
+
+from common import clustered_vectors, percentile_ms, recall_at_k, time_single_queries
+
+from fomc_dashboard.modules.index_factory import CODECS, build_index, make_index_config
+
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat")
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def run(size, n_queries, k):
+    corpus = clustered_vectors(size, seed=0)
+    queries = clustered_vectors(size + n_queries, seed=0)[size:]
+
+    rows = []
+    truth = None
+    for index_type in INDEX_TYPES:
+        baseline_mb = None
+        for codec in CODECS:
+            config = make_index_config(index_type, codec=codec)
+            index = build_index(config, training_vectors=corpus)
+            index.add(corpus)
+            memory_mb = faiss.serialize_index(index).nbytes / 2 ** 20
+            baseline_mb = baseline_mb or memory_mb  # float32 runs first
+
+            found, latencies = time_single_queries(index, queries, k)
+            if truth is None:
+                truth = found  # Exact float32 flat search
+            rows.append({
+                "index_type": index_type,
+                "codec": codec,
+                "memory_mb": round(memory_mb, 1),
+                "memory_ratio": round(baseline_mb / memory_mb, 2),
+                f"recall@{k}": round(recall_at_k(found, truth, k), 4),
+                "p50_ms": round(percentile_ms(latencies, 50), 3),
+                "p95_ms": round(percentile_ms(latencies, 95), 3),
+            })
+    return rows
+
+
+def main():
+    size = _arg("--size", 100_000)
+    rows = run(size, _arg("--queries", 500), _arg("--k", 5))
+
+    print(f"Corpus size: {size}")
+    for row in rows:
+        print("  ".join(f"{key}={value}" for key, value in row.items()))
+
+    if "--json" in sys.argv:
+        with open(_arg("--json", None, str), "w", encoding="utf-8") as f:
+            json.dump({"size": size, "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
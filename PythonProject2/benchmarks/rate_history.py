@@ -0,0 +1,127 @@
+"""
+Data loading of the interest rate trends page: scraping on every rerun
+against the precomputed rate history (modules/rate_history.py).
+
+A local HTTP server stands in for Wikipedia, serving a synthetic page with
+a rate decision table of --rows rows after --latency seconds. Variants:
+
+- scrape: fetch and parse the page, as every rerun of the page used to
+- refresh: the refresh job (fetch, parse, write Parquet); run once, not per rerun
+- parquet: read the Parquet file (a process's first rerun, or after the TTL)
+- cached: load_rate_history from the process-wide cache (every other rerun)
+
+Usage:
+    python benchmarks/rate_history.py [--rows 800] [--latency 0.2] [--repeat 20] [--json out.json]
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+
+import common  # noqa: F401
+
+from fomc_dashboard.modules import rate_history
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def synthetic_rate_page(n_rows, seed=0):
+    """HTML shaped like the Wikipedia page: a rate decision table with footnotes, newest first, plus another table."""
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64("1990-01-01") + np.sort(rng.choice(35 * 365, size=n_rows, replace=False))
+    lower = np.cumsum(rng.choice([-0.25, 0.0, 0.0, 0.25], size=n_rows)).clip(0, 20) + 0.25
+    rows = []
+    for date, rate in zip(dates, lower):
+        date = date.item()
+        votes = f"{rng.integers(8, 13)}-{rng.integers(0, 3)}"
+        footnote = f"<sup class=\"reference\">[{rng.integers(1, 99)}]</sup>"
+        # Single targets until the range introduced in December 2008
+        target = f"{rate:.2f}%" if date.year < 2009 else f"{rate:.2f}%–{rate + 0.25:.2f}%"
+        rows.append(f"<tr><td>{date:%B} {date.day}, {date.year}{footnote}</td>"
+                    f"<td>{target}</td><td>{rate + 0.5:.2f}%</td>"
+                    f"<td>{votes}</td><td>Statement text for this meeting.</td></tr>")
+    table = ("<table class=\"wikitable\"><tr><th>Date</th><th>Fed Funds Rate</th><th>Discount Rate</th>"
+             "<th>Votes</th><th>Notes</th></tr>" + "".join(reversed(rows)) + "</table>")
+    other = "<table class=\"wikitable\"><tr><th>Chair</th><th>Term</th></tr><tr><td>Name</td><td>Years</td></tr></table>"
+    return f"<html><body><h1>History of FOMC actions</h1>{table}{other}</body></html>"
+
+
+class FakeWikiServer:
+    def __init__(self, html, latency=0.0):
+        body = html.encode("utf-8")
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                time.sleep(latency)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/wiki"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def time_calls(function, repeat):
+    """Median and max milliseconds of ``repeat`` calls."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(times), 3), "max_ms": round(max(times), 3)}
+
+
+def main():
+    n_rows, repeat = _arg("--rows", 800), _arg("--repeat", 20)
+    server = FakeWikiServer(synthetic_rate_page(n_rows), _arg("--latency", 0.2, float))
+
+    def scrape():
+        return rate_history.parse_rate_history(requests.get(server.url, timeout=30).text)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "rate_history.parquet")
+
+        def cold():
+            rate_history._histories.clear()
+            return rate_history.load_rate_history(path)
+
+        variants = [
+            ("scrape", scrape, repeat),
+            ("refresh", lambda: rate_history.refresh_rate_history(path, server.url), 1),
+            ("parquet", cold, repeat),
+            ("cached", lambda: rate_history.load_rate_history(path), repeat),
+        ]
+        for name, function, calls in variants:
+            row = {"variant": name, "rows": n_rows, **time_calls(function, calls)}
+            print("  ".join(f"{key}={value}" for key, value in row.items()), flush=True)
+            rows.append(row)
+    server.stop()
+
+    if "--json" in sys.argv:
+        with open(_arg("--json", None, str), "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Parse speed of the FOMC actions table: the per-cell BeautifulSoup loop the
+rate page used to run against rate_history.parse_rate_history (pd.read_html
+and vectorized string operations into typed columns).
+
+For each size, parses a synthetic page (benchmarks/rate_history.py) with
+--rows decisions and reports the median milliseconds of --repeat parses, the
+rows with a valid date, and the rows with a numeric rate. pd.to_numeric in
+the old loop turns both "5.25%" and ranges such as "5.25%–5.50%" into NaN.
+
+Usage:
+    python benchmarks/rate_parsing.py [--rows 100,1000,10000] [--repeat 5] [--json out.json]
+"""
+import json
+import statistics
+import sys
+import time
+import warnings
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from rate_history import synthetic_rate_page
+
+from fomc_dashboard.modules.rate_history import parse_rate_history
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def loop_parse(html):
+    """The page's former parsing: every row and cell visited in Python, then the columns coerced."""
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find_all("table", {"class": "wikitable"})[0]
+    for reference in table.find_all("sup", {"class": "reference"}):
+        reference.decompose()
+    rows = table.find_all("tr")
+    headers = [header.text.strip() for header in rows[0].find_all("th")]
+    data = [[cell.text.strip() for cell in row.find_all(["td", "th"])] for row in rows[1:]]
+    df = pd.DataFrame(data, columns=headers)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # Format inference falls back to dateutil
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df = df.dropna(subset=["Date"])
+    df["Fed Funds Rate"] = pd.to_numeric(df["Fed Funds Rate"], errors="coerce")
+    return df.rename(columns={"Date": "date", "Fed Funds Rate": "upper"})
+
+
+def main():
+    sizes = [int(value) for value in _arg("--rows", "100,1000,10000", str).split(",")]
+    repeat = _arg("--repeat", 5)
+
+    rows = []
+    for n_rows in sizes:
+        html = synthetic_rate_page(n_rows)
+        for name, parse in (("loop", loop_parse), ("vectorized", parse_rate_history)):
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                df = parse(html)
+                times.append((time.perf_counter() - start) * 1000)
+            row = {"parser": name, "rows": n_rows, "median_ms": round(statistics.median(times), 2),
+                   "dated_rows": int(df["date"].notna().sum()), "rate_rows": int(df["upper"].notna().sum())}
+            print("  ".join(f"{key}={value}" for key, value in row.items()), flush=True)
+            rows.append(row)
+
+    if "--json" in sys.argv:
+        with open(_arg("--json", None, str), "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Offline retrieval benchmark over synthetic FOMC-scale corpora.
+
+For each corpus size and index type, writes a complete index (FAISS base plus
+SQLite metadata store) with the same code path as store_in_faiss and measures
+the retriever behind query_faiss and AzureOpenAIHelper.retrieve_context:
+
+- build_s: training, adding and writing the index and metadata store
+- index_mb / metadata_mb: size on disk
+- p50/p95/p99_ms: single-query latency, metadata lookup included
+- qps_<n>_threads: throughput with n threads querying concurrently
+- recall@k: against exact float32 search
+
+Query embeddings are pre-computed, so model inference is not part of the
+numbers. Results are written as JSON (with library versions and the machine's
+CPU count) so that runs of different releases can be compared.
+
+Usage:
+    python benchmarks/retrieval_suite.py [--sizes 10000,100000,1000000] [--types flat,hnsw,ivf_flat,ivf_pq]
+        [--codecs float32] [--queries 1000] [--k 5] [--threads 8] [--json retrieval_results.json]
+"""
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import faiss
+import numpy as np
+
+from common import clustered_vectors, percentile_ms, recall_at_k
+
+from fomc_dashboard.modules.index_factory import DEFAULT_PARAMS, build_index, make_index_config
+from fomc_dashboard.modules.index_store import write_base
+from fomc_dashboard.modules.retriever import FaissRetriever
+
+DOC_TYPES = ("statement", "minutes", "transcript", "presconf")
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def _list_arg(name, default, cast=str):
+    return [cast(value) for value in _arg(name, default, str).split(",")]
+
+
+def synthetic_records(n, seed=0):
+    """
+    Metadata records spread over 30 years of meetings.
+
+    The text is one sentence rather than a full chunk so that a million records
+    fit in memory; metadata_mb is therefore lower than for real chunks.
+    """
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 30 * 365, size=n)
+    doc_types = rng.integers(0, len(DOC_TYPES), size=n)
+    filler = "The Committee reviewed economic and financial developments."
+    return [
+        {
+            "text": f"Chunk {i}. {filler}",
+            "meeting_date": str(np.datetime64("1994-01-01") + int(days[i])),
+            "doc_type": DOC_TYPES[doc_types[i]],
+            "section": f"page {i % 40 + 1}",
+        }
+        for i in range(n)
+    ]
+
+
+def exact_neighbours(corpus, queries, k):
+    index = faiss.IndexFlatL2(corpus.shape[1])
+    index.add(corpus)
+    return index.search(queries, k)[1]
+
+
+def measure(retriever, queries, k, threads):
+    """Latencies of sequential single queries and throughput under concurrent queries."""
+    found, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results = retriever.search(query[None, :], k)[0]
+        latencies.append(time.perf_counter() - start)
+        found.append([result["id"] for result in results] + [-1] * (k - len(results)))
+
+    with ThreadPoolExecutor(threads) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda query: retriever.search(query[None, :], k), queries))
+        qps = len(queries) / (time.perf_counter() - start)
+    return np.array(found), np.array(latencies), qps
+
+
+def run_case(directory, corpus, records, queries, truth, index_type, codec, k, threads):
+    name = f"{index_type}-{codec}-{len(corpus)}"
+    index_path = os.path.join(directory, f"{name}.index")
+    metadata_path = os.path.join(directory, f"{name}.db")
+
+    start = time.perf_counter()
+    config = make_index_config(index_type, codec=codec)
+    index = build_index(config, training_vectors=corpus)
+    index.add(corpus)
+    write_base(index_path, metadata_path, index, records, config)
+    build_seconds = time.perf_counter() - start
+
+    manifest_dir = os.path.dirname(index_path)
+    with open(f"{index_path}.json", "r", encoding="utf-8") as f:
+        base = json.load(f)["base"]
+    index_bytes = os.path.getsize(os.path.join(manifest_dir, base["index"]))
+    metadata_bytes = os.path.getsize(os.path.join(manifest_dir, base["metadata"]))
+
+    retriever = FaissRetriever(index_path, metadata_path, check_interval=float("inf"))
+    found, latencies, qps = measure(retriever, queries, k, threads)
+
+    return {
+        "size": len(corpus),
+        "index_type": index_type,
+        "codec": codec,
+        **{key: config[key] for key in DEFAULT_PARAMS[index_type]},
+        "build_s": round(build_seconds, 3),
+        "index_mb": round(index_bytes / 2 ** 20, 2),
+        "metadata_mb": round(metadata_bytes / 2 ** 20, 2),
+        "p50_ms": round(percentile_ms(latencies, 50), 3),
+        "p95_ms": round(percentile_ms(latencies, 95), 3),
+        "p99_ms": round(percentile_ms(latencies, 99), 3),
+        f"qps_{threads}_threads": round(qps, 1),
+        f"recall@{k}": round(recall_at_k(found, truth, k), 4),
+    }
+
+
+def main():
+    sizes = _list_arg("--sizes", "10000,100000,1000000", int)
+    index_types = _list_arg("--types", ",".join(DEFAULT_PARAMS))
+    codecs = _list_arg("--codecs", "float32")
+    n_queries, k, threads = _arg("--queries", 1000), _arg("--k", 5), _arg("--threads", 8)
+
+    results = []
+    for size in sizes:
+        corpus = clustered_vectors(size, seed=0)
+        # Queries come from the same distribution as the corpus but are not in it
+        queries = clustered_vectors(size + n_queries, seed=0)[size:]
+        truth = exact_neighbours(corpus, queries, k)
+        records = synthetic_records(size)
+
+        # The retrievers' SQLite files may still be open when the directory is removed
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+            for index_type in index_types:
+                for codec in codecs:
+                    if index_type == "ivf_pq" and codec != "float32":
+                        continue  # PQ has its own compression
+                    row = run_case(directory, corpus, records, queries, truth, index_type, codec, k, threads)
+                    print("  ".join(f"{key}={value}" for key, value in row.items()), flush=True)
+                    results.append(row)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "faiss": faiss.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {"queries": n_queries, "k": k, "threads": threads},
+        "results": results,
+    }
+    with open(_arg("--json", "retrieval_results.json", str), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Startup-time benchmark for fomc_dashboard.modules.sentence_transformer.
+
+Every measurement runs in a fresh interpreter so that nothing is already imported
+or loaded. Reports:
+
+- import: time to import the module
+- first_query: time for the first query_faiss call (model + index load included)
+- warm_query: median time of subsequent query_faiss calls
+
+Usage:
+    python benchmarks/startup_latency.py [--runs 5]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import fomc_dashboard.modules.sentence_transformer
+print(time.perf_counter() - start)
+"""
+
+QUERY_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+from fomc_dashboard.modules.sentence_transformer import query_faiss
+import_time = time.perf_counter() - start
+
+index_file, metadata_file = sys.argv[1], sys.argv[2]
+start = time.perf_counter()
+query_faiss("What did the FOMC decide about interest rates?", metadata_file=metadata_file, index_file=index_file)
+first_query = time.perf_counter() - start
+
+warm = []
+for _ in range(20):
+    start = time.perf_counter()
+    query_faiss("How is the labor market doing?", metadata_file=metadata_file, index_file=index_file)
+    warm.append(time.perf_counter() - start)
+warm.sort()
+print(json.dumps({"import": import_time, "first_query": first_query, "warm_query": warm[len(warm) // 2]}))
+"""
+
+BUILD_SNIPPET = """
+import sys
+from fomc_dashboard.modules.sentence_transformer import store_in_faiss
+store_in_faiss([
+    "The FOMC decided to maintain interest rates at 5.25%.",
+    "Inflation expectations have declined compared to last quarter.",
+    "GDP growth was revised downward due to tighter credit conditions.",
+    "The Federal Reserve is monitoring labor market trends closely.",
+], metadata_file=sys.argv[2], index_file=sys.argv[1])
+"""
+
+
+def _run(snippet, *args):
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    completed = subprocess.run(
+        [sys.executable, "-c", snippet, *args],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return completed.stdout.strip().splitlines()[-1]
+
+
+def main():
+    runs = int(sys.argv[sys.argv.index("--runs") + 1]) if "--runs" in sys.argv else 5
+
+    import_times = [float(_run(IMPORT_SNIPPET)) for _ in range(runs)]
+    report = {
+        "import_median_s": statistics.median(import_times),
+        "import_max_s": max(import_times),
+    }
+
+    scratch_dir = tempfile.mkdtemp(prefix="fomc_startup_bench_")
+    index_file = os.path.join(scratch_dir, "faiss_index")
+    metadata_file = os.path.join(scratch_dir, "metadata.db")
+    try:
+        _run(BUILD_SNIPPET, index_file, metadata_file)
+        query_runs = [json.loads(_run(QUERY_SNIPPET, index_file, metadata_file)) for _ in range(runs)]
+        report["first_query_median_s"] = statistics.median(r["first_query"] for r in query_runs)
+        report["warm_query_median_s"] = statistics.median(r["warm_query"] for r in query_runs)
+    except subprocess.CalledProcessError as e:
+        # The model download needs network access; still report the import numbers
+        report["query_error"] = e.stderr.strip().splitlines()[-1] if e.stderr else str(e)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
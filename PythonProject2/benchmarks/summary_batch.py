@@ -0,0 +1,100 @@
+"""
+Batch meeting summarization (meeting_summaries.summarize_meetings) against
+the local stand-in endpoint (fake_openai_server.py).
+
+Builds a synthetic index of --meetings meetings, each with a statement,
+minutes and a press conference, then:
+
+- workers=<n>: summarizes every meeting into a fresh store with n workers at
+  once; reports meetings per second and the requests the endpoint saw
+- rerun: runs again over the same store; nothing changed, so no request
+  should be sent and every meeting is "unchanged"
+- one_changed: rewrites the minutes of one meeting and reruns; exactly one
+  meeting should be regenerated
+
+Usage:
+    python benchmarks/summary_batch.py [--meetings 40] [--workers 1,4,8] [--latency 0.2] [--json out.json]
+"""
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+from fake_openai_server import FakeOpenAIServer
+
+import common  # noqa: F401
+
+from fomc_dashboard.modules.ai_responder import AzureOpenAIHelper
+from fomc_dashboard.modules.index_factory import build_index, make_index_config
+from fomc_dashboard.modules.index_store import write_base
+from fomc_dashboard.modules.meeting_summaries import summarize_meetings
+
+DOC_TYPES = ("statement", "minutes", "presconf")
+CHUNKS_PER_DOCUMENT = 6
+
+
+def _arg(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def synthetic_records(n_meetings, changed=None):
+    """Chunks of every meeting's documents; the minutes of meeting ``changed`` get an extra sentence."""
+    records = []
+    for m in range(n_meetings):
+        meeting_date = f"{2000 + m // 8}-{1 + (m % 8) * 3 // 2:02d}-15"
+        for doc_type in DOC_TYPES:
+            for c in range(CHUNKS_PER_DOCUMENT):
+                text = (f"{doc_type} {m} part {c}: the Committee discussed inflation, employment and the "
+                        f"target range for the federal funds rate at meeting {m}.")
+                if m == changed and doc_type == "minutes" and c == 0:
+                    text += " Participants revised their outlook."
+                records.append({"text": text, "meeting_date": meeting_date, "doc_type": doc_type})
+    return records
+
+
+def write_index(index_file, records):
+    config = make_index_config("flat")
+    vectors = np.random.default_rng(0).standard_normal((len(records), config["dimension"])).astype("float32")
+    index = build_index(config)
+    index.add(vectors)
+    write_base(f"{index_file}.index", f"{index_file}.db", index, records, config)
+
+
+def run(server, helper, index_file, store_path, max_workers):
+    before = server.stats["requests"]
+    stats = summarize_meetings(helper, index_file, f"{index_file}.db", store_path, max_workers=max_workers)
+    return {**stats, "meetings_per_s": round(stats["meetings"] / stats["seconds"], 1) if stats["seconds"] else None,
+            "server_requests": server.stats["requests"] - before}
+
+
+def main():
+    n_meetings = _arg("--meetings", 40)
+    worker_counts = [int(value) for value in _arg("--workers", "1,4,8", str).split(",")]
+    server = FakeOpenAIServer(latency=_arg("--latency", 0.2, float)).start()
+    helper = AzureOpenAIHelper("bench-summaries", endpoint=server.url, max_concurrency=max(worker_counts))
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        index_file = os.path.join(directory, "faiss_index")
+        write_index(index_file, synthetic_records(n_meetings))
+
+        runs = [(f"workers={n}", os.path.join(directory, f"summaries-{n}.db"), n, None) for n in worker_counts]
+        store_path = runs[-1][1]
+        runs += [("rerun", store_path, worker_counts[-1], None),
+                 ("one_changed", store_path, worker_counts[-1], n_meetings // 2)]
+        for name, path, max_workers, changed in runs:
+            if changed is not None:
+                write_index(index_file, synthetic_records(n_meetings, changed))
+            row = {"run": name, **run(server, helper, index_file, path, max_workers)}
+            print("  ".join(f"{key}={value}" for key, value in row.items()), flush=True)
+            rows.append(row)
+    server.stop()
+
+    if "--json" in sys.argv:
+        with open(_arg("--json", None, str), "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,18 @@ import sys
 # Dynamically add the project root to Python's path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
-from fomc_dashboard.modules.ai_responder import AzureOpenAIHelper
-from fomc_dashboard.modules.sentence_transformer import query_faiss
+from fomc_dashboard.modules import metrics
+from fomc_dashboard.modules.sentence_transformer import AzureOpenAIHelper
+
+INSTRUCTION = "You are an assistant providing insights on FOMC meetings, interest rates, and economic policy."
 
 def main():
     # Page Configuration
     st.set_page_config(page_title="RateRadar: FOMC Insights", page_icon="📡", layout="wide")
 
+    # Serve /metrics on METRICS_PORT, if set (once per process)
+    metrics.start_server_from_env()
+
     # Custom Styling for UX Enhancements
     st.markdown("""
         <style>
@@ -81,7 +86,7 @@ def main():
         st.warning("⚠️ Please enter your API key to start using the assistant.")
         return
 
-    # Initialize AI Responder
+    # Initialize AI Responder (retrieves context from the FAISS index for every question)
     ai_helper = AzureOpenAIHelper(api_key=api_key)
 
     # Main Chat Assistant Section
@@ -108,37 +113,31 @@ def main():
 
     # Handle User Question
     if user_question:
-        with st.spinner("⏳ Gathering insights for you..."):
-            try:
-                # Query FAISS for context
-                faiss_results = query_faiss(user_question)
-                if not faiss_results:
-                    response_placeholder.error("No relevant data found for your query.")
-                    return
-
-                # Combine FAISS results into context
-                context = "\n".join([result['text'] for result in faiss_results])
-
-                # Combine context and question into a prompt
-                combined_prompt = f"Context: {context}\n\nQuestion: {user_question}\n\nAnswer concisely as a personal assistant."
-
-                # Get AI Response
-                ai_response = ai_helper.get_response(
-                    message=combined_prompt,
-                    instruction="You are an assistant providing insights on FOMC meetings, interest rates, and economic policy.",
+        try:
+            # Retrieves context, then answers from the answer cache or streams a new
+            # answer into the placeholder as it is generated
+            ai_response = ""
+            with st.spinner("⏳ Gathering insights for you..."):
+                for piece in ai_helper.stream_response(
+                    message=user_question,
+                    instruction=INSTRUCTION,
                     temperature=0.7
-                )
-
-                # Display AI Response
-                if ai_response:
+                ):
+                    ai_response += piece
                     response_placeholder.markdown(f"""
-                    <div class="response-box">{ai_response}</div>
+                    <div class="response-box">{ai_response}▌</div>
                     """, unsafe_allow_html=True)
-                else:
-                    response_placeholder.error("Sorry, I could not retrieve a response. Please try again.")
 
-            except Exception as e:
-                response_placeholder.error(f"An error occurred: {e}")
+            # Display AI Response
+            if ai_response:
+                response_placeholder.markdown(f"""
+                <div class="response-box">{ai_response}</div>
+                """, unsafe_allow_html=True)
+            else:
+                response_placeholder.error("Sorry, I could not retrieve a response. Please try again.")
+
+        except Exception as e:
+            response_placeholder.error(f"An error occurred: {e}")
 
     # Footer Section with Slogan
     st.markdown("---")
@@ -1,29 +1,448 @@
-from openai import AzureOpenAI
+import email.utils
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from fomc_dashboard.modules import metrics
+from fomc_dashboard.modules.rate_limiter import RateLimiter, backoff_delay
+
+
+def _env_float(name):
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+# Requests in flight per API key and endpoint, across all sessions of this process
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("AZURE_OPENAI_MAX_CONCURRENCY", "16"))
+# Quotas of the model deployment; unset means no client-side limit
+DEFAULT_REQUESTS_PER_MINUTE = _env_float("AZURE_OPENAI_RPM")
+DEFAULT_TOKENS_PER_MINUTE = _env_float("AZURE_OPENAI_TPM")
+# Retries of throttled (429), timed-out, disconnected and 5xx requests
+DEFAULT_MAX_RETRIES = int(os.environ.get("AZURE_OPENAI_MAX_RETRIES", "4"))
+# Seconds after which a slow request is duplicated; unset disables hedging
+DEFAULT_HEDGE_AFTER = _env_float("AZURE_OPENAI_HEDGE_AFTER")
+# Completion tokens assumed when reserving quota, corrected once the usage is known
+EXPECTED_COMPLETION_TOKENS = 400
+
+RETRY_STATUS_CODES = {408, 409, 429}
+
+LLM_SECONDS = metrics.histogram("llm_request_seconds", "Latency of successful chat completions, retries included",
+                                ("model", "stream"))
+LLM_FIRST_TOKEN_SECONDS = metrics.histogram("llm_time_to_first_token_seconds",
+                                            "Time to the first token of streamed chat completions", ("model",))
+LLM_TOKENS = metrics.counter("llm_tokens_total", "Prompt and completion tokens of chat completions", ("model", "kind"))
+LLM_RETRIES = metrics.counter("llm_retries_total", "Chat completion attempts retried after an error",
+                              ("model", "error"))
+LLM_ERRORS = metrics.counter("llm_errors_total", "Chat completions that failed after all retries", ("model", "error"))
+
+
+def is_retryable(error):
+    """Whether a failed request may succeed if sent again: throttling, timeouts, disconnects and 5xx."""
+    import openai
+
+    if isinstance(error, openai.APIConnectionError):  # Includes timeouts
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRY_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def retry_after(error):
+    """Seconds the service asked to wait before retrying (retry-after-ms or Retry-After), or None."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _usage(future):
+    """Total tokens of a finished chat completion future; 0 if it failed or was cancelled."""
+    if future.cancelled() or future.exception() is not None:
+        return 0
+    usage = future.result().usage
+    return usage.total_tokens if usage else 0
+
+
+class ClientPool:
+    """
+    Azure OpenAI clients and a concurrency limit shared by every helper using
+    the same API key and endpoint.
+
+    Streamlit reruns the page script on every interaction; keeping the clients
+    here means their keep-alive connections (and TLS sessions) are reused
+    across reruns and sessions instead of being set up for each question.
+
+    With a requests- and/or tokens-per-minute quota, each model deployment gets
+    a RateLimiter shared by all helpers of the pool, so requests are spaced out
+    on the client rather than rejected by the service.
+    """
+
+    def __init__(self, api_key, endpoint, api_version, max_concurrency, requests_per_minute=None,
+                 tokens_per_minute=None):
+        # Imported here so that importing this module stays cheap
+        import httpx
+        from openai import AzureOpenAI
+
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.api_version = api_version
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+
+        self.client = AzureOpenAI(
+            azure_endpoint=endpoint,
+            api_version=api_version,
+            api_key=api_key,
+            http_client=httpx.Client(limits=self._limits),
+            max_retries=0  # Retried by AzureOpenAIHelper, through the rate limiter
+        )
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self._limiters = {}  # model -> RateLimiter
+        self._executor = None  # Runs hedged requests
+        self._lock = threading.Lock()
+        # asyncio clients and semaphores belong to one event loop each
+        self._async = weakref.WeakKeyDictionary()  # event loop -> (AsyncAzureOpenAI, asyncio.Semaphore)
+        self._async_lock = threading.Lock()
+
+    def async_client(self, loop):
+        """Return the (AsyncAzureOpenAI client, asyncio.Semaphore) pair for an event loop."""
+        import asyncio
+
+        import httpx
+        from openai import AsyncAzureOpenAI
+
+        with self._async_lock:
+            pair = self._async.get(loop)
+            if pair is None:
+                client = AsyncAzureOpenAI(
+                    azure_endpoint=self.endpoint,
+                    api_version=self.api_version,
+                    api_key=self.api_key,
+                    http_client=httpx.AsyncClient(limits=self._limits),
+                    max_retries=0
+                )
+                pair = (client, asyncio.Semaphore(self.max_concurrency))
+                self._async[loop] = pair
+            return pair
+
+    def limiter(self, model):
+        """Return the RateLimiter of a model deployment, or None if no quota is set."""
+        if not (self.requests_per_minute or self.tokens_per_minute):
+            return None
+        with self._lock:
+            limiter = self._limiters.get(model)
+            if limiter is None:
+                limiter = RateLimiter(self.requests_per_minute, self.tokens_per_minute)
+                self._limiters[model] = limiter
+            return limiter
+
+    @property
+    def executor(self):
+        """Threads for hedged requests; every request in it holds one of the pool's slots."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="azure-openai")
+            return self._executor
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_client_pool(api_key, endpoint, api_version, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                    requests_per_minute=None, tokens_per_minute=None):
+    """Return the process-wide client pool for an API key and endpoint, creating it on first use."""
+    key = (api_key, endpoint, api_version, max_concurrency, requests_per_minute, tokens_per_minute)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ClientPool(api_key, endpoint, api_version, max_concurrency, requests_per_minute,
+                              tokens_per_minute)
+            _pools[key] = pool
+        return pool
 
 
 class AzureOpenAIHelper:
     """
     Helper class for interacting with the Azure OpenAI service.
     Designed to simplify API calls and integrate functionality.
+
+    Helpers are cheap to create: the underlying clients are pooled per API key
+    and endpoint (see ClientPool), and at most ``max_concurrency`` requests per
+    pool are sent at once, whether from threads or from asyncio tasks.
+
+    Throttled (429), timed-out, disconnected and 5xx requests are retried up to
+    ``max_retries`` times with jittered exponential backoff, waiting as long as
+    the service's Retry-After asks. With ``hedge_after``, a request still
+    unanswered after that many seconds is sent a second time if the pool has a
+    free slot and quota, and the first answer wins, which cuts tail latency at
+    the cost of some duplicate requests.
+
+    Latency, time to first token, token usage, retries and errors of every
+    completion are recorded in the metrics module.
     """
 
     AZURE_ENDPOINT = "https://hkust.azure-api.net"  # Replace with your endpoint
-    API_VERSION = "2024-06-01"  # API version
+    API_VERSION = "2024-10-21"  # API version; the first GA version reporting the usage of streams
     DEFAULT_MODEL = "gpt-4o-mini"  # Default model to use
 
-    def __init__(self, api_key):
+    def __init__(self, api_key, endpoint=None, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE,
+                 max_retries=DEFAULT_MAX_RETRIES, hedge_after=DEFAULT_HEDGE_AFTER):
         """
         Initialize the AzureOpenAIHelper instance.
 
         Args:
             api_key (str): Your Azure OpenAI API key.
+            endpoint (str, optional): Service endpoint. Defaults to the AZURE_OPENAI_ENDPOINT
+                environment variable, then AZURE_ENDPOINT.
+            max_concurrency (int, optional): Requests in flight at once for this key and
+                endpoint. Defaults to DEFAULT_MAX_CONCURRENCY.
+            requests_per_minute (float, optional): Request quota of the deployment, enforced on
+                the client. Defaults to the AZURE_OPENAI_RPM environment variable (no limit if unset).
+            tokens_per_minute (float, optional): Token quota of the deployment. Defaults to the
+                AZURE_OPENAI_TPM environment variable (no limit if unset).
+            max_retries (int, optional): Retries of a failed request. Defaults to DEFAULT_MAX_RETRIES.
+            hedge_after (float, optional): Seconds before a slow request is hedged. Defaults to the
+                AZURE_OPENAI_HEDGE_AFTER environment variable (no hedging if unset).
         """
-        self.client = AzureOpenAI(
-            azure_endpoint=self.AZURE_ENDPOINT,
-            api_version=self.API_VERSION,
-            api_key=api_key
+        self.endpoint = endpoint or os.environ.get("AZURE_OPENAI_ENDPOINT", self.AZURE_ENDPOINT)
+        self.pool = get_client_pool(api_key, self.endpoint, self.API_VERSION, max_concurrency,
+                                    requests_per_minute, tokens_per_minute)
+        self.client = self.pool.client
+        self.max_retries = max_retries
+        self.hedge_after = hedge_after
+
+    @staticmethod
+    def _messages(message, instruction):
+        return [
+            {"role": "system", "content": instruction},
+            {"role": "user", "content": message}
+        ]
+
+    @staticmethod
+    def _estimate_tokens(limiter, request):
+        """Tokens to reserve for a request: its prompt plus the expected completion."""
+        if limiter is None or limiter.tokens is None:
+            return 0
+        from fomc_dashboard.modules.context_packer import count_tokens
+
+        prompt = sum(count_tokens(message["content"], request["model"]) for message in request["messages"])
+        return prompt + EXPECTED_COMPLETION_TOKENS
+
+    def _retry_delay(self, error, attempt, model):
+        """Seconds to wait before retrying ``error``, or None if it should be raised."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+        LLM_RETRIES.inc(model=model, error=type(error).__name__)
+        return backoff_delay(attempt, retry_after(error))
+
+    @staticmethod
+    def _record(model, start, stream=False, usage=None, error=None, time_to_first_token=None,
+                prompt_tokens=None, completion_tokens=None):
+        """
+        Record one chat completion in the metrics and, if enabled, the per-request JSON log.
+
+        ``prompt_tokens`` and ``completion_tokens`` stand in for a missing ``usage``,
+        e.g. counted locally for a stream that ended without its usage chunk.
+        """
+        seconds = time.perf_counter() - start
+        prompt_tokens = getattr(usage, "prompt_tokens", prompt_tokens)
+        completion_tokens = getattr(usage, "completion_tokens", completion_tokens)
+
+        if error is None:
+            LLM_SECONDS.observe(seconds, model=model, stream="true" if stream else "false")
+        else:
+            LLM_ERRORS.inc(model=model, error=type(error).__name__)
+        if time_to_first_token is not None:
+            LLM_FIRST_TOKEN_SECONDS.observe(time_to_first_token, model=model)
+        if prompt_tokens:
+            LLM_TOKENS.inc(prompt_tokens, model=model, kind="prompt")
+        if completion_tokens:
+            LLM_TOKENS.inc(completion_tokens, model=model, kind="completion")
+
+        metrics.log_event(
+            "chat_completion",
+            model=model,
+            stream=stream,
+            seconds=round(seconds, 4),
+            time_to_first_token=None if time_to_first_token is None else round(time_to_first_token, 4),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            error=None if error is None else f"{type(error).__name__}: {error}"
         )
 
+    @staticmethod
+    def _count_usage(model, messages, completion):
+        """(prompt, completion) tokens counted locally, or (None, None) if the encoding is unavailable."""
+        from fomc_dashboard.modules.context_packer import count_tokens
+
+        try:
+            prompt = sum(count_tokens(message["content"], model) for message in messages)
+            return prompt, count_tokens(completion, model)
+        except Exception as e:
+            print(f"Could not count the tokens of a streamed completion: {e}")
+            return None, None
+
+    def _submit(self, request):
+        """Send a request in the pool's executor; the caller has taken a slot, released when it finishes."""
+        future = self.pool.executor.submit(self.client.chat.completions.create, **request)
+        future.add_done_callback(lambda _: self.pool.slots.release())
+        return future
+
+    def _send(self, request, limiter, estimate):
+        """Send one attempt, hedged with a duplicate if it is still unanswered after hedge_after seconds."""
+        if request.get("stream"):
+            # Streams hold the caller's slot until they are consumed, and are not hedged
+            return self.client.chat.completions.create(**request)
+        if not self.hedge_after:
+            with self.pool.slots:
+                return self.client.chat.completions.create(**request)
+
+        self.pool.slots.acquire()
+        primary = self._submit(request)
+        try:
+            return primary.result(timeout=self.hedge_after)
+        except FutureTimeoutError:
+            pass
+        # Only hedge with spare capacity: under load a duplicate would just queue
+        if not self.pool.slots.acquire(blocking=False):
+            return primary.result()
+        if limiter is not None and not limiter.try_acquire(estimate):
+            self.pool.slots.release()
+            return primary.result()
+
+        hedge = self._submit(request)
+        done, _ = wait([primary, hedge], return_when=FIRST_COMPLETED)
+        first = done.pop()
+        winner = first if first.exception() is None else (hedge if first is primary else primary)
+        if limiter is not None:
+            # The caller settles one reservation with the winner's usage; the hedge's is
+            # settled with the loser's, which still runs to completion in its thread
+            (hedge if winner is primary else primary).add_done_callback(
+                lambda loser: limiter.settle(estimate, _usage(loser)))
+        return winner.result()
+
+    def _send_with_retries(self, request):
+        """
+        Send a request through the rate limiter, with retries and optional hedging.
+
+        Returns:
+            tuple: (response, settle); call settle(total tokens, or None if unknown)
+            once the usage is known to correct the request's token reservation.
+        """
+        limiter = self.pool.limiter(request["model"])
+        estimate = self._estimate_tokens(limiter, request)
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire(estimate)
+            try:
+                response = self._send(request, limiter, estimate)
+            except Exception as e:
+                if limiter is not None:
+                    limiter.settle(estimate, 0)  # A rejected or dropped attempt used no tokens
+                delay = self._retry_delay(e, attempt, request["model"])
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            if limiter is None:
+                return response, lambda tokens: None
+            return response, lambda tokens: limiter.settle(estimate, tokens)
+
+    def _create(self, **request):
+        """Create a chat completion through the rate limiter, with retries and optional hedging."""
+        response, settle = self._send_with_retries(request)
+        settle(response.usage.total_tokens if response.usage else None)
+        return response
+
+    def _open_stream(self, **request):
+        """
+        Open a streamed chat completion, retried like _create.
+
+        Returns:
+            tuple: (stream, settle); the stream's usage is only known once it has been
+            consumed, so the caller passes it to settle(total tokens) when it ends.
+        """
+        return self._send_with_retries({**request, "stream": True})
+
+    async def _asend(self, client, slots, request, limiter, estimate):
+        """Async variant of _send; the losing request of a hedge is cancelled."""
+        import asyncio
+
+        async def send():
+            async with slots:
+                return await client.chat.completions.create(**request)
+
+        if not self.hedge_after:
+            return await send()
+
+        primary = asyncio.ensure_future(send())
+        done, _ = await asyncio.wait([primary], timeout=self.hedge_after)
+        if done or slots.locked() or (limiter is not None and not limiter.try_acquire(estimate)):
+            return await primary
+
+        hedge = asyncio.ensure_future(send())
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            return await primary  # Both failed: raise the primary's error
+        finally:
+            for task in pending:
+                task.cancel()
+            if limiter is not None:
+                # The losing request was cancelled (or failed): return the hedge's token reservation
+                limiter.settle(estimate, 0)
+
+    async def _acreate(self, **request):
+        """Async variant of _create."""
+        import asyncio
+
+        client, slots = self.pool.async_client(asyncio.get_running_loop())
+        limiter = self.pool.limiter(request["model"])
+        estimate = self._estimate_tokens(limiter, request)
+        attempt = 0
+        while True:
+            if limiter is not None:
+                await limiter.aacquire(estimate)
+            try:
+                response = await self._asend(client, slots, request, limiter, estimate)
+            except Exception as e:
+                if limiter is not None:
+                    limiter.settle(estimate, 0)  # A rejected or dropped attempt used no tokens
+                delay = self._retry_delay(e, attempt, request["model"])
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            if limiter is not None:
+                limiter.settle(estimate, response.usage.total_tokens if response.usage else None)
+            return response
+
     def get_response(self, message, instruction, model=None, temperature=1.0):
         """
         Send a chat completion request to Azure OpenAI.
@@ -35,28 +454,125 @@ class AzureOpenAIHelper:
             temperature (float, optional): Sampling temperature. Defaults to 1.0.
 
         Returns:
-            str: AI-generated response.
+            str: AI-generated response, or None if the request failed after all retries.
         """
         model = model or self.DEFAULT_MODEL
+        start = time.perf_counter()
 
         try:
-            response = self.client.chat.completions.create(
+            response = self._create(
                 model=model,
                 temperature=temperature,
-                messages=[
-                    {"role": "system", "content": instruction},
-                    {"role": "user", "content": message}
-                ]
+                messages=self._messages(message, instruction)
             )
-            # Print token usage
-            print(f"Token Usage: {response.usage}")
-            # Return the response content
-            return response.choices[0].message.content
+        except Exception as e:
+            self._record(model, start, error=e)
+            print(f"Error during API call: {e}")
+            return None
 
+        # Record latency and token usage
+        self._record(model, start, usage=response.usage)
+        # Return the response content
+        return response.choices[0].message.content
+
+    def stream_response(self, message, instruction, model=None, temperature=1.0, timings=None):
+        """
+        Stream a chat completion, yielding the text as it is generated.
+
+        Time to first token, total latency and token usage are recorded in the metrics
+        when the stream ends, and the timings are stored in ``timings`` if a dict is
+        passed. The usage comes from the stream's last chunk; if the service leaves it
+        out, the tokens are counted locally. Opening the stream is
+        retried like get_response; once text has been yielded, a failure is
+        raised rather than retried.
+
+        Args:
+            message (str): User's input message.
+            instruction (str): System's role or guiding instruction.
+            model (str, optional): Model to use. Defaults to DEFAULT_MODEL.
+            temperature (float, optional): Sampling temperature. Defaults to 1.0.
+            timings (dict, optional): Receives "time_to_first_token" and "total" in seconds.
+
+        Yields:
+            str: Pieces of the response, in order.
+
+        Raises:
+            Exception: API errors are raised to the caller, which may already have
+            shown part of the answer.
+        """
+        model = model or self.DEFAULT_MODEL
+        timings = {} if timings is None else timings
+        start = time.perf_counter()
+
+        messages = self._messages(message, instruction)
+        error, pieces, usage, settle = None, [], None, None
+        with self.pool.slots:
+            try:
+                stream, settle = self._open_stream(
+                    model=model,
+                    temperature=temperature,
+                    messages=messages,
+                    stream_options={"include_usage": True}
+                )
+                try:
+                    for chunk in stream:
+                        # The usage comes in a last chunk of its own, without choices
+                        if getattr(chunk, "usage", None) is not None:
+                            usage = chunk.usage
+                        # Azure sends a first chunk with content-filter results and no choices
+                        if not chunk.choices or not chunk.choices[0].delta.content:
+                            continue
+                        if "time_to_first_token" not in timings:
+                            timings["time_to_first_token"] = time.perf_counter() - start
+                        pieces.append(chunk.choices[0].delta.content)
+                        yield pieces[-1]
+                finally:
+                    stream.close()
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                timings["total"] = time.perf_counter() - start
+                prompt_tokens = completion_tokens = None
+                if settle is not None:
+                    # The stream was opened: it used its prompt and the text received so far
+                    total_tokens = getattr(usage, "total_tokens", None)
+                    if usage is None:
+                        prompt_tokens, completion_tokens = self._count_usage(model, messages, "".join(pieces))
+                        if prompt_tokens is not None:
+                            total_tokens = prompt_tokens + completion_tokens
+                    settle(total_tokens)
+                self._record(model, start, stream=True, usage=usage, error=error,
+                             time_to_first_token=timings.get("time_to_first_token"), prompt_tokens=prompt_tokens,
+                             completion_tokens=completion_tokens)
+
+    async def aget_response(self, message, instruction, model=None, temperature=1.0):
+        """
+        Async variant of get_response, for serving many chats from one event loop.
+
+        Requests beyond the pool's concurrency limit wait for a free slot
+        instead of opening more connections.
+
+        Returns:
+            str: AI-generated response, or None if the request failed after all retries.
+        """
+        model = model or self.DEFAULT_MODEL
+        start = time.perf_counter()
+
+        try:
+            response = await self._acreate(
+                model=model,
+                temperature=temperature,
+                messages=self._messages(message, instruction)
+            )
         except Exception as e:
+            self._record(model, start, error=e)
             print(f"Error during API call: {e}")
             return None
 
+        self._record(model, start, usage=response.usage)
+        return response.choices[0].message.content
+
 
 # Example usage
 if __name__ == "__main__":
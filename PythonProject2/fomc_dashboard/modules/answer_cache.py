@@ -0,0 +1,214 @@
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.9  # Cosine similarity; MiniLM paraphrases of one question mostly score above this
+DEFAULT_TTL = 900  # Seconds; answers about a fresh announcement go stale quickly
+DEFAULT_MAX_SIZE = 2048
+
+
+def context_key(results):
+    """
+    Identify the context an answer was generated from.
+
+    Combines the chunk ids with a digest of their text, so that a rebuilt index
+    reusing the same ids for different chunks does not match.
+
+    Args:
+        results (list[dict]): Retrieval results with "id" and "text", in prompt order.
+
+    Returns:
+        tuple: Hashable key for SemanticAnswerCache.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for result in results:
+        digest.update(result["text"].encode("utf-8"))
+        digest.update(b"\0")
+    return tuple(result["id"] for result in results), digest.digest()
+
+
+class _Entry:
+    __slots__ = ("key", "vector", "answer", "query", "created", "expires_at", "hits", "last_hit")
+
+    def __init__(self, key, vector, answer, query, now, ttl):
+        self.key = key
+        self.vector = vector
+        self.answer = answer
+        self.query = query
+        self.created = now
+        self.expires_at = now + ttl if ttl is not None else None
+        self.hits = 0
+        self.last_hit = None
+
+
+class SemanticAnswerCache:
+    """
+    Thread-safe in-process cache of chat answers, looked up by question meaning.
+
+    An answer is served again when a new question's embedding is within
+    ``threshold`` cosine similarity of a cached question's and the retrieved
+    context (see context_key) and scope (instruction, model) are identical, so
+    paraphrases share an answer but a question whose retrieval changed does not.
+    Entries expire after ``ttl`` seconds and the least recently used are evicted
+    beyond ``max_size``. Each entry counts its own hits, next to the overall
+    hit/miss counters.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, ttl=DEFAULT_TTL, max_size=DEFAULT_MAX_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            threshold (float, optional): Minimum cosine similarity for a hit. Defaults to DEFAULT_THRESHOLD.
+            ttl (float, optional): Seconds an answer stays valid. None means no expiry.
+            max_size (int, optional): Maximum number of answers. Defaults to DEFAULT_MAX_SIZE.
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # entry id -> _Entry, least recently used first
+        self._groups = {}  # (context key, scope) -> {entry id: _Entry}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(embedding):
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _remove(self, entry_id):
+        entry = self._entries.pop(entry_id)
+        group = self._groups[entry.key]
+        del group[entry_id]
+        if not group:
+            del self._groups[entry.key]
+
+    def _closest(self, key, vector, now):
+        """Return (entry id, similarity) of the most similar live entry in a group, dropping expired ones."""
+        group = self._groups.get(key)
+        if not group:
+            return None, -1.0
+        for entry_id in [entry_id for entry_id, entry in group.items()
+                         if entry.expires_at is not None and entry.expires_at <= now]:
+            self._remove(entry_id)
+        if key not in self._groups:
+            return None, -1.0
+
+        # Groups are small: only questions that retrieved exactly this context
+        entry_ids = list(group)
+        similarities = np.stack([group[entry_id].vector for entry_id in entry_ids]) @ vector
+        best = int(np.argmax(similarities))
+        return entry_ids[best], float(similarities[best])
+
+    def get(self, embedding, context, scope=None):
+        """
+        Return the cached answer for a similar question over the same context, or None.
+
+        Args:
+            embedding (np.ndarray): Query embedding, e.g. from embed_query.
+            context (tuple): context_key of the retrieved chunks.
+            scope (hashable, optional): Anything else the answer depends on, e.g. (instruction, model).
+        """
+        vector = self._unit(embedding)
+        now = time.monotonic()
+        with self._lock:
+            entry_id, similarity = self._closest((context, scope), vector, now)
+            if entry_id is None or similarity < self.threshold:
+                self.misses += 1
+                return None
+            entry = self._entries[entry_id]
+            entry.hits += 1
+            entry.last_hit = now
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return entry.answer
+
+    def put(self, embedding, context, answer, scope=None, query=None):
+        """
+        Store an answer, evicting the least recently used one if full.
+
+        A cached question within the threshold (e.g. a paraphrase that missed
+        while this answer was being generated) is replaced rather than duplicated.
+
+        Args:
+            embedding (np.ndarray): Query embedding.
+            context (tuple): context_key of the chunks the answer was generated from.
+            answer (str): Answer to cache.
+            scope (hashable, optional): As for get.
+            query (str, optional): Question text, only kept for entry_stats.
+        """
+        key = (context, scope)
+        vector = self._unit(embedding)
+        now = time.monotonic()
+        with self._lock:
+            entry_id, similarity = self._closest(key, vector, now)
+            if entry_id is not None and similarity >= self.threshold:
+                self._remove(entry_id)
+
+            entry_id = next(self._ids)
+            self._entries[entry_id] = _Entry(key, vector, answer, query, now, self.ttl)
+            self._groups.setdefault(key, {})[entry_id] = self._entries[entry_id]
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+    def entry_stats(self, limit=20):
+        """
+        Return the most-hit entries, to see which questions the cache is absorbing.
+
+        Returns:
+            list[dict]: "query", "hits", "age_s" and "since_last_hit_s" per entry, most hits first.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry.hits, reverse=True)[:limit]
+            return [
+                {
+                    "query": entry.query,
+                    "hits": entry.hits,
+                    "age_s": round(now - entry.created, 1),
+                    "since_last_hit_s": None if entry.last_hit is None else round(now - entry.last_hit, 1),
+                }
+                for entry in entries
+            ]
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_answer_cache():
+    """Return the process-wide answer cache, shared by every session and helper."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = SemanticAnswerCache()
+    return _shared
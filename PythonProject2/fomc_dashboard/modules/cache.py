@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with an optional time-to-live.
+
+    Keeps hit/miss counters so callers can report how effective the cache is.
+    """
+
+    def __init__(self, max_size=1024, ttl=None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int, optional): Maximum number of entries. Defaults to 1024.
+            ttl (float, optional): Seconds an entry stays valid. None means no expiry.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key``, or ``default`` if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and (entry[0] is None or entry[0] > time.monotonic()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not _MISSING:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Store ``value`` under ``key``, evicting the least recently used entry if full."""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
@@ -0,0 +1,92 @@
+import os
+import threading
+
+from fomc_dashboard.modules.embedding_cache import normalize_text
+
+# Tokens of retrieved text per prompt, whatever top_k is
+DEFAULT_CONTEXT_TOKENS = int(os.environ.get("RAG_CONTEXT_TOKENS", "1500"))
+DEFAULT_MODEL = "gpt-4o-mini"
+SEPARATOR = "\n"
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def get_encoding(model=DEFAULT_MODEL):
+    """
+    Return the tiktoken encoding of a chat model, loading it on first use.
+
+    Unknown deployment names fall back to o200k_base, the encoding of the gpt-4o family.
+    """
+    encoding = _encodings.get(model)
+    if encoding is None:
+        import tiktoken
+
+        with _encodings_lock:
+            encoding = _encodings.get(model)
+            if encoding is None:
+                try:
+                    encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    encoding = tiktoken.get_encoding("o200k_base")
+                _encodings[model] = encoding
+    return encoding
+
+
+def count_tokens(text, model=DEFAULT_MODEL):
+    """Number of tokens ``text`` takes in a prompt for ``model``."""
+    return len(get_encoding(model).encode(text, disallowed_special=()))
+
+
+def pack_context(results, max_tokens=DEFAULT_CONTEXT_TOKENS, model=DEFAULT_MODEL, encoding=None):
+    """
+    Pack retrieved chunks into a context string of at most ``max_tokens`` tokens.
+
+    Chunks are taken in relevance (result) order. A chunk is skipped if its
+    normalized text repeats or is contained in a chunk already packed, or if it
+    would overflow the budget (a shorter, less relevant chunk may still fit).
+    If even the most relevant chunk is over budget, it is cut to fit so that the
+    context is never empty.
+
+    Args:
+        results (list[dict]): Retrieval results with "text", most relevant first.
+        max_tokens (int, optional): Token budget for the context. Defaults to DEFAULT_CONTEXT_TOKENS.
+        model (str, optional): Chat model whose tokenizer counts the tokens. Defaults to DEFAULT_MODEL.
+        encoding (optional): Tokenizer with ``encode``/``decode``; defaults to the model's tiktoken encoding.
+
+    Returns:
+        tuple: (context text, list of the results packed, in order, number of tokens).
+    """
+    encoding = encoding or get_encoding(model)
+
+    def encode(text):
+        return encoding.encode(text, disallowed_special=())
+
+    separator_tokens = len(encode(SEPARATOR))
+    packed, texts, seen, used = [], [], [], 0
+    for result in results:
+        text = normalize_text(result["text"])
+        if not text or any(text in other for other in seen):
+            continue
+        tokens = len(encode(text)) + (separator_tokens if packed else 0)
+        if used + tokens > max_tokens:
+            continue
+        packed.append(result)
+        texts.append(text)
+        seen.append(text)
+        used += tokens
+
+    if not packed and results and max_tokens > 0:
+        result = results[0]
+        text = encoding.decode(encode(normalize_text(result["text"]))[:max_tokens])
+        packed, texts = [dict(result, text=text, truncated=True)], [text]
+
+    context = SEPARATOR.join(texts)
+    # Tokens can merge across a separator; drop chunks from the end until the exact count fits
+    tokens = len(encode(context))
+    while tokens > max_tokens and len(packed) > 1:
+        packed.pop()
+        texts.pop()
+        context = SEPARATOR.join(texts)
+        tokens = len(encode(context))
+    return context, packed, tokens
@@ -1,6 +1,19 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import pandas as pd
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from fomc_dashboard.modules.rate_history import parse_rate_actions, read_action_tables
 
 # Define the base URL for FOMC minutes
 BASE_URL = "https://www.federalreserve.gov/monetarypolicy/files/"
@@ -8,36 +21,48 @@ BASE_URL = "https://www.federalreserve.gov/monetarypolicy/files/"
 # Wikipedia page with FOMC meeting dates
 WIKI_URL = "https://en.wikipedia.org/wiki/History_of_Federal_Open_Market_Committee_actions"
 
+DEFAULT_CACHE_DIR = os.environ.get("FOMC_DOCUMENT_CACHE", "fomc_documents")
+MAX_WORKERS = 16  # Downloads in flight at once
+PER_HOST_LIMIT = 4  # Connections to one host at once; the Fed's servers throttle aggressive crawlers
+TIMEOUT = 30  # Seconds to connect, and between bytes of a response
+CHUNK_SIZE = 1 << 16
+USER_AGENT = "RateRadar document sync (+https://github.com/ouyand233/raterador)"
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT,                 -- Content hash; the file is objects/<sha256[:2]>/<sha256>
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER,
+    status INTEGER NOT NULL,     -- HTTP status of the last check (304 counts as the stored file)
+    checked REAL NOT NULL        -- Unix time of the last check
+);
+CREATE TABLE IF NOT EXISTS crawls (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    finished REAL                -- NULL while the crawl is running, or if it stopped before the end
+);
+"""
+# Statuses that settle a URL for the current crawl; anything else is retried when the crawl resumes
+SETTLED_STATUSES = (200, 304, 404, 410)
+
 
 def get_fomc_meeting_dates(wiki_url):
-    """Scrape FOMC meeting dates from Wikipedia."""
+    """Scrape FOMC meeting dates from Wikipedia, as datetimes, oldest first."""
     response = requests.get(wiki_url)
     if response.status_code != 200:
         print(f"Failed to fetch Wikipedia page, status code: {response.status_code}")
         return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    # Extract the meeting dates from the appropriate table
-    # (Assuming the meeting dates are in a specific table on the page)
-    tables = soup.find_all("table", {"class": "wikitable"})
+    # Rate decision tables, parsed into typed columns (see rate_history.parse_rate_actions)
+    tables = [parse_rate_actions(table) for table in read_action_tables(response.text)]
     if not tables:
         print("No tables found on the page.")
         return []
 
-    meeting_dates = []
-    for table in tables:
-        rows = table.find_all("tr")[1:]  # Skip the header row
-        for row in rows:
-            cells = row.find_all("td")
-            if cells:
-                date_text = cells[0].get_text(strip=True)
-                try:
-                    # Parse the date text into a datetime object
-                    meeting_date = datetime.strptime(date_text, "%B %d, %Y")
-                    meeting_dates.append(meeting_date)
-                except ValueError:
-                    continue  # Skip rows that do not have a valid date
-    return meeting_dates
+    meeting_dates = pd.concat(tables)["date"].drop_duplicates().sort_values()
+    return list(meeting_dates.dt.to_pydatetime())
 
 
 def generate_fomc_minutes_urls(meeting_dates):
@@ -55,13 +80,302 @@ def save_urls_to_file(urls, filename):
         file.write("\n".join(urls))
 
 
-# Fetch meeting dates from Wikipedia
-meeting_dates = get_fomc_meeting_dates(WIKI_URL)
+def make_session(pool_size=MAX_WORKERS, retries=3):
+    """
+    Create a requests session whose connections are pooled and reused across threads.
+
+    Connection errors and 429/5xx responses are retried ``retries`` times with
+    exponential backoff, honoring Retry-After.
+    """
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=("GET",), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+class DocumentCache:
+    """
+    Local copy of downloaded documents, stored by content hash.
+
+    Each document is written once under ``objects/`` whatever URL it came from,
+    and linked under ``files/`` by the file name of its URL (e.g.
+    files/fomcminutes20231213.pdf) for ingestion.find_pdfs and
+    ingestion.document_metadata. ``state.db`` keeps each URL's content hash and
+    validators (ETag, Last-Modified) for conditional requests, and the crawls,
+    so that an interrupted crawl can be resumed.
+
+    Only the thread that opened the cache may use it; downloads run in worker
+    threads and are recorded from the calling thread.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        """
+        Open (or create) a document cache.
+
+        Args:
+            directory (str, optional): Cache directory. Defaults to DEFAULT_CACHE_DIR
+                (env FOMC_DOCUMENT_CACHE, "fomc_documents").
+        """
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "files"), exist_ok=True)
+        self._connection = sqlite3.connect(os.path.join(directory, "state.db"))
+        self._connection.executescript(STATE_SCHEMA)
+
+    def close(self):
+        """Close the state database."""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def object_path(self, sha256):
+        """Path of the document with this content hash."""
+        return os.path.join(self.directory, "objects", sha256[:2], sha256)
+
+    def file_path(self, url):
+        """Path under files/ where the document of ``url`` is linked."""
+        return os.path.join(self.directory, "files", os.path.basename(urlsplit(url).path) or "index")
+
+    def entries(self):
+        """URL -> {"sha256", "etag", "last_modified", "size", "status", "checked"} for every URL seen."""
+        cursor = self._connection.execute(
+            "SELECT url, sha256, etag, last_modified, size, status, checked FROM documents"
+        )
+        columns = ("sha256", "etag", "last_modified", "size", "status", "checked")
+        return {row[0]: dict(zip(columns, row[1:])) for row in cursor}
+
+    def path(self, url):
+        """Local path of the document downloaded from ``url``, or None if it is not in the cache."""
+        row = self._connection.execute("SELECT sha256 FROM documents WHERE url = ?", (url,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        path = self.file_path(url)
+        return path if os.path.exists(path) else None
+
+    def store(self, chunks):
+        """
+        Write a document from an iterable of byte chunks; return (sha256, size).
+
+        The data goes to a temporary file that is renamed into place, so a crash
+        mid-download never leaves a partial object behind.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.directory, "objects"), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+            sha256 = digest.hexdigest()
+            path = self.object_path(sha256)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return sha256, size
+
+    def has_object(self, sha256):
+        """Whether the document with this content hash is on disk."""
+        return sha256 is not None and os.path.exists(self.object_path(sha256))
+
+    def link(self, url, sha256):
+        """Point files/<name of url> at the object (hard link, or a copy where links are not supported)."""
+        path = self.file_path(url)
+        if os.path.exists(path) and os.path.samefile(path, self.object_path(sha256)):
+            return path
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.link(self.object_path(sha256), tmp_path)
+        except OSError:
+            import shutil
+
+            shutil.copyfile(self.object_path(sha256), tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def record(self, url, status, sha256=None, etag=None, last_modified=None, size=None):
+        """Save the outcome of checking ``url``; a 304 keeps the stored hash and validators it does not resend."""
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO documents (url, sha256, etag, last_modified, size, status, checked) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET sha256 = COALESCE(excluded.sha256, sha256), "
+                "etag = COALESCE(excluded.etag, etag), last_modified = COALESCE(excluded.last_modified, last_modified), "
+                "size = COALESCE(excluded.size, size), status = excluded.status, checked = excluded.checked",
+                (url, sha256, etag, last_modified, size, status, time.time())
+            )
+
+    def start_crawl(self, resume=True):
+        """
+        Start a crawl, or resume the last one if it did not finish.
+
+        Returns:
+            tuple: (crawl id, start time, whether an unfinished crawl was resumed).
+        """
+        row = self._connection.execute("SELECT id, started, finished FROM crawls ORDER BY id DESC LIMIT 1").fetchone()
+        if resume and row is not None and row[2] is None:
+            return row[0], row[1], True
+        started = time.time()
+        with self._connection:
+            cursor = self._connection.execute("INSERT INTO crawls (started) VALUES (?)", (started,))
+        return cursor.lastrowid, started, False
+
+    def finish_crawl(self, crawl_id):
+        """Mark a crawl as complete, so the next sync starts a new one."""
+        with self._connection:
+            self._connection.execute("UPDATE crawls SET finished = ? WHERE id = ?", (time.time(), crawl_id))
+
+
+def _fetch(session, url, entry, have_object, store, slot, timeout):
+    """
+    Download one URL in a worker thread, conditionally if its document is already cached.
+
+    Args:
+        entry (dict): The URL's state in the cache, or None.
+        have_object (bool): Whether the cached document is still on disk.
+        store (callable): DocumentCache.store, called with the body's chunks on a 200.
+        slot (threading.Semaphore): Connection slot of the URL's host.
+
+    Returns:
+        dict: "status", "etag" and "last_modified", plus "sha256" and "size" on a
+        200; "status" is None and "error" is set when the request failed.
+    """
+    headers = {}
+    if entry and have_object:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        with slot:
+            with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                result = {
+                    "status": response.status_code,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+                if response.status_code == 200:
+                    result["sha256"], result["size"] = store(response.iter_content(CHUNK_SIZE))
+                return result
+    except (requests.RequestException, OSError) as e:
+        return {"status": None, "error": str(e)}
+
+
+def sync_documents(urls, cache_dir=DEFAULT_CACHE_DIR, max_workers=MAX_WORKERS, per_host=PER_HOST_LIMIT,
+                   resume=True, session=None, timeout=TIMEOUT):
+    """
+    Download documents into the local cache, transferring only what changed.
+
+    URLs already in the cache are requested with If-None-Match /
+    If-Modified-Since, so unchanged documents cost a 304 and no body. Up to
+    ``max_workers`` downloads run at once over one pooled session, with at most
+    ``per_host`` to any single host. If the previous crawl stopped before the
+    end (crash, Ctrl-C, failed downloads), URLs it already settled are skipped
+    and only the rest are requested; pass ``resume=False`` to check everything.
+
+    Args:
+        urls (iterable[str]): Document URLs.
+        cache_dir (str, optional): Cache directory (see DocumentCache). Defaults to DEFAULT_CACHE_DIR.
+        max_workers (int, optional): Concurrent downloads. Defaults to MAX_WORKERS.
+        per_host (int, optional): Concurrent downloads per host. Defaults to PER_HOST_LIMIT.
+        resume (bool, optional): Resume an unfinished crawl. Defaults to True.
+        session (requests.Session, optional): Session to use. Defaults to make_session(max_workers).
+        timeout (float, optional): Request timeout in seconds. Defaults to TIMEOUT.
+
+    Returns:
+        dict: Counts of "urls", "downloaded", "unchanged", "missing", "failed" and
+        "skipped" (settled earlier in a resumed crawl), "bytes" downloaded and "seconds".
+    """
+    start = time.perf_counter()
+    urls = list(dict.fromkeys(urls))
+    session = session or make_session(max_workers)
+    stats = {"urls": len(urls), "downloaded": 0, "unchanged": 0, "missing": 0, "failed": 0, "skipped": 0, "bytes": 0}
+
+    with DocumentCache(cache_dir) as cache:
+        crawl_id, started, resumed = cache.start_crawl(resume)
+        entries = cache.entries()
+        pending = []
+        for url in urls:
+            entry = entries.get(url)
+            if resumed and entry and entry["checked"] >= started and entry["status"] in SETTLED_STATUSES:
+                stats["skipped"] += 1
+            else:
+                pending.append(url)
+
+        slots = {host: threading.BoundedSemaphore(per_host) for host in {urlsplit(url).netloc for url in pending}}
+        with ThreadPoolExecutor(max_workers) as pool:
+            futures = {
+                pool.submit(_fetch, session, url, entries.get(url),
+                            cache.has_object((entries.get(url) or {}).get("sha256")),
+                            cache.store,  # Only writes files, so it is safe from the worker threads
+                            slots[urlsplit(url).netloc], timeout): url
+                for url in pending
+            }
+            for future in as_completed(futures):
+                url = futures[future]
+                result = future.result()
+                status = result["status"]
+                if status == 200:
+                    cache.record(url, 200, result["sha256"], result["etag"], result["last_modified"], result["size"])
+                    cache.link(url, result["sha256"])
+                    stats["downloaded"] += 1
+                    stats["bytes"] += result["size"]
+                elif status == 304:
+                    cache.record(url, 304, etag=result["etag"], last_modified=result["last_modified"])
+                    cache.link(url, entries[url]["sha256"])
+                    stats["unchanged"] += 1
+                elif status in (404, 410):
+                    cache.record(url, status)
+                    stats["missing"] += 1
+                else:
+                    print(f"Failed to download {url}: {result.get('error') or f'status code {status}'}")
+                    stats["failed"] += 1
+
+        if not stats["failed"]:
+            cache.finish_crawl(crawl_id)
+
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    return stats
+
 
-# Generate URLs for FOMC minutes
-fomc_urls = generate_fomc_minutes_urls(meeting_dates)
+if __name__ == "__main__":
+    # python -m fomc_dashboard.modules.data_fetcher [--urls fomc_minutes_urls.txt] [--cache fomc_documents]
+    #     [--workers 16] [--per-host 4] [--no-resume] [--no-download]
+    args = sys.argv[1:]
+    options = {}
+    for flag, key in (("--urls", "urls_file"), ("--cache", "cache_dir"), ("--workers", "max_workers"),
+                      ("--per-host", "per_host")):
+        if flag in args:
+            position = args.index(flag)
+            options[key] = args[position + 1]
+            del args[position:position + 2]
+    for key in ("max_workers", "per_host"):
+        if key in options:
+            options[key] = int(options[key])
+    options["resume"] = "--no-resume" not in args
+    urls_file = options.pop("urls_file", None)
 
-# Save URLs to a file
-save_urls_to_file(fomc_urls, "fomc_minutes_urls.txt")
+    if urls_file:
+        with open(urls_file, "r", encoding="utf-8") as file:
+            fomc_urls = [line.strip() for line in file if line.strip()]
+    else:
+        # Fetch meeting dates from Wikipedia and generate the URLs of their minutes
+        fomc_urls = generate_fomc_minutes_urls(get_fomc_meeting_dates(WIKI_URL))
+        save_urls_to_file(fomc_urls, "fomc_minutes_urls.txt")
+        print(f"Generated {len(fomc_urls)} FOMC minutes URLs and saved to 'fomc_minutes_urls.txt'.")
 
-print(f"Generated {len(fomc_urls)} FOMC minutes URLs and saved to 'fomc_minutes_urls.txt'.")
+    if "--no-download" not in args:
+        print(f"Document sync: {sync_documents(fomc_urls, **options)}")
@@ -0,0 +1,143 @@
+import hashlib
+import sqlite3
+import time
+import unicodedata
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_hash BLOB NOT NULL,     -- sha256 of the normalized text
+    vector BLOB NOT NULL,        -- float32 bytes
+    last_used REAL NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+"""
+
+SQLITE_MAX_PARAMS = 500  # Stay well below SQLite's bound-parameter limit
+
+
+def normalize_text(text):
+    """Normalize text so that re-extracted paragraphs with different whitespace hash the same."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_hash(text):
+    """sha256 digest of the normalized text."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    Persistent cache of paragraph embeddings keyed by (model name, normalized text hash).
+
+    Only paragraphs missing from the cache are sent to the model, so rebuilding
+    an index after a chunking or metadata change re-encodes just the new text.
+    The cache holds at most ``max_entries`` vectors; the least recently used are
+    evicted first.
+    """
+
+    def __init__(self, path="embedding_cache.db", model_name="sentence-transformers/all-MiniLM-L6-v2",
+                 max_entries=2_000_000):
+        """
+        Open (or create) an embedding cache.
+
+        Args:
+            path (str, optional): SQLite file for the cache. Defaults to "embedding_cache.db".
+            model_name (str, optional): Name of the model whose vectors are cached.
+            max_entries (int, optional): Maximum number of cached vectors. Defaults to 2,000,000
+                (about 3 GB of 384-dim float32 vectors).
+        """
+        self.path = path
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the underlying SQLite connection."""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _lookup(self, hashes):
+        found = {}
+        for start in range(0, len(hashes), SQLITE_MAX_PARAMS):
+            block = hashes[start:start + SQLITE_MAX_PARAMS]
+            cursor = self._connection.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN "
+                f"({','.join('?' * len(block))})",
+                [self.model_name, *block]
+            )
+            for digest, vector in cursor:
+                found[digest] = np.frombuffer(vector, dtype="float32")
+        return found
+
+    def encode(self, texts, encode_fn):
+        """
+        Return embeddings for ``texts``, encoding only the texts not already cached.
+
+        Args:
+            texts (list[str]): Paragraphs to embed.
+            encode_fn (callable): Encodes a list of strings into an (n, dimension) array,
+                e.g. ``model.encode``.
+
+        Returns:
+            np.ndarray: float32 array of shape (len(texts), dimension), in input order.
+        """
+        hashes = [text_hash(text) for text in texts]
+        vectors = self._lookup(list(set(hashes)))
+
+        # Encode each distinct missing text once
+        missing = {}
+        for digest, text in zip(hashes, texts):
+            if digest not in vectors and digest not in missing:
+                missing[digest] = text
+
+        if missing:
+            encoded = np.asarray(encode_fn(list(missing.values())), dtype="float32")
+            for digest, vector in zip(missing, encoded):
+                vectors[digest] = vector
+
+        now = time.time()
+        with self._connection:
+            if missing:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                    [(self.model_name, digest, vectors[digest].tobytes(), now) for digest in missing]
+                )
+
+            hit_digests = [digest for digest in set(hashes) if digest not in missing]
+            self._connection.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                [(now, self.model_name, digest) for digest in hit_digests]
+            )
+        self.hits += len(hashes) - sum(1 for digest in hashes if digest in missing)
+        self.misses += len(missing)
+
+        if missing:
+            self.evict()
+        return np.vstack([vectors[digest] for digest in hashes]) if hashes else np.empty((0, 0), "float32")
+
+    def evict(self):
+        """Drop the least recently used vectors beyond max_entries."""
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM embeddings WHERE (model, text_hash) IN "
+                "(SELECT model, text_hash FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+        return excess
@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from fomc_dashboard.modules.sentence_transformer import MODEL_NAME
+
+SHARD_SIZE = 64  # Chunks sent to a worker at a time
+
+# Set in each worker process by _init_worker
+_worker_model = None
+
+
+def load_model(model_name=MODEL_NAME):
+    """Load a SentenceTransformer model (the default loader of the pool workers)."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def _init_worker(loader, model_name, threads):
+    """Load the model once per worker process and limit its torch threads."""
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_model = loader(model_name)
+
+
+def _encode_shard(texts):
+    return np.asarray(_worker_model.encode(texts, batch_size=len(texts)), dtype="float32")
+
+
+class EncodingPool:
+    """
+    Pool of worker processes that each hold a copy of the embedding model.
+
+    ``SentenceTransformer.encode`` keeps one process busy; for bulk (re-)indexing
+    on many-core CPU hosts the chunks are sharded across workers instead. Every
+    worker gets an equal share of the cores for torch so that the workers do
+    not oversubscribe the machine. Results come back in input order.
+
+    Usage:
+        with EncodingPool(workers=8) as pool:
+            store_in_faiss(paragraphs, encoder=pool.encode)
+    """
+
+    def __init__(self, workers=None, shard_size=SHARD_SIZE, model_name=MODEL_NAME, loader=load_model):
+        """
+        Start the worker processes.
+
+        Args:
+            workers (int, optional): Number of worker processes. Defaults to the CPU count.
+            shard_size (int, optional): Chunks per task sent to a worker. Defaults to SHARD_SIZE.
+            model_name (str, optional): Model to load in each worker. Defaults to MODEL_NAME.
+            loader (callable, optional): Picklable function loading a model by name.
+                Defaults to load_model.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        # torch does not survive fork() well; start workers from a fresh interpreter
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(loader, model_name, threads),
+        )
+
+    def warm_up(self):
+        """Block until every worker has loaded its model."""
+        list(self._executor.map(_encode_shard, [["warm-up"]] * self.workers))
+
+    def iter_encode(self, texts):
+        """
+        Encode texts across the workers, yielding vectors shard by shard in input order.
+
+        Args:
+            texts (iterable[str]): Texts to embed; consumed lazily.
+
+        Yields:
+            np.ndarray: float32 array of shape (shard length, dimension) per shard.
+        """
+        def shards():
+            shard = []
+            for text in texts:
+                shard.append(text)
+                if len(shard) == self.shard_size:
+                    yield shard
+                    shard = []
+            if shard:
+                yield shard
+
+        # At most two shards per worker are in flight, so a long input is never
+        # read ahead in full; results are yielded in submission order.
+        pending = deque()
+        for shard in shards():
+            pending.append(self._executor.submit(_encode_shard, shard))
+            if len(pending) >= 2 * self.workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def encode(self, texts):
+        """
+        Encode a list of texts across the workers.
+
+        Drop-in replacement for ``model.encode`` as ``store_in_faiss(..., encoder=pool.encode)``.
+
+        Returns:
+            np.ndarray: float32 array of shape (len(texts), dimension), in input order.
+        """
+        return np.vstack(list(self.iter_encode(texts))) if len(texts) else np.empty((0, 0), "float32")
+
+    def close(self):
+        """Stop the worker processes."""
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,159 @@
+import json
+import os
+
+import faiss
+import numpy as np
+
+# Supported index types and their default build/search parameters
+DEFAULT_PARAMS = {
+    "flat": {},
+    "hnsw": {"m": 32, "ef_construction": 40, "ef_search": 64},
+    "ivf_flat": {"nlist": 1024, "nprobe": 16},
+    "ivf_pq": {"nlist": 1024, "nprobe": 16, "pq_m": 48, "pq_bits": 8},
+}
+
+# Parameters that only affect search and can be changed on a loaded index
+SEARCH_PARAMS = {"nprobe": "nprobe", "ef_search": "efSearch"}
+
+# How the vectors of flat, hnsw and ivf_flat indexes are stored, with the FAISS
+# factory suffix: float16 halves the memory per vector, int8 (a per-dimension
+# scalar quantizer trained on the data) quarters it. ivf_pq compresses on its own.
+CODECS = {"float32": "Flat", "float16": "SQfp16", "int8": "SQ8"}
+
+TRAIN_SAMPLE_SIZE = 100_000  # Upper bound on vectors used to train IVF/PQ indexes
+
+
+def make_index_config(index_type="flat", dimension=384, codec="float32", **params):
+    """
+    Build an index configuration from an index type and parameter overrides.
+
+    Args:
+        index_type (str): One of "flat", "hnsw", "ivf_flat" or "ivf_pq".
+        dimension (int, optional): Embedding size. Defaults to 384.
+        codec (str, optional): Vector storage, one of CODECS ("float32", "float16"
+            or "int8"). Defaults to "float32".
+        **params: Overrides for the type's default parameters (e.g. nlist=256, nprobe=8).
+
+    Returns:
+        dict: The configuration, as persisted next to the index file.
+    """
+    if index_type not in DEFAULT_PARAMS:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {sorted(DEFAULT_PARAMS)}")
+
+    unknown = set(params) - set(DEFAULT_PARAMS[index_type])
+    if unknown:
+        raise ValueError(f"Unsupported parameters for '{index_type}': {sorted(unknown)}")
+
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec '{codec}', expected one of {sorted(CODECS)}")
+    if index_type == "ivf_pq" and codec != "float32":
+        raise ValueError("'ivf_pq' already compresses its vectors; it does not take a codec")
+
+    return {"index_type": index_type, "dimension": dimension, "codec": codec, **DEFAULT_PARAMS[index_type], **params}
+
+
+def needs_training(index_type, codec="float32"):
+    """Whether an index of this type and codec has to be trained before vectors are added."""
+    return index_type in ("ivf_flat", "ivf_pq") or codec == "int8"
+
+
+def factory_string(config):
+    """Translate a configuration into a FAISS index_factory description."""
+    index_type = config["index_type"]
+    # Configurations written before codecs existed store float32 vectors
+    storage = CODECS[config.get("codec", "float32")]
+    if index_type == "flat":
+        return storage
+    if index_type == "hnsw":
+        return f"HNSW{config['m']}" if storage == "Flat" else f"HNSW{config['m']}_{storage}"
+    if index_type == "ivf_flat":
+        return f"IVF{config['nlist']},{storage}"
+    return f"IVF{config['nlist']},PQ{config['pq_m']}x{config['pq_bits']}"
+
+
+def build_index(config, training_vectors=None, seed=0):
+    """
+    Create an empty FAISS index for a configuration, training it if required.
+
+    IVF, PQ and int8 indexes are trained on a random sample of ``training_vectors``.
+    When the sample is small, ``nlist`` is lowered so every list gets enough
+    training points; the effective value is written back into ``config``.
+
+    Args:
+        config (dict): Configuration from make_index_config().
+        training_vectors (np.ndarray, optional): Vectors to train on.
+        seed (int, optional): Seed for the training sample. Defaults to 0.
+
+    Returns:
+        faiss.Index: The (trained, empty) index with search parameters applied.
+    """
+    if needs_training(config["index_type"], config.get("codec", "float32")):
+        if training_vectors is None or len(training_vectors) == 0:
+            raise ValueError(f"'{factory_string(config)}' indexes need training vectors")
+
+        training_vectors = np.ascontiguousarray(training_vectors, dtype="float32")
+        if len(training_vectors) > TRAIN_SAMPLE_SIZE:
+            rng = np.random.default_rng(seed)
+            sample = rng.choice(len(training_vectors), TRAIN_SAMPLE_SIZE, replace=False)
+            training_vectors = training_vectors[np.sort(sample)]
+
+    if config["index_type"] in ("ivf_flat", "ivf_pq"):
+        # k-means wants roughly 39 points per centroid
+        config["nlist"] = max(1, min(config["nlist"], len(training_vectors) // 39))
+
+        if config["index_type"] == "ivf_pq" and len(training_vectors) < 2 ** config["pq_bits"]:
+            raise ValueError(
+                f"'ivf_pq' with pq_bits={config['pq_bits']} needs at least {2 ** config['pq_bits']} "
+                f"training vectors, got {len(training_vectors)}; use 'flat' or 'hnsw' for small corpora"
+            )
+
+    index = faiss.index_factory(config["dimension"], factory_string(config), faiss.METRIC_L2)
+
+    if config["index_type"] == "hnsw":
+        index.hnsw.efConstruction = config["ef_construction"]
+    if not index.is_trained:
+        index.train(training_vectors)
+
+    apply_search_params(index, config)
+    return index
+
+
+def apply_search_params(index, config):
+    """Apply the search-time parameters (nprobe/efSearch) of a configuration to an index."""
+    parameter_space = faiss.ParameterSpace()
+    for key, faiss_name in SEARCH_PARAMS.items():
+        if key in config and key in DEFAULT_PARAMS[config["index_type"]]:
+            parameter_space.set_index_parameter(index, faiss_name, config[key])
+
+
+def search_parameters(config, selector):
+    """
+    Build FAISS search parameters that restrict a search to ``selector``.
+
+    Search parameters replace the index's own nprobe/efSearch for that call,
+    so the configured values are carried over.
+    """
+    index_type = config["index_type"]
+    if index_type == "hnsw":
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=config["ef_search"])
+    if index_type in ("ivf_flat", "ivf_pq"):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=config["nprobe"])
+    return faiss.SearchParameters(sel=selector)
+
+
+def config_path(index_path):
+    """Path of the configuration file stored alongside an index file."""
+    return f"{index_path}.json"
+
+
+def load_index_config(index_path):
+    """
+    Load the configuration stored alongside an index file.
+
+    Indexes written before configurations were persisted are exhaustive flat indexes.
+    """
+    path = config_path(index_path)
+    if not os.path.exists(path):
+        return make_index_config("flat")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
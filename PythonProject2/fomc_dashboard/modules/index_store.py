@@ -0,0 +1,485 @@
+import json
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import uuid
+
+import faiss
+import numpy as np
+
+from fomc_dashboard.modules.index_factory import (
+    apply_search_params, config_path, load_index_config, search_parameters
+)
+from fomc_dashboard.modules.metadata_store import MetadataStore, build_store
+
+# Number of delta segments that triggers a background compaction after an append
+COMPACT_THRESHOLD = 8
+
+# Appends, rebuilds and compaction commits of one index are serialized within the process
+_write_locks = {}
+_write_locks_guard = threading.Lock()
+_compactions = {}
+
+
+def _write_lock(index_path):
+    key = os.path.abspath(index_path)
+    with _write_locks_guard:
+        return _write_locks.setdefault(key, threading.Lock())
+
+
+def atomic_write(path, write):
+    """
+    Write a file through a temporary file in the same directory and os.replace().
+
+    Readers see either the old or the new file, never a partial one, and a crash
+    mid-write leaves the old file untouched.
+
+    Args:
+        path (str): Destination path.
+        write (callable): Called with the temporary path; must write the full file there.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        with open(tmp_path, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _new_file_name(path, kind):
+    """Unique, never-reused file name next to ``path`` for a base or segment file."""
+    return f"{os.path.basename(path)}.{kind}-{uuid.uuid4().hex[:12]}"
+
+
+def _resolve(anchor_path, name):
+    return os.path.join(os.path.dirname(os.path.abspath(anchor_path)), name)
+
+
+def read_manifest(index_path, metadata_path):
+    """
+    Read the manifest describing the files that make up an index.
+
+    The manifest is the index configuration (``<index>.json``) plus:
+
+    - ``base``: the main FAISS index and the metadata store for all rows
+    - ``segments``: append-only deltas, each a ``.npy`` block of vectors, in
+      row order after the base
+
+    Indexes written before segments existed have no ``base`` entry; their base
+    is ``index_path``/``metadata_path`` and they have no segments.
+    """
+    manifest = load_index_config(index_path)
+    manifest.setdefault("base", {
+        "index": os.path.basename(index_path),
+        "metadata": os.path.basename(metadata_path),
+        "rows": None,
+    })
+    manifest.setdefault("segments", [])
+    return manifest
+
+
+def _write_manifest(index_path, manifest):
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    atomic_write(config_path(index_path), write)
+
+
+def _manifest_files(index_path, metadata_path, manifest):
+    """Absolute paths of every data file referenced by a manifest."""
+    files = {
+        _resolve(index_path, manifest["base"]["index"]),
+        _resolve(metadata_path, manifest["base"]["metadata"]),
+    }
+    for segment in manifest["segments"]:
+        files.add(_resolve(index_path, segment["vectors"]))
+    return files
+
+
+def _remove_unreferenced(old_files, index_path, metadata_path, manifest):
+    """Delete files dropped from the manifest; readers that still hold them retry on the next check."""
+    for path in old_files - _manifest_files(index_path, metadata_path, manifest):
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # Still open elsewhere (Windows) or already gone
+
+
+def _write_index_file(path, index):
+    atomic_write(path, lambda tmp_path: faiss.write_index(index, tmp_path))
+
+
+def _write_vectors(path, vectors):
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            np.save(f, vectors)
+
+    atomic_write(path, write)
+
+
+class SegmentedIndex:
+    """
+    A base FAISS index plus the vectors of its delta segments.
+
+    Delta segments are small, so they are searched exhaustively with one flat
+    index and merged with the base results by distance. Row ids continue from
+    the base: the first delta vector has id ``base.ntotal``.
+    """
+
+    def __init__(self, base, delta_vectors=(), config=None):
+        self.base = base
+        self.config = config or {"index_type": "flat"}
+        self.delta = None
+        self._direct_map_lock = threading.Lock()
+        if len(delta_vectors):
+            self.delta = faiss.IndexFlatL2(base.d)
+            self.delta.add(np.ascontiguousarray(np.concatenate(delta_vectors), dtype="float32"))
+
+    @property
+    def ntotal(self):
+        return self.base.ntotal + (self.delta.ntotal if self.delta is not None else 0)
+
+    def reconstruct(self, ids):
+        """
+        Return the stored vectors of row ids.
+
+        Vectors are decoded from the index, so they are approximate for PQ and int8
+        codecs, just like the distances FAISS computes from them.
+
+        Args:
+            ids (list[int]): Row ids.
+
+        Returns:
+            np.ndarray: Array of shape (len(ids), dimension).
+        """
+        ivf = faiss.try_extract_index_ivf(self.base)
+        if ivf is not None and ivf.direct_map.type == faiss.DirectMap.NoMap:
+            # IVF lists are keyed by list, not by row; the id -> list map is built on first use
+            with self._direct_map_lock:
+                if ivf.direct_map.type == faiss.DirectMap.NoMap:
+                    ivf.make_direct_map()
+
+        vectors = np.empty((len(ids), self.base.d), dtype="float32")
+        for row, idx in enumerate(ids):
+            if idx < self.base.ntotal:
+                vectors[row] = self.base.reconstruct(int(idx))
+            else:
+                vectors[row] = self.delta.reconstruct(int(idx) - self.base.ntotal)
+        return vectors
+
+    def selection(self, ids):
+        """
+        Build the FAISS search parameters that restrict a search to ``ids``.
+
+        Building the selectors is O(ntotal); callers that repeat a filter keep
+        the selection and pass it to search() instead of the ids.
+
+        Args:
+            ids (np.ndarray): Sorted row ids.
+
+        Returns:
+            IdSelection: For search(..., selection=...).
+        """
+        split = np.searchsorted(ids, self.base.ntotal)
+        base_selector = _id_selector(ids[:split], self.base.ntotal)
+        selectors = [base_selector]
+        delta_params = None
+        if self.delta is not None:
+            delta_selector = _id_selector(ids[split:] - self.base.ntotal, self.delta.ntotal)
+            delta_params = faiss.SearchParameters(sel=delta_selector)
+            selectors.append(delta_selector)
+        return IdSelection(ids, search_parameters(self.config, base_selector), delta_params, selectors)
+
+    def search(self, embeddings, top_k, ids=None, selection=None):
+        """
+        Search base and deltas; returns (distances, ids) like faiss.Index.search.
+
+        Args:
+            embeddings (np.ndarray): Query embeddings.
+            top_k (int): Number of results per query.
+            ids (np.ndarray, optional): Sorted row ids to restrict the search to. The
+                restriction is applied inside FAISS through an ID selector, so
+                every returned slot holds a matching row.
+            selection (IdSelection, optional): Prebuilt restriction from selection();
+                takes the place of ``ids``.
+        """
+        if selection is None and ids is not None:
+            selection = self.selection(ids)
+        base_params = selection.base_params if selection is not None else None
+        delta_params = selection.delta_params if selection is not None else None
+
+        distances, indices = self.base.search(embeddings, top_k, params=base_params)
+        if self.delta is None:
+            return distances, indices
+
+        delta_distances, delta_indices = self.delta.search(embeddings, top_k, params=delta_params)
+        delta_indices = np.where(delta_indices >= 0, delta_indices + self.base.ntotal, -1)
+
+        distances = np.hstack([distances, delta_distances])
+        indices = np.hstack([indices, delta_indices])
+        # Missing results are padded with id -1 and an infinite distance, so they sort last
+        order = np.argsort(distances, axis=1, kind="stable")[:, :top_k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(indices, order, axis=1)
+
+
+def _metadata_store_path(metadata_path, manifest):
+    path = _resolve(metadata_path, manifest["base"]["metadata"])
+    if path.endswith(".pkl"):
+        raise RuntimeError(
+            f"'{path}' is a pickled metadata list; migrate it once with "
+            f"'python -m fomc_dashboard.modules.index_store migrate <index file> {path}'"
+        )
+    return path
+
+
+def _total_rows(index_path, manifest):
+    if manifest["base"]["rows"] is None:
+        manifest["base"]["rows"] = faiss.read_index(_resolve(index_path, manifest["base"]["index"])).ntotal
+    return manifest["base"]["rows"] + sum(segment["rows"] for segment in manifest["segments"])
+
+
+class IdSelection:
+    """Row ids and the FAISS search parameters restricting a SegmentedIndex search to them."""
+
+    __slots__ = ("ids", "base_params", "delta_params", "_selectors")
+
+    def __init__(self, ids, base_params, delta_params, selectors):
+        self.ids = ids
+        self.base_params = base_params
+        self.delta_params = delta_params
+        self._selectors = selectors  # The parameters do not own their selectors; keep them alive
+
+
+def _id_selector(ids, ntotal):
+    # A bitmap answers "is this row selected" with one bit test, which keeps
+    # filtered HNSW searches as fast as unfiltered ones (IDSelectorBatch hashes
+    # every visited node and made them several times slower).
+    mask = np.zeros(ntotal, dtype=bool)
+    mask[ids] = True
+    bitmap = np.packbits(mask, bitorder="little")
+    selector = faiss.IDSelectorBitmap(ntotal, faiss.swig_ptr(bitmap))
+    selector.referenced_bitmap = bitmap  # FAISS does not copy the bitmap; keep it alive with the selector
+    return selector
+
+
+def open_metadata_store(index_path, metadata_path):
+    """Open the metadata store the index's manifest currently points to, without loading any vectors."""
+    return MetadataStore(_metadata_store_path(metadata_path, read_manifest(index_path, metadata_path)))
+
+
+def load_segmented(index_path, metadata_path, manifest=None):
+    """
+    Load the base index and delta segments described by the manifest, and open its metadata store.
+
+    Args:
+        index_path (str): Path of the index (the manifest is ``<index_path>.json``).
+        metadata_path (str): Path of the metadata store for indexes without a manifest.
+        manifest (dict, optional): Already-read manifest. Read from disk if omitted.
+
+    Returns:
+        tuple: (SegmentedIndex, MetadataStore, dict manifest)
+
+    Raises:
+        RuntimeError: If the files on disk do not agree with the manifest.
+    """
+    if manifest is None:
+        manifest = read_manifest(index_path, metadata_path)
+    store = MetadataStore(_metadata_store_path(metadata_path, manifest))
+
+    base = faiss.read_index(_resolve(index_path, manifest["base"]["index"]))
+    apply_search_params(base, manifest)
+
+    delta_vectors = [np.load(_resolve(index_path, segment["vectors"])) for segment in manifest["segments"]]
+    index = SegmentedIndex(base, delta_vectors, manifest)
+
+    # The store may hold extra rows from an append that crashed before committing its vectors
+    if store.count() < index.ntotal or manifest["base"]["rows"] not in (None, base.ntotal):
+        raise RuntimeError(f"Index files for '{index_path}' do not match their manifest")
+    return index, store, manifest
+
+
+def write_base(index_path, metadata_path, index, records, config):
+    """
+    Replace the whole index with a freshly built one.
+
+    The first build of an index uses ``index_path``/``metadata_path`` themselves;
+    later rebuilds write new files and switch to them with one manifest update.
+
+    Args:
+        index_path (str): Path of the index (the manifest is ``<index_path>.json``).
+        metadata_path (str): Path of the metadata store.
+        index (faiss.Index): Populated index.
+        records (list): Metadata record (str or dict, see to_record) for every row of ``index``.
+        config (dict): Index configuration from make_index_config().
+    """
+    with _write_lock(index_path):
+        first_build = not os.path.exists(config_path(index_path)) and not os.path.exists(index_path)
+        old_files = set()
+        if not first_build:
+            old_manifest = read_manifest(index_path, metadata_path)
+            old_files = _manifest_files(index_path, metadata_path, old_manifest)
+
+        base = {
+            "index": os.path.basename(index_path) if first_build else _new_file_name(index_path, "base"),
+            "metadata": os.path.basename(metadata_path) if first_build else _new_file_name(metadata_path, "base"),
+            "rows": index.ntotal,
+        }
+        _write_index_file(_resolve(index_path, base["index"]), index)
+        atomic_write(_resolve(metadata_path, base["metadata"]), lambda tmp_path: build_store(tmp_path, records))
+
+        manifest = {**config, "base": base, "segments": []}
+        _write_manifest(index_path, manifest)
+        _remove_unreferenced(old_files, index_path, metadata_path, manifest)
+
+
+def append_segment(index_path, metadata_path, embeddings, records):
+    """
+    Append vectors and their metadata as a new delta segment.
+
+    The metadata rows are inserted first and the vectors are committed by the
+    manifest update, so only the new rows and the small manifest are written
+    and a crash in between leaves the index as it was. Once COMPACT_THRESHOLD
+    segments have accumulated, a background compaction starts.
+
+    Returns:
+        int: Number of delta segments after the append.
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+    if len(embeddings) != len(records):
+        raise ValueError("Each appended vector needs exactly one metadata record")
+
+    with _write_lock(index_path):
+        manifest = read_manifest(index_path, metadata_path)
+        store = MetadataStore(_metadata_store_path(metadata_path, manifest), readonly=False)
+        try:
+            store.append(records, _total_rows(index_path, manifest))
+        finally:
+            store.close()
+
+        segment = {"vectors": _new_file_name(index_path, "seg") + ".npy", "rows": len(embeddings)}
+        _write_vectors(_resolve(index_path, segment["vectors"]), embeddings)
+
+        manifest["segments"].append(segment)
+        _write_manifest(index_path, manifest)
+        segment_count = len(manifest["segments"])
+
+    if segment_count >= COMPACT_THRESHOLD:
+        compact_in_background(index_path, metadata_path)
+    return segment_count
+
+
+def compact(index_path, metadata_path):
+    """
+    Merge all current delta segments into a new base index.
+
+    Row ids do not change, so the metadata store is left as it is. The merge
+    runs without holding the write lock, so appends continue while it works;
+    segments appended in the meantime stay as deltas of the new base.
+
+    Returns:
+        bool: True if segments were merged.
+    """
+    with _write_lock(index_path):
+        manifest = read_manifest(index_path, metadata_path)
+    merged = manifest["segments"]
+    if not merged:
+        return False
+
+    index, _, _ = load_segmented(index_path, metadata_path, manifest)
+    index.base.add(index.delta.reconstruct_n(0, index.delta.ntotal))
+
+    base = {**manifest["base"], "index": _new_file_name(index_path, "base"), "rows": index.base.ntotal}
+    _write_index_file(_resolve(index_path, base["index"]), index.base)
+
+    with _write_lock(index_path):
+        current = read_manifest(index_path, metadata_path)
+        if current["base"] != manifest["base"] or current["segments"][:len(merged)] != merged:
+            # The index was rebuilt while we merged; our file is obsolete
+            os.remove(_resolve(index_path, base["index"]))
+            return False
+
+        old_files = _manifest_files(index_path, metadata_path, current)
+        current["base"] = base
+        current["segments"] = current["segments"][len(merged):]
+        _write_manifest(index_path, current)
+        _remove_unreferenced(old_files, index_path, metadata_path, current)
+    return True
+
+
+def compact_in_background(index_path, metadata_path):
+    """
+    Start compact() in a daemon thread unless one is already running for this index.
+
+    Returns:
+        threading.Thread: The running compaction thread.
+    """
+    key = os.path.abspath(index_path)
+    with _write_locks_guard:
+        thread = _compactions.get(key)
+        if thread is not None and thread.is_alive():
+            return thread
+
+        def run():
+            try:
+                compact(index_path, metadata_path)
+            except Exception as e:
+                print(f"Background compaction of '{index_path}' failed: {e}")
+
+        thread = threading.Thread(target=run, name=f"compact-{os.path.basename(index_path)}", daemon=True)
+        _compactions[key] = thread
+        thread.start()
+        return thread
+
+
+def migrate_pickle_metadata(index_path, pickle_path, db_path=None):
+    """
+    One-shot migration of pickled metadata (base list and delta segments) to a metadata store.
+
+    Row ids follow the order of the pickled lists, which is the FAISS row order.
+    The pickle files are left in place.
+
+    Args:
+        index_path (str): Path of the FAISS index the metadata belongs to.
+        pickle_path (str): Path of the pickled base metadata list (e.g. metadata.pkl).
+        db_path (str, optional): Destination. Defaults to ``pickle_path`` with a .db extension.
+
+    Returns:
+        str: Path of the new metadata store.
+    """
+    db_path = db_path or f"{os.path.splitext(pickle_path)[0]}.db"
+
+    with _write_lock(index_path):
+        manifest = read_manifest(index_path, pickle_path)
+        with open(_resolve(pickle_path, manifest["base"]["metadata"]), "rb") as f:
+            records = list(pickle.load(f))
+        for segment in manifest["segments"]:
+            with open(_resolve(pickle_path, segment.pop("metadata")), "rb") as f:
+                records.extend(pickle.load(f))
+
+        if _total_rows(index_path, manifest) != len(records):
+            raise RuntimeError(f"'{pickle_path}' does not have one entry per row of '{index_path}'")
+
+        atomic_write(db_path, lambda tmp_path: build_store(tmp_path, records))
+        manifest["base"]["metadata"] = os.path.basename(db_path)
+        _write_manifest(index_path, manifest)
+
+    print(f"Migrated {len(records)} metadata rows from '{pickle_path}' to '{db_path}'.")
+    return db_path
+
+
+# One-shot migration of an existing metadata.pkl:
+#   python -m fomc_dashboard.modules.index_store migrate faiss_index.index metadata.pkl [metadata.db]
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["migrate"]:
+        migrate_pickle_metadata(*sys.argv[2:5])
+    else:
+        print("Usage: python -m fomc_dashboard.modules.index_store migrate <index file> <metadata.pkl> [<metadata.db>]")
@@ -0,0 +1,278 @@
+import os
+import re
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+from fomc_dashboard.modules.encoding_pool import EncodingPool
+from fomc_dashboard.modules.index_factory import TRAIN_SAMPLE_SIZE, config_path, needs_training
+from fomc_dashboard.modules.index_store import compact, compact_in_background
+from fomc_dashboard.modules.pdf_extraction import get_extractor
+from fomc_dashboard.modules.sentence_transformer import get_model, store_in_faiss
+
+# all-MiniLM-L6-v2 truncates its input at 256 word pieces; stay below that so
+# nothing at the end of a chunk is silently dropped by the model.
+CHUNK_TOKENS = 200
+OVERLAP_TOKENS = 40
+BATCH_SIZE = 256  # Chunks embedded and appended to the index at a time
+
+# Running headers and footers of Fed PDFs ("Page 3 of 14", bare page numbers)
+PAGE_NUMBER_LINE = re.compile(r"^\s*(page\s+)?\d+(\s+of\s+\d+)?\s*$", re.IGNORECASE)
+HYPHENATED_BREAK = re.compile(r"(\w)-\n(\w)")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+MEETING_DATE = re.compile(r"(19|20)\d{2}(0[1-9]|1[0-2])(0[1-9]|[12]\d|3[01])")
+DOC_TYPES = ("minutes", "statement", "transcript", "presconf", "beigebook")
+
+
+class IngestionStats:
+    """Counters and throughput of an ingestion run."""
+
+    def __init__(self):
+        self.documents = 0
+        self.pages = 0
+        self.chunks = 0
+        self.started = time.perf_counter()
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        """Return the counters with pages/s and chunks/s."""
+        seconds = self.seconds
+        return {
+            "documents": self.documents,
+            "pages": self.pages,
+            "chunks": self.chunks,
+            "seconds": round(seconds, 2),
+            "pages_per_s": round(self.pages / seconds, 1) if seconds else 0.0,
+            "chunks_per_s": round(self.chunks / seconds, 1) if seconds else 0.0,
+        }
+
+
+def document_metadata(path):
+    """
+    Guess meeting date and document type from a Fed file name.
+
+    E.g. "fomcminutes20231213.pdf" -> {"meeting_date": "2023-12-13", "doc_type": "minutes"}.
+    """
+    name = os.path.basename(path).lower()
+    metadata = {"source_url": path}
+    match = MEETING_DATE.search(name)
+    if match:
+        date = match.group(0)
+        metadata["meeting_date"] = f"{date[:4]}-{date[4:6]}-{date[6:]}"
+    metadata["doc_type"] = next((doc_type for doc_type in DOC_TYPES if doc_type in name), None)
+    return metadata
+
+
+def iter_pdf_pages(path, extractor=None):
+    """
+    Yield (page number, text) for each page of a PDF, starting at 1.
+
+    Pages are extracted a few at a time as the generator is consumed (in
+    parallel by the shared PdfExtractor, or read from its page cache when the
+    same file was extracted before), so only those pages are held in memory.
+
+    Args:
+        path (str): PDF file.
+        extractor (PdfExtractor, optional): Defaults to the process-wide extractor.
+    """
+    yield from (extractor or get_extractor()).iter_pages(path)
+
+
+def clean_page(text):
+    """
+    Tidy text extracted from a PDF page.
+
+    Drops page-number lines, joins words hyphenated across line breaks and
+    collapses whitespace.
+    """
+    lines = [line for line in text.splitlines() if not PAGE_NUMBER_LINE.match(line)]
+    text = HYPHENATED_BREAK.sub(r"\1\2", "\n".join(lines))
+    return " ".join(text.split())
+
+
+def _split_sentences(text, count_tokens, max_tokens):
+    """Yield (sentence, tokens), splitting sentences longer than max_tokens at word boundaries."""
+    for sentence in SENTENCE_END.split(text):
+        tokens = count_tokens(sentence)
+        if tokens <= max_tokens:
+            yield sentence, tokens
+            continue
+        # Rare (tables, lists run together by the extractor); cut by words
+        words = sentence.split()
+        step = max(1, len(words) * max_tokens // tokens)
+        for start in range(0, len(words), step):
+            piece = " ".join(words[start:start + step])
+            yield piece, count_tokens(piece)
+
+
+def iter_chunks(pages, max_tokens=CHUNK_TOKENS, overlap=OVERLAP_TOKENS, count_tokens=None):
+    """
+    Group page texts into overlapping chunks of at most ``max_tokens`` tokens.
+
+    Chunks end at sentence boundaries and run across page breaks; each chunk
+    repeats the last sentences (up to ``overlap`` tokens) of the one before, so
+    a statement split across two chunks is still found whole in one of them.
+
+    Args:
+        pages (iterable): (page number, cleaned text) pairs.
+        max_tokens (int, optional): Token budget of a chunk. Defaults to CHUNK_TOKENS.
+        overlap (int, optional): Tokens carried over into the next chunk. Defaults to OVERLAP_TOKENS.
+        count_tokens (callable, optional): Counts the tokens of a string. Defaults
+            to the embedding model's tokenizer.
+
+    Yields:
+        tuple: (first page number of the chunk, chunk text)
+    """
+    count_tokens = count_tokens or model_token_counter()
+
+    window = deque()  # (page, sentence, tokens) of the chunk being built
+    window_tokens = 0
+
+    for page, text in pages:
+        for sentence, tokens in _split_sentences(text, count_tokens, max_tokens):
+            if window and window_tokens + tokens > max_tokens:
+                yield window[0][0], " ".join(item[1] for item in window)
+                # Keep only the tail of the emitted chunk as overlap
+                while window and (window_tokens + tokens > max_tokens or window_tokens > overlap):
+                    window_tokens -= window.popleft()[2]
+            window.append((page, sentence, tokens))
+            window_tokens += tokens
+
+    if window:
+        yield window[0][0], " ".join(item[1] for item in window)
+
+
+def model_token_counter():
+    """Token counter using the embedding model's tokenizer (whitespace words as a fallback)."""
+    tokenizer = getattr(get_model(), "tokenizer", None)
+    if tokenizer is None:
+        return lambda text: len(text.split())
+    return lambda text: len(tokenizer.tokenize(text))
+
+
+def iter_document_chunks(paths, stats, max_tokens=CHUNK_TOKENS, overlap=OVERLAP_TOKENS, count_tokens=None):
+    """
+    Yield metadata records for the chunks of several PDFs, one document and page at a time.
+
+    Args:
+        paths (iterable[str]): PDF files.
+        stats (IngestionStats): Updated with documents, pages and chunks as they are produced.
+
+    Yields:
+        dict: Chunk record with "text", "section" (first page) and the document's metadata.
+    """
+    count_tokens = count_tokens or model_token_counter()
+
+    for path in paths:
+        stats.documents += 1
+        metadata = document_metadata(path)
+
+        def pages(path=path):
+            for number, text in iter_pdf_pages(path):
+                stats.pages += 1
+                yield number, clean_page(text)
+
+        for page, text in iter_chunks(pages(), max_tokens, overlap, count_tokens):
+            stats.chunks += 1
+            yield {"text": text, "section": f"page {page}", **metadata}
+
+
+def _batches(items, size, first_size=None):
+    iterator = iter(items)
+    batch = list(islice(iterator, first_size or size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def ingest_pdfs(paths, metadata_file="metadata.db", index_file="faiss_index", batch_size=BATCH_SIZE,
+                max_tokens=CHUNK_TOKENS, overlap=OVERLAP_TOKENS, workers=None, **store_options):
+    """
+    Extract, chunk, embed and index PDFs in a streaming pipeline.
+
+    Only a few pages and one batch of chunks are in memory at a time, so the size
+    of a document does not matter. Each batch is passed to store_in_faiss,
+    which appends it to the index (the first batch builds the index if there
+    is none yet, using ``store_options`` such as index_type). At the end the
+    delta segments of all batches are compacted into the base index.
+
+    Appended vectors are added to the index as it was trained, so when a new
+    IVF, PQ or int8 index is built the first batch holds up to
+    TRAIN_SAMPLE_SIZE chunks (the whole corpus, if smaller) to train it on.
+
+    Args:
+        paths (list[str]): PDF files to ingest.
+        metadata_file (str, optional): Metadata store. Defaults to "metadata.db".
+        index_file (str, optional): Index name without extension. Defaults to "faiss_index".
+        batch_size (int, optional): Chunks embedded and appended together. Defaults to BATCH_SIZE.
+        max_tokens (int, optional): Token budget of a chunk. Defaults to CHUNK_TOKENS.
+        overlap (int, optional): Tokens repeated between chunks. Defaults to OVERLAP_TOKENS.
+        workers (int, optional): Encode in this many worker processes (see
+            EncodingPool) instead of in this process. Worth it for bulk
+            re-embeds on many-core machines.
+
+    Returns:
+        dict: Documents, pages and chunks processed, with pages/s and chunks/s.
+    """
+    stats = IngestionStats()
+    records = iter_document_chunks(paths, stats, max_tokens, overlap)
+
+    index_path = f"{index_file}.index"
+    first_size = batch_size
+    exists = os.path.exists(index_path) or os.path.exists(config_path(index_path))
+    builds = store_options.get("rebuild") or not exists
+    if builds and needs_training(store_options.get("index_type", "flat"), store_options.get("codec", "float32")):
+        first_size = max(batch_size, TRAIN_SAMPLE_SIZE)
+    # Only the first batch may rebuild the index; the others are appended to it
+    append_options = {key: value for key, value in store_options.items() if key != "rebuild"}
+
+    pool = EncodingPool(workers) if workers else None
+    try:
+        for number, batch in enumerate(_batches(records, batch_size, first_size)):
+            store_in_faiss(batch, metadata_file=metadata_file, index_file=index_file,
+                           encoder=pool.encode if pool else None, **(append_options if number else store_options))
+    finally:
+        if pool:
+            pool.close()
+
+    if stats.chunks:
+        # Wait for a compaction the appends may have started, then fold in what is left
+        compact_in_background(index_path, metadata_file).join()
+        compact(index_path, metadata_file)
+    return stats.summary()
+
+
+def find_pdfs(paths):
+    """Expand directories into the PDF files they contain, in name order."""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(".pdf"):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+if __name__ == "__main__":
+    # python -m fomc_dashboard.modules.ingestion <pdf or directory>... [--index faiss_index] [--workers 8]
+    args = sys.argv[1:]
+    options = {}
+    for flag, key in (("--index", "index_file"), ("--metadata", "metadata_file"), ("--batch-size", "batch_size"),
+                      ("--workers", "workers")):
+        if flag in args:
+            position = args.index(flag)
+            options[key] = args[position + 1]
+            del args[position:position + 2]
+    for key in ("batch_size", "workers"):
+        if key in options:
+            options[key] = int(options[key])
+
+    if not args:
+        print("Usage: python -m fomc_dashboard.modules.ingestion <pdf or directory>... "
+              "[--index faiss_index] [--metadata metadata.db] [--batch-size 256] [--workers N]")
+    else:
+        print(f"Ingestion: {ingest_pdfs(list(find_pdfs(args)), **options)}")
@@ -0,0 +1,257 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from fomc_dashboard.modules.context_packer import DEFAULT_MODEL, pack_context
+from fomc_dashboard.modules.index_store import open_metadata_store
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    meeting_date TEXT PRIMARY KEY,   -- ISO date, e.g. 2023-12-13
+    source_hash TEXT NOT NULL,       -- sha256 of the prompt and documents the summary was generated from
+    summary TEXT NOT NULL,           -- Markdown
+    doc_types TEXT,                  -- Comma-separated document types that were summarized
+    model TEXT,
+    created REAL NOT NULL            -- Unix time
+);
+"""
+
+# The statement carries the decision and the minutes the discussion; they go
+# into the prompt first, and transcripts only fill what is left of the budget
+DOC_TYPE_ORDER = ("statement", "minutes", "presconf", "transcript", "beigebook")
+SOURCE_TOKENS = 12000  # Document tokens per summary prompt
+MAX_WORKERS = 4  # Summaries generated at once
+
+INSTRUCTION = (
+    "You are an assistant summarizing FOMC meetings for traders, investors and economy enthusiasts. "
+    "Only use the documents provided."
+)
+PROMPT = """Summarize the FOMC meeting of {meeting_date} from its documents below.
+
+Answer in Markdown with these sections, as short bullet points:
+**Decision**, **Goals** (inflation and employment), **Forward Guidance**, **Economic Outlook**
+and **Key Insights for Traders and Investors**. Say so when the documents do not cover a section.
+
+Documents:
+{source}"""
+
+
+class SummaryStore:
+    """
+    SQLite store of generated meeting summaries, one per meeting date.
+
+    Each summary keeps the hash of the prompt and documents it was generated
+    from, so a batch run only regenerates meetings whose documents changed.
+    Each thread gets its own connection.
+    """
+
+    def __init__(self, path="meeting_summaries.db", readonly=False):
+        """
+        Open (or create) a summary store.
+
+        Args:
+            path (str, optional): SQLite file. Defaults to "meeting_summaries.db".
+            readonly (bool, optional): Open without write access. Defaults to False.
+        """
+        if readonly and not os.path.exists(path):
+            raise FileNotFoundError(f"Summary store '{path}' does not exist")
+        self.path = path
+        self.readonly = readonly
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if self.readonly:
+                connection = sqlite3.connect(f"file:{os.path.abspath(self.path)}?mode=ro", uri=True)
+            else:
+                connection = sqlite3.connect(self.path)
+                connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        """Close this thread's connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def meetings(self):
+        """Meeting dates with a summary, most recent first."""
+        cursor = self._connection().execute("SELECT meeting_date FROM summaries ORDER BY meeting_date DESC")
+        return [meeting_date for (meeting_date,) in cursor]
+
+    def get(self, meeting_date):
+        """
+        Return the summary of a meeting.
+
+        Returns:
+            dict: "meeting_date", "summary", "doc_types" (list), "model" and "created",
+            or None if the meeting has no summary.
+        """
+        row = self._connection().execute(
+            "SELECT meeting_date, summary, doc_types, model, created FROM summaries WHERE meeting_date = ?",
+            (meeting_date,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "meeting_date": row[0],
+            "summary": row[1],
+            "doc_types": row[2].split(",") if row[2] else [],
+            "model": row[3],
+            "created": row[4],
+        }
+
+    def source_hashes(self):
+        """Meeting date -> source hash of its stored summary."""
+        return dict(self._connection().execute("SELECT meeting_date, source_hash FROM summaries"))
+
+    def put(self, meeting_date, source_hash, summary, doc_types=(), model=None):
+        """Store (or replace) the summary of a meeting."""
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO summaries (meeting_date, source_hash, summary, doc_types, model, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (meeting_date, source_hash, summary, ",".join(doc_types), model, time.time())
+            )
+
+
+def meeting_source(metadata, meeting_date, max_tokens=SOURCE_TOKENS, model=DEFAULT_MODEL):
+    """
+    Build the document text of one meeting for its summary prompt.
+
+    Chunks are taken in DOC_TYPE_ORDER and document order, deduplicated and
+    packed into ``max_tokens`` tokens (see pack_context), then grouped under a
+    heading per document type.
+
+    Args:
+        metadata (MetadataStore): Store holding the meeting's chunks.
+        meeting_date (str): ISO meeting date.
+        max_tokens (int, optional): Token budget for the documents. Defaults to SOURCE_TOKENS.
+        model (str, optional): Chat model whose tokenizer counts the tokens. Defaults to DEFAULT_MODEL.
+
+    Returns:
+        tuple: (source text, list of the document types included).
+    """
+    rank = {doc_type: i for i, doc_type in enumerate(DOC_TYPE_ORDER)}
+    chunks = sorted(metadata.meeting_chunks(meeting_date),
+                    key=lambda chunk: (rank.get(chunk["doc_type"], len(rank)), chunk["id"]))
+    _, packed, _ = pack_context(chunks, max_tokens, model)
+
+    sections = {}
+    for chunk in sorted(packed, key=lambda chunk: (rank.get(chunk["doc_type"], len(rank)), chunk["id"])):
+        sections.setdefault(chunk["doc_type"] or "document", []).append(chunk["text"])
+    source = "\n\n".join(f"[{doc_type}]\n" + "\n".join(texts) for doc_type, texts in sections.items())
+    return source, list(sections)
+
+
+def source_hash(meeting_date, source, model):
+    """Hash of everything a summary depends on: prompt, instruction, model and documents."""
+    digest = hashlib.sha256()
+    for part in (INSTRUCTION, PROMPT, model, meeting_date, source):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def summarize_meetings(helper, index_file="faiss_index", metadata_file="metadata.db",
+                       store_path="meeting_summaries.db", meetings=None, max_workers=MAX_WORKERS, force=False,
+                       source_tokens=SOURCE_TOKENS):
+    """
+    Generate and store summaries for every ingested meeting whose documents changed.
+
+    The documents of each meeting are read from the index's metadata store and
+    hashed; meetings whose stored summary has the same hash are skipped. The
+    others are summarized through ``helper`` with at most ``max_workers``
+    requests at once (the helper's own concurrency limit, rate limiter and
+    retries apply too), and each summary is stored as soon as it arrives, so
+    an interrupted run keeps what it has done.
+
+    Args:
+        helper (ai_responder.AzureOpenAIHelper): Helper used for the chat completions.
+        index_file (str, optional): Index path without the ".index" suffix. Defaults to "faiss_index".
+        metadata_file (str, optional): Metadata store of the index. Defaults to "metadata.db".
+        store_path (str, optional): Summary store. Defaults to "meeting_summaries.db".
+        meetings (list[str], optional): Only these meeting dates. Defaults to all meetings in the index.
+        max_workers (int, optional): Summaries generated at once. Defaults to MAX_WORKERS.
+        force (bool, optional): Regenerate unchanged meetings too. Defaults to False.
+        source_tokens (int, optional): Token budget for each meeting's documents. Defaults to SOURCE_TOKENS.
+
+    Returns:
+        dict: Counts of "meetings", "generated", "unchanged" and "failed", and "seconds".
+    """
+    start = time.perf_counter()
+    model = helper.DEFAULT_MODEL
+    metadata = open_metadata_store(f"{index_file}.index", metadata_file)
+    stats = {"meetings": 0, "generated": 0, "unchanged": 0, "failed": 0}
+
+    with SummaryStore(store_path) as store:
+        known = store.source_hashes()
+        jobs = []
+        for meeting_date in meetings or metadata.meetings():
+            stats["meetings"] += 1
+            source, doc_types = meeting_source(metadata, meeting_date, source_tokens, model)
+            if not source:
+                continue
+            digest = source_hash(meeting_date, source, model)
+            if not force and known.get(meeting_date) == digest:
+                stats["unchanged"] += 1
+                continue
+            jobs.append((meeting_date, digest, source, doc_types))
+        metadata.close()
+
+        with ThreadPoolExecutor(max_workers) as pool:
+            futures = {
+                pool.submit(helper.get_response, PROMPT.format(meeting_date=meeting_date, source=source),
+                            INSTRUCTION, model, 0.2): (meeting_date, digest, doc_types)
+                for meeting_date, digest, source, doc_types in jobs
+            }
+            for future in as_completed(futures):
+                meeting_date, digest, doc_types = futures[future]
+                summary = future.result()  # get_response returns None after its retries fail
+                if summary:
+                    store.put(meeting_date, digest, summary, doc_types, model)
+                    stats["generated"] += 1
+                else:
+                    print(f"No summary generated for the meeting of {meeting_date}")
+                    stats["failed"] += 1
+
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    return stats
+
+
+if __name__ == "__main__":
+    # python -m fomc_dashboard.modules.meeting_summaries [--api-key KEY] [--index faiss_index] [--workers 4] [--force]
+    from fomc_dashboard.modules.ai_responder import AzureOpenAIHelper
+
+    args = sys.argv[1:]
+    options = {}
+    for flag, key in (("--index", "index_file"), ("--metadata", "metadata_file"), ("--store", "store_path"),
+                      ("--workers", "max_workers"), ("--api-key", "api_key")):
+        if flag in args:
+            position = args.index(flag)
+            options[key] = args[position + 1]
+            del args[position:position + 2]
+    if "max_workers" in options:
+        options["max_workers"] = int(options["max_workers"])
+    options["force"] = "--force" in args
+
+    api_key = options.pop("api_key", None) or os.environ.get("AZURE_OPENAI_API_KEY")
+    if not api_key:
+        print("Usage: python -m fomc_dashboard.modules.meeting_summaries [--api-key KEY] [--index faiss_index] "
+              "[--metadata metadata.db] [--store meeting_summaries.db] [--workers 4] [--force]\n"
+              "The API key can also be set in AZURE_OPENAI_API_KEY.")
+    else:
+        print(f"Meeting summaries: {summarize_meetings(AzureOpenAIHelper(api_key), **options)}")
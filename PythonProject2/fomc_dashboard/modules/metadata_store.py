@@ -0,0 +1,348 @@
+import os
+import re
+import sqlite3
+import threading
+
+import numpy as np
+
+# Per-chunk fields stored next to the text; all optional except text
+FIELDS = ("meeting_date", "doc_type", "section", "source_url")
+
+MMAP_SIZE = 1 << 30  # Let SQLite memory-map up to 1 GiB of the file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,      -- FAISS row id
+    text TEXT NOT NULL,
+    meeting_date TEXT,           -- ISO date, e.g. 2023-12-13
+    doc_type TEXT,               -- statement, minutes, transcript, ...
+    section TEXT,
+    source_url TEXT
+);
+CREATE INDEX IF NOT EXISTS chunks_meeting_date ON chunks (meeting_date);
+CREATE INDEX IF NOT EXISTS chunks_doc_type ON chunks (doc_type);
+"""
+
+# BM25 inverted index over the chunk text. It is an external-content table, so
+# only the postings are stored and the text itself is read from chunks.
+# chunk_terms holds each term's document frequency, which FTS5 itself can only
+# compute by scanning the term's postings.
+LEXICAL_SCHEMA = """
+CREATE VIRTUAL TABLE chunks_fts USING fts5(text, content='chunks', content_rowid='id', tokenize='unicode61');
+CREATE TRIGGER chunks_fts_insert AFTER INSERT ON chunks BEGIN
+    INSERT INTO chunks_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER chunks_fts_delete AFTER DELETE ON chunks BEGIN
+    INSERT INTO chunks_fts (chunks_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+CREATE TABLE chunk_terms (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL          -- number of chunks containing the term
+) WITHOUT ROWID;
+"""
+
+# FTS5 scores every chunk matching any query term (about 2 microseconds each),
+# so a query only uses its rarest terms, up to this many matching chunks in total.
+# Terms found in a large share of the corpus add little to BM25 and are left to
+# the vector search.
+LEXICAL_POSTINGS_BUDGET = 2000
+
+# Same split as the unicode61 tokenizer: runs of letters and digits
+TOKEN = re.compile(r"[^\W_]+")
+
+
+def to_record(item):
+    """
+    Normalize a paragraph into a metadata record.
+
+    Args:
+        item (str or dict): Plain text, or a dict with "text" and any of FIELDS.
+
+    Returns:
+        dict: The record with "text" and every field in FIELDS (None if missing).
+    """
+    if isinstance(item, str):
+        item = {"text": item}
+    if "text" not in item:
+        raise ValueError("Metadata records need a 'text' field")
+    return {"text": item["text"], **{field: item.get(field) for field in FIELDS}}
+
+
+def normalize_filters(filters):
+    """
+    Validate search filters and bring them into a canonical, hashable form.
+
+    Args:
+        filters (dict or None): Any of "start_date" and "end_date" (ISO date string
+            or date, inclusive) and "doc_types" (a string or list such as
+            ["statement", "minutes"]).
+
+    Returns:
+        tuple or None: Sorted (key, value) pairs, or None when nothing is filtered.
+    """
+    if not filters:
+        return None
+    unknown = set(filters) - {"start_date", "end_date", "doc_types"}
+    if unknown:
+        raise ValueError(f"Unsupported filters: {sorted(unknown)}")
+
+    normalized = {}
+    for key in ("start_date", "end_date"):
+        if filters.get(key) is not None:
+            value = filters[key]
+            normalized[key] = value if isinstance(value, str) else value.isoformat()
+    if filters.get("doc_types"):
+        doc_types = filters["doc_types"]
+        normalized["doc_types"] = (doc_types,) if isinstance(doc_types, str) else tuple(sorted(doc_types))
+    return tuple(sorted(normalized.items())) or None
+
+
+def _where(filters, prefix="WHERE"):
+    """SQL condition and parameters for normalized filters."""
+    clauses, params = [], []
+    for key, value in filters or ():
+        if key == "start_date":
+            clauses.append("meeting_date >= ?")
+            params.append(value)
+        elif key == "end_date":
+            clauses.append("meeting_date <= ?")
+            params.append(value)
+        elif key == "doc_types":
+            clauses.append(f"doc_type IN ({','.join('?' * len(value))})")
+            params.extend(value)
+    return (f" {prefix} {' AND '.join(clauses)}" if clauses else ""), params
+
+
+def tokenize(text):
+    """Distinct lower-case terms of a text, in order of first occurrence."""
+    return list(dict.fromkeys(TOKEN.findall(text.lower())))
+
+
+def _count_terms(connection, texts, sign=1):
+    """Add (or with sign=-1 remove) the terms of ``texts`` to the document frequencies."""
+    counts = {}
+    for text in texts:
+        for term in tokenize(text):
+            counts[term] = counts.get(term, 0) + sign
+    connection.executemany(
+        "INSERT INTO chunk_terms (term, df) VALUES (?, ?) ON CONFLICT (term) DO UPDATE SET df = df + excluded.df",
+        counts.items()
+    )
+
+
+class MetadataStore:
+    """
+    Chunk metadata in an SQLite file, keyed by FAISS row id.
+
+    The file is memory-mapped, so looking up the top-k rows only touches the
+    pages holding those rows, and every worker process reading the same file
+    shares those pages through the OS page cache instead of holding its own copy.
+    Each thread gets its own connection.
+    """
+
+    def __init__(self, path, readonly=True):
+        """
+        Open a metadata store.
+
+        Args:
+            path (str): Path to the SQLite file.
+            readonly (bool, optional): Open without write access. Defaults to True.
+        """
+        if readonly and not os.path.exists(path):
+            raise FileNotFoundError(f"Metadata store '{path}' does not exist")
+        self.path = path
+        self.readonly = readonly
+        self._local = threading.local()
+        self._lexical = None
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if self.readonly:
+                connection = sqlite3.connect(f"file:{os.path.abspath(self.path)}?mode=ro", uri=True)
+            else:
+                connection = sqlite3.connect(self.path)
+                connection.executescript(SCHEMA)
+                _ensure_lexical_index(connection)
+            connection.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        """Close this thread's connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def count(self):
+        """Number of rows, i.e. the highest row id plus one."""
+        (max_id,) = self._connection().execute("SELECT MAX(id) FROM chunks").fetchone()
+        return 0 if max_id is None else max_id + 1
+
+    def fetch(self, ids):
+        """
+        Look up rows by FAISS row id.
+
+        Args:
+            ids (list[int]): Row ids.
+
+        Returns:
+            dict: Row id -> {"id", "text", *FIELDS} for the ids that exist.
+        """
+        ids = [int(i) for i in ids]
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        cursor = self._connection().execute(
+            f"SELECT id, text, {', '.join(FIELDS)} FROM chunks WHERE id IN ({placeholders})", ids
+        )
+        columns = ["id", "text", *FIELDS]
+        return {row[0]: dict(zip(columns, row)) for row in cursor}
+
+    def meetings(self):
+        """
+        Meeting dates present in the store.
+
+        Returns:
+            dict: ISO meeting date -> number of chunks, oldest meeting first.
+        """
+        cursor = self._connection().execute(
+            "SELECT meeting_date, COUNT(*) FROM chunks WHERE meeting_date IS NOT NULL "
+            "GROUP BY meeting_date ORDER BY meeting_date"
+        )
+        return dict(cursor.fetchall())
+
+    def meeting_chunks(self, meeting_date):
+        """
+        Return the rows of one meeting, ordered by document type and position in the document.
+
+        Returns:
+            list[dict]: Rows as {"id", "text", *FIELDS}.
+        """
+        cursor = self._connection().execute(
+            f"SELECT id, text, {', '.join(FIELDS)} FROM chunks WHERE meeting_date = ? ORDER BY doc_type, id",
+            (meeting_date,)
+        )
+        columns = ["id", "text", *FIELDS]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def select_ids(self, filters):
+        """
+        Return the row ids matching normalized filters (see normalize_filters).
+
+        Returns:
+            np.ndarray: Sorted int64 row ids.
+        """
+        where, params = _where(filters)
+        cursor = self._connection().execute(f"SELECT id FROM chunks{where} ORDER BY id", params)
+        return np.fromiter((row[0] for row in cursor), dtype="int64")
+
+    def has_lexical_index(self):
+        """Whether the store carries the BM25 index (stores written before it existed do not)."""
+        if self._lexical is None:
+            found = self._connection().execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chunks_fts'"
+            ).fetchone()
+            self._lexical = found is not None
+        return self._lexical
+
+    def lexical_search(self, query, top_k, filters=None, max_id=None):
+        """
+        Rank chunks against a question with BM25.
+
+        Only the question's rarest terms are used (see LEXICAL_POSTINGS_BUDGET),
+        which keeps the cost of a lexical search bounded on large corpora.
+
+        Args:
+            query (str): The question, as typed.
+            top_k (int): Number of results.
+            filters (tuple, optional): Normalized filters (see normalize_filters).
+            max_id (int, optional): Ignore rows with this id or higher, e.g. rows
+                of an append whose vectors were never committed.
+
+        Returns:
+            list[int]: Row ids, best match first.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        connection = self._connection()
+        frequencies = dict(connection.execute(
+            f"SELECT term, df FROM chunk_terms WHERE term IN ({','.join('?' * len(terms))}) AND df > 0", terms
+        ))
+
+        # Rarest terms first; they carry the most weight in BM25 and match the fewest chunks
+        selected, postings = [], 0
+        for term in sorted(frequencies, key=frequencies.get):
+            if postings + frequencies[term] > LEXICAL_POSTINGS_BUDGET:
+                break
+            selected.append(term)
+            postings += frequencies[term]
+        if not selected:
+            return []
+        # Quoted, so operators and punctuation are matched as text, not parsed as query syntax
+        expression = " OR ".join(f'"{term}"' for term in selected)
+
+        where, params = _where(filters, prefix="AND")
+        if max_id is not None:
+            where += " AND id < ?"
+            params.append(max_id)
+
+        if where:
+            sql = (f"SELECT id FROM chunks_fts JOIN chunks ON chunks.id = chunks_fts.rowid "
+                   f"WHERE chunks_fts MATCH ?{where} ORDER BY chunks_fts.rank LIMIT ?")
+        else:
+            sql = "SELECT rowid FROM chunks_fts WHERE chunks_fts MATCH ? ORDER BY rank LIMIT ?"
+        cursor = connection.execute(sql, [expression, *params, top_k])
+        return [row[0] for row in cursor]
+
+    def append(self, records, start_id):
+        """
+        Insert records with consecutive row ids starting at ``start_id``.
+
+        Existing rows from ``start_id`` on are replaced, which cleans up rows left
+        behind by an append that crashed before its vectors were committed. The
+        BM25 index is updated in the same transaction.
+        """
+        rows = [
+            (start_id + offset, record["text"], *(record[field] for field in FIELDS))
+            for offset, record in enumerate(map(to_record, records))
+        ]
+        connection = self._connection()
+        with connection:
+            leftovers = [text for (text,) in connection.execute("SELECT text FROM chunks WHERE id >= ?", (start_id,))]
+            if leftovers:
+                _count_terms(connection, leftovers, sign=-1)
+                # A plain DELETE (unlike INSERT OR REPLACE) fires the trigger that
+                # removes the old text from the BM25 index
+                connection.execute("DELETE FROM chunks WHERE id >= ?", (start_id,))
+            connection.executemany(
+                f"INSERT INTO chunks (id, text, {', '.join(FIELDS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            _count_terms(connection, [row[1] for row in rows])
+
+
+def _ensure_lexical_index(connection):
+    """Add the BM25 index to a store written before it existed, indexing the rows already there."""
+    if connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'chunks_fts'").fetchone():
+        return
+    with connection:
+        connection.executescript("BEGIN;" + LEXICAL_SCHEMA)  # One transaction with the rebuild below
+        connection.execute("INSERT INTO chunks_fts (chunks_fts) VALUES ('rebuild')")
+        _count_terms(connection, (text for (text,) in connection.execute("SELECT text FROM chunks")))
+
+
+def build_store(path, records):
+    """
+    Write a new metadata store holding ``records`` with row ids 0..n-1.
+
+    The file is created from scratch; callers write it under a new name (or a
+    temporary one) and switch to it atomically.
+    """
+    store = MetadataStore(path, readonly=False)
+    try:
+        store.append(records, 0)
+    finally:
+        store.close()
@@ -0,0 +1,268 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds; spans a cached embedding lookup up to a slow chat completion
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    escaped = {name: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for name, value in labels.items()}
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped.items()) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, one value per combination of label values. Names end in ``_total``."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def inc(self, amount=1, **labels):
+        """Add ``amount`` (default 1) to the counter for these label values."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        """(sample name, labels, value) for every label combination."""
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Histogram(Counter):
+    """Distribution of observed values (e.g. latencies in seconds) over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Record one observation."""
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]  # buckets, count, sum
+            counts[0][bisect.bisect_left(self.buckets, value)] += 1
+            counts[1] += 1
+            counts[2] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the seconds spent in the ``with`` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def summary(self, **labels):
+        """Count and sum of the observations for these label values."""
+        with self._lock:
+            counts = self._values.get(self._key(labels))
+            return {"count": counts[1], "sum": counts[2]} if counts else {"count": 0, "sum": 0.0}
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(counts[0]), counts[1], counts[2])) for key, counts in self._values.items()]
+        samples = []
+        for key, (buckets, count, total) in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), buckets):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _number(bound)}, cumulative))
+            samples.append((f"{self.name}_count", labels, count))
+            samples.append((f"{self.name}_sum", labels, total))
+        return samples
+
+
+class Registry:
+    """
+    Named metrics and collectors, rendered in the Prometheus text format.
+
+    Metrics are created once per name: ``get_or_create`` returns the existing
+    metric on later calls, so Streamlit reruns do not duplicate them. Values
+    held elsewhere, such as the cache hit counters, are read at render time
+    through ``register_collector``.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = {}  # name -> (help, kind, callback)
+        self._lock = threading.Lock()
+
+    def get_or_create(self, cls, name, help, labelnames=(), **options):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **options)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+    def register_collector(self, name, help, kind, callback):
+        """
+        Add values computed at render time, e.g. counters kept by another object.
+
+        Args:
+            name (str): Sample name.
+            help (str): Description.
+            kind (str): "counter" or "gauge".
+            callback (callable): Returns an iterable of (labels dict, value).
+        """
+        with self._lock:
+            self._collectors[name] = (help, kind, callback)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.items())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{sample}{_label_text(labels)} {_number(value)}"
+                         for sample, labels, value in metric.samples())
+        for name, (help, kind, callback) in collectors:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            try:
+                lines.extend(f"{name}{_label_text(labels)} {_number(value)}" for labels, value in callback())
+            except Exception as e:
+                print(f"Error collecting metric {name}: {e}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Current samples as a dict of sample name -> list of {"labels", "value"}, e.g. for JSON reports."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snapshot = {}
+        for metric in metrics:
+            for sample, labels, value in metric.samples():
+                snapshot.setdefault(sample, []).append({"labels": labels, "value": value})
+        return snapshot
+
+
+REGISTRY = Registry()
+
+
+def counter(name, help, labelnames=()):
+    """Return the process-wide counter ``name``, creating it on first use."""
+    return REGISTRY.get_or_create(Counter, name, help, labelnames)
+
+
+def histogram(name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+    """Return the process-wide histogram ``name``, creating it on first use."""
+    return REGISTRY.get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+
+def register_collector(name, help, kind, callback):
+    """Add values computed at render time to the process-wide registry (see Registry.register_collector)."""
+    REGISTRY.register_collector(name, help, kind, callback)
+
+
+def render():
+    """The process-wide metrics in the Prometheus text exposition format."""
+    return REGISTRY.render()
+
+
+_log_lock = threading.Lock()
+
+
+def log_event(event, **fields):
+    """
+    Append one JSON line describing ``event`` to the METRICS_LOG file, if that variable is set.
+
+    Used for a per-request log of chat completions next to the aggregated
+    metrics. Fields that are None are left out.
+    """
+    path = os.environ.get("METRICS_LOG")
+    if not path:
+        return
+    record = {"ts": round(time.time(), 3), "event": event,
+              **{name: value for name, value in fields.items() if value is not None}}
+    line = json.dumps(record, default=str)
+    with _log_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass  # Scraped every few seconds; keep the app's output readable
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_server(port, host="0.0.0.0"):
+    """Serve GET /metrics on ``port`` from a daemon thread; later calls return the running server."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+        return _server
+
+
+def start_server_from_env():
+    """
+    Start the /metrics server if METRICS_PORT is set; returns the server or None.
+
+    Streamlit has no route for it, so the metrics get a port of their own.
+    """
+    port = os.environ.get("METRICS_PORT")
+    if not port:
+        return None
+    try:
+        return start_server(int(port))
+    except OSError as e:
+        print(f"Could not serve metrics on port {port}: {e}")
+        return None
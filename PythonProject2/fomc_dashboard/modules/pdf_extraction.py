@@ -0,0 +1,295 @@
+import contextlib
+import hashlib
+import io
+import itertools
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    file_hash TEXT PRIMARY KEY,  -- sha256 of the PDF bytes
+    pages INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pages (
+    file_hash TEXT NOT NULL,
+    page INTEGER NOT NULL,       -- Starting at 1
+    text TEXT NOT NULL,
+    PRIMARY KEY (file_hash, page)
+) WITHOUT ROWID;
+"""
+
+PAGE_CACHE_PATH = os.environ.get("PDF_PAGE_CACHE", "pdf_pages.db")
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", "0")) or None  # None: one per CPU
+PAGES_PER_TASK = 8  # Pages extracted per task sent to a worker process
+
+
+def file_hash(data):
+    """sha256 hex digest of a PDF's bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _read(source):
+    """Bytes of a PDF given as a path, bytes or a binary file-like object (e.g. a Streamlit upload)."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    source.seek(0)
+    return source.read()
+
+
+@contextlib.contextmanager
+def _shared_file(source, data):
+    """Path the worker processes read a PDF from: ``source`` itself if it is a path, else a temporary copy."""
+    if isinstance(source, (str, os.PathLike)):
+        yield os.fspath(source)
+        return
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        yield path
+    finally:
+        os.remove(path)
+
+
+def _reader(data):
+    # Imported here so that importing this module does not require PyPDF2
+    import PyPDF2
+
+    return PyPDF2.PdfReader(io.BytesIO(data))
+
+
+def _page_texts(reader, numbers):
+    return [(number, reader.pages[number - 1].extract_text() or "") for number in numbers]
+
+
+# Set in each worker process: (file hash, reader) of the last PDF, reused by its next tasks
+_worker_document = (None, None)
+
+
+def _extract_pages(digest, path, numbers):
+    """
+    Extract the text of some pages (numbered from 1) of a PDF; runs in a worker process.
+
+    Tasks carry the file's path rather than its bytes, and each worker reads
+    the file once per document.
+    """
+    global _worker_document
+    if _worker_document[0] != digest:
+        with open(path, "rb") as f:
+            _worker_document = (digest, _reader(f.read()))
+    return _page_texts(_worker_document[1], numbers)
+
+
+class PageCache:
+    """
+    SQLite cache of extracted PDF text, one row per (file hash, page).
+
+    Keyed by the content of the file rather than its name, so the same minutes
+    uploaded twice, or downloaded again under another name, are extracted
+    once. Each thread gets its own connection.
+    """
+
+    def __init__(self, path=PAGE_CACHE_PATH):
+        """
+        Open (or create) a page cache.
+
+        Args:
+            path (str, optional): SQLite file. Defaults to PAGE_CACHE_PATH (env PDF_PAGE_CACHE, "pdf_pages.db").
+        """
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        """Close this thread's connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def page_count(self, file_hash):
+        """Number of pages of a cached document, or None if the document was never seen."""
+        row = self._connection().execute("SELECT pages FROM documents WHERE file_hash = ?", (file_hash,)).fetchone()
+        return row[0] if row else None
+
+    def numbers(self, file_hash):
+        """Numbers of the cached pages of a document."""
+        cursor = self._connection().execute("SELECT page FROM pages WHERE file_hash = ?", (file_hash,))
+        return {number for (number,) in cursor}
+
+    def get(self, file_hash, first=1, last=None):
+        """Page number -> text of the cached pages of a document, optionally only pages ``first`` to ``last``."""
+        if last is None:
+            cursor = self._connection().execute("SELECT page, text FROM pages WHERE file_hash = ? AND page >= ?",
+                                                (file_hash, first))
+        else:
+            cursor = self._connection().execute(
+                "SELECT page, text FROM pages WHERE file_hash = ? AND page BETWEEN ? AND ?", (file_hash, first, last)
+            )
+        return dict(cursor)
+
+    def put(self, file_hash, page_count, pages):
+        """Store the page count of a document and the text of some of its pages, given as (number, text)."""
+        with self._connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO documents (file_hash, pages) VALUES (?, ?)",
+                               (file_hash, page_count))
+            connection.executemany("INSERT OR REPLACE INTO pages (file_hash, page, text) VALUES (?, ?, ?)",
+                                   [(file_hash, number, text) for number, text in pages])
+
+
+class PdfExtractor:
+    """
+    PDF text extraction shared by the sentiment page and ingestion.
+
+    Pages missing from the page cache are extracted in a pool of worker
+    processes, PAGES_PER_TASK pages per task, so a long document uses every
+    core instead of blocking one thread; documents of at most one task are
+    extracted in the calling process, where the pool would only add overhead.
+    The pool is started on first use.
+
+    iter_pages streams a document in windows of PAGES_PER_TASK pages, so only
+    a few windows of text are in memory at a time, however long the document.
+
+    Usage:
+        text = get_extractor().extract_text(uploaded_file)
+    """
+
+    def __init__(self, workers=PDF_WORKERS, cache_path=PAGE_CACHE_PATH, pages_per_task=PAGES_PER_TASK):
+        """
+        Args:
+            workers (int, optional): Worker processes. Defaults to PDF_WORKERS (env PDF_WORKERS, else the CPU count).
+            cache_path (str, optional): Page cache file, or None for no cache. Defaults to PAGE_CACHE_PATH.
+            pages_per_task (int, optional): Pages per worker task. Defaults to PAGES_PER_TASK.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
+        self.cache = PageCache(cache_path) if cache_path else None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # Streamlit serves sessions from threads; fork() from a threaded process is unsafe
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def iter_pages(self, source):
+        """
+        Yield the text of each page of a PDF, in page order.
+
+        Pages are read from the page cache or extracted a window of
+        PAGES_PER_TASK pages at a time, and each extracted window is stored in
+        the cache before its pages are yielded. With the worker pool, at most
+        two windows per worker are in flight ahead of the consumer.
+
+        Args:
+            source (str, bytes or file-like): Path, content or open binary file of the PDF.
+
+        Yields:
+            tuple: (page number starting at 1, text), "" for pages without text.
+        """
+        data = _read(source)
+        digest = file_hash(data)
+        page_count = self.cache.page_count(digest) if self.cache else None
+        reader = None
+        if page_count is None:
+            reader = _reader(data)
+            page_count = len(reader.pages)
+
+        cached = self.cache.numbers(digest) if self.cache else set()
+        windows = [range(first, min(first + self.pages_per_task, page_count + 1))
+                   for first in range(1, page_count + 1, self.pages_per_task)]
+        tasks = [[number for number in window if number not in cached] for window in windows]
+        parallel = self.workers > 1 and sum(1 for numbers in tasks if numbers) > 1
+
+        with contextlib.ExitStack() as stack:
+            futures = {}  # Window index -> future of its missing pages
+            if parallel:
+                pool = self._pool()
+                path = stack.enter_context(_shared_file(source, data))
+                # Windows the consumer never reached are not extracted
+                stack.callback(lambda: [future.cancel() for future in futures.values()])
+                ahead = iter([(i, numbers) for i, numbers in enumerate(tasks) if numbers])
+
+            for i, window in enumerate(windows):
+                extracted = []
+                if tasks[i]:
+                    if parallel:
+                        for index, numbers in itertools.islice(ahead, 2 * self.workers - len(futures)):
+                            futures[index] = pool.submit(_extract_pages, digest, path, numbers)
+                        extracted = futures.pop(i).result()
+                    else:
+                        reader = reader or _reader(data)
+                        extracted = _page_texts(reader, tasks[i])
+                    if self.cache:
+                        self.cache.put(digest, page_count, extracted)
+                texts = dict(extracted)
+                if len(texts) < len(window):
+                    texts.update(self.cache.get(digest, window[0], window[-1]))
+                for number in window:
+                    yield number, texts[number]
+
+    def extract_pages(self, source):
+        """
+        Return the text of every page of a PDF.
+
+        Args:
+            source (str, bytes or file-like): Path, content or open binary file of the PDF.
+
+        Returns:
+            list[str]: Text of each page, in page order ("" for pages without text).
+        """
+        return [text for _, text in self.iter_pages(source)]
+
+    def extract_text(self, source):
+        """Text of a whole PDF: its pages concatenated as extracted, like PyPDF2's page loop."""
+        return "".join(text for _, text in self.iter_pages(source))
+
+    def close(self):
+        """Stop the worker processes, if they were started."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor():
+    """
+    Return the process-wide PDF extractor, creating it on first use.
+
+    Streamlit runs every session in the same process, so all sessions share
+    one worker pool and page cache.
+    """
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = PdfExtractor()
+        return _extractor
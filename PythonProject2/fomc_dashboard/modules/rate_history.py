@@ -0,0 +1,192 @@
+import io
+import os
+import sys
+import tempfile
+
+import pandas as pd
+import requests
+
+from fomc_dashboard.modules.cache import LRUCache
+
+# Wikipedia page with the history of FOMC rate decisions
+WIKI_URL = "https://en.wikipedia.org/wiki/History_of_Federal_Open_Market_Committee_actions"
+
+RATE_HISTORY_PATH = os.environ.get("RATE_HISTORY", "rate_history.parquet")
+RATE_HISTORY_TTL = float(os.environ.get("RATE_HISTORY_TTL", "3600"))  # Seconds before the file is read again
+COLUMNS = ("date", "lower", "upper", "change_bp", "vote")
+
+FOOTNOTE = r"\[[^\]]*\]"  # "[12]", "[a]", "[note 3]"
+NUMBER = r"\d+(?:\.\d+)?"
+# "5.25%–5.50%", "5.25–5.50%", "0 to 0.25%"; a single target ("5.25%") has no second number
+RATE_RANGE = rf"(?P<lower>{NUMBER})\s*%?\s*(?:[-–—]|to)\s*(?P<upper>{NUMBER})\s*%?"
+VOTE = r"(?P<for>\d+)\s*[-–—:]\s*(?P<against>\d+)"
+
+# path -> DataFrame; a refreshed file is picked up once the entry expires
+_histories = LRUCache(max_size=8, ttl=RATE_HISTORY_TTL)
+
+
+def _column(columns, *keywords):
+    """First column whose lower-cased name contains every keyword, or None."""
+    for column in columns:
+        name = " ".join(map(str, column)) if isinstance(column, tuple) else str(column)
+        if all(keyword in name.lower() for keyword in keywords):
+            return column
+    return None
+
+
+def read_action_tables(html):
+    """
+    Read every table of the FOMC actions page that has a date and a federal funds rate column.
+
+    Args:
+        html (str): Page HTML.
+
+    Returns:
+        list[pd.DataFrame]: The tables as strings, footnote markers removed.
+    """
+    try:
+        tables = pd.read_html(io.StringIO(html), attrs={"class": "wikitable"}, flavor="lxml")
+    except ValueError:  # The page has no such table at all
+        return []
+    action_tables = []
+    for table in tables:
+        if _column(table.columns, "date") is not None and _column(table.columns, "fund") is not None:
+            table = table.astype("string").replace(FOOTNOTE, "", regex=True)
+            action_tables.append(table)
+    return action_tables
+
+
+def parse_rate_actions(table):
+    """
+    Turn one scraped action table into typed columns, using vectorized string operations.
+
+    Args:
+        table (pd.DataFrame): Table from read_action_tables.
+
+    Returns:
+        pd.DataFrame: "date" (datetime64), "lower" and "upper" bounds of the
+        target in percent (equal for the single targets before December 2008)
+        and "vote" ("for-against", missing if the table has no vote column).
+        Rows without a valid date are dropped.
+    """
+    dates = table[_column(table.columns, "date")].str.strip()
+    date = pd.to_datetime(dates, format="%B %d, %Y", errors="coerce")
+    unparsed = date.isna() & dates.notna()
+    if unparsed.any():  # Abbreviated months, e.g. "Dec. 16, 2008"; %b knows September only as "Sep"
+        abbreviated = dates[unparsed].str.replace(".", "", regex=False).str.replace(r"^Sept\b", "Sep", regex=True)
+        date[unparsed] = pd.to_datetime(abbreviated, format="%b %d, %Y", errors="coerce")
+
+    rates = table[_column(table.columns, "fund")]
+    bounds = rates.str.extract(RATE_RANGE)
+    single = rates.str.extract(rf"({NUMBER})", expand=False)
+    lower = pd.to_numeric(bounds["lower"].fillna(single), errors="coerce").astype("float64")
+    upper = pd.to_numeric(bounds["upper"].fillna(single), errors="coerce").astype("float64")
+
+    vote_column = _column(table.columns, "vote")
+    if vote_column is not None:
+        votes = table[vote_column].str.extract(VOTE)
+        vote = votes["for"].str.cat(votes["against"], sep="-")
+    else:
+        vote = pd.Series(pd.NA, index=table.index, dtype="string")
+
+    parsed = pd.DataFrame({"date": date, "lower": lower, "upper": upper, "vote": vote.astype("string")})
+    return parsed.dropna(subset=["date"])
+
+
+def parse_rate_history(html):
+    """
+    Parse the rate decisions of the FOMC actions page into one typed table.
+
+    Args:
+        html (str): Page HTML.
+
+    Returns:
+        pd.DataFrame: COLUMNS, one row per decision sorted by date; "change_bp"
+        is the change of the upper bound from the previous decision in basis
+        points (missing for the first).
+    """
+    tables = [parse_rate_actions(table) for table in read_action_tables(html)]
+    if not tables:
+        raise ValueError("No rate decision tables found on the page.")
+    history = (pd.concat(tables, ignore_index=True)
+               .dropna(subset=["upper"])
+               .drop_duplicates(subset=["date"])
+               .sort_values("date", ignore_index=True))
+    history["change_bp"] = (history["upper"].diff() * 100).round().astype("Int64")
+    return history[list(COLUMNS)]
+
+
+def refresh_rate_history(path=RATE_HISTORY_PATH, url=WIKI_URL, timeout=30):
+    """
+    Download and parse the rate history, and write it to a Parquet file.
+
+    The file is written to a temporary file and renamed into place, so pages
+    reading it never see a partial file.
+
+    Args:
+        path (str, optional): Parquet file. Defaults to RATE_HISTORY_PATH (env RATE_HISTORY).
+        url (str, optional): Page to parse. Defaults to WIKI_URL.
+        timeout (float, optional): Request timeout in seconds. Defaults to 30.
+
+    Returns:
+        int: Number of rows written.
+    """
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    df = parse_rate_history(response.text)
+    if df.empty:
+        raise ValueError(f"No rate decisions found at {url}; keeping the existing rate history")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _histories.clear()
+    return len(df)
+
+
+def load_rate_history(path=RATE_HISTORY_PATH):
+    """
+    Return the rate history written by refresh_rate_history.
+
+    The DataFrame is cached process-wide for RATE_HISTORY_TTL seconds and
+    shared by every Streamlit session, so callers must not modify it.
+
+    Args:
+        path (str, optional): Parquet file. Defaults to RATE_HISTORY_PATH (env RATE_HISTORY).
+
+    Raises:
+        FileNotFoundError: If the refresh job has not written the file yet.
+        ValueError: If the file was written with other columns, e.g. by an older version.
+    """
+    key = os.path.abspath(path)
+    df = _histories.get(key)
+    if df is None:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Rate history '{path}' does not exist; run "
+                                    f"python -m fomc_dashboard.modules.rate_history to create it")
+        df = pd.read_parquet(path)
+        if tuple(df.columns) != COLUMNS:
+            raise ValueError(f"Rate history '{path}' has columns {list(df.columns)}, expected {list(COLUMNS)}; "
+                             f"run python -m fomc_dashboard.modules.rate_history to rebuild it")
+        _histories.put(key, df)
+    return df
+
+
+if __name__ == "__main__":
+    # python -m fomc_dashboard.modules.rate_history [--path rate_history.parquet] [--url URL]
+    args = sys.argv[1:]
+    options = {}
+    for flag, key in (("--path", "path"), ("--url", "url")):
+        if flag in args:
+            position = args.index(flag)
+            options[key] = args[position + 1]
+            del args[position:position + 2]
+    rows = refresh_rate_history(**options)
+    print(f"Wrote {rows} rate decisions to '{options.get('path', RATE_HISTORY_PATH)}'.")
@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+
+# Azure OpenAI enforces per-minute quotas over short windows, so a full minute's
+# quota must not be spent in one burst
+DEFAULT_WINDOW = 10.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at ``rate`` tokens per second, up to ``capacity``.
+
+    Callers reserve tokens and then wait until the bucket has paid them off, so
+    waiting callers are served in the order they arrived and a large request
+    never starves behind a stream of small ones.
+    """
+
+    def __init__(self, rate, capacity):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Most tokens the bucket holds, i.e. the largest burst.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount=1):
+        """Take ``amount`` tokens, possibly going into debt; return the seconds to wait before using them."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def wait_time(self, amount=1):
+        """Seconds until ``amount`` tokens would be available, without taking them."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (amount - self._tokens) / self.rate)
+
+    def adjust(self, amount):
+        """Take (positive) or return (negative) tokens after the fact, e.g. once the real usage is known."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+class RateLimiter:
+    """
+    Client-side requests-per-minute and tokens-per-minute limits of one model deployment.
+
+    Each request reserves one request and its estimated tokens; the estimate
+    can be corrected with ``settle`` once the response reports its usage. Either
+    limit may be None to leave it unlimited.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, window=DEFAULT_WINDOW):
+        """
+        Args:
+            requests_per_minute (float, optional): Request quota of the deployment.
+            tokens_per_minute (float, optional): Token quota of the deployment.
+            window (float, optional): Seconds of quota that may be used in one burst. Defaults to DEFAULT_WINDOW.
+        """
+        self.requests = self._bucket(requests_per_minute, window)
+        self.tokens = self._bucket(tokens_per_minute, window)
+
+    @staticmethod
+    def _bucket(per_minute, window):
+        if not per_minute:
+            return None
+        rate = per_minute / 60.0
+        return TokenBucket(rate, max(1.0, rate * window))
+
+    def _buckets(self, tokens):
+        return [(bucket, amount) for bucket, amount in ((self.requests, 1), (self.tokens, tokens))
+                if bucket is not None]
+
+    def reserve(self, tokens=0):
+        """Reserve one request and ``tokens`` tokens; return the seconds to wait before sending."""
+        return max([bucket.reserve(amount) for bucket, amount in self._buckets(tokens)], default=0.0)
+
+    def acquire(self, tokens=0):
+        """Block until a request of ``tokens`` tokens may be sent."""
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+    async def aacquire(self, tokens=0):
+        """Async variant of acquire."""
+        import asyncio
+
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def try_acquire(self, tokens=0):
+        """Reserve a request only if it can be sent right away; return whether it was reserved."""
+        buckets = self._buckets(tokens)
+        if any(bucket.wait_time(amount) > 0 for bucket, amount in buckets):
+            return False
+        for bucket, amount in buckets:
+            bucket.reserve(amount)
+        return True
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Correct a request's token reservation once its real usage is known."""
+        if self.tokens is not None and actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+
+def backoff_delay(attempt, retry_after=None, base=0.5, cap=30.0):
+    """
+    Seconds to wait before retry number ``attempt`` (0 for the first retry).
+
+    Honors the server's Retry-After in full when given (coming back sooner would
+    only be throttled again), with a little jitter so that clients told the same
+    delay do not all come back at once; otherwise uses full-jitter exponential
+    backoff, uniform in [0, min(cap, base * 2**attempt)].
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
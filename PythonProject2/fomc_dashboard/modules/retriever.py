@@ -0,0 +1,306 @@
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from fomc_dashboard.modules import metrics
+from fomc_dashboard.modules.index_factory import DEFAULT_PARAMS, SEARCH_PARAMS, apply_search_params, config_path
+from fomc_dashboard.modules.cache import LRUCache
+from fomc_dashboard.modules.index_store import load_segmented
+from fomc_dashboard.modules.metadata_store import normalize_filters
+
+RRF_K = 60  # Reciprocal rank fusion constant; damps the weight of the very first ranks
+
+SEARCH_SECONDS = metrics.histogram("rag_search_seconds", "Retriever search time, metadata lookup included",
+                                   ("mode",))
+
+
+class FaissRetriever:
+    """
+    Long-lived view over a FAISS index and its metadata.
+
+    The index (base plus delta segments) is loaded once and kept in memory for the
+    lifetime of the process; metadata rows are read from the memory-mapped metadata
+    store for the hits only. When the files change on disk, a new index is loaded
+    and swapped in together with its metadata store as a single snapshot, so
+    concurrent searches never see an index paired with metadata from a different version.
+    """
+
+    def __init__(self, index_path="faiss_index.index", metadata_path="metadata.db", check_interval=1.0):
+        """
+        Initialize the retriever and load the index and metadata.
+
+        Args:
+            index_path (str): Path to the FAISS index file.
+            metadata_path (str): Path to the metadata store.
+            check_interval (float, optional): Minimum seconds between checks for
+                changed files on disk. Defaults to 1.0.
+        """
+        self.index_path = index_path
+        self.metadata_path = metadata_path
+        self.check_interval = check_interval
+        self.version = 0
+        self.config = None
+        self._search_overrides = {}
+
+        self._snapshot = None  # (signature, index, metadata store), replaced as a whole
+        self._reload_lock = threading.Lock()
+        self._last_check = 0.0
+        self._selections = LRUCache(max_size=64)  # (snapshot signature, filters) -> IdSelection
+        self.reload()
+
+    def _signature(self):
+        """
+        Return a cheap fingerprint of the files backing the index.
+
+        Appends, rebuilds and compactions all end with a rewrite of the manifest;
+        the index file covers indexes written without one.
+        """
+        signature = []
+        for path in (config_path(self.index_path), self.index_path):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                signature.append(None)
+                continue
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def reload(self, force=False):
+        """
+        Load the index and metadata from disk if they changed since the last load.
+
+        Readers keep using the previous snapshot until the new one is complete.
+
+        Args:
+            force (bool, optional): Reload even if the files look unchanged. Defaults to False.
+
+        Returns:
+            bool: True if a new snapshot was installed.
+        """
+        with self._reload_lock:
+            self._last_check = time.monotonic()
+            signature = self._signature()
+            if not force and self._snapshot is not None and self._snapshot[0] == signature:
+                return False
+
+            index, metadata, config = load_segmented(self.index_path, self.metadata_path)
+            config.update(self._search_overrides)
+            apply_search_params(index.base, config)
+
+            # A writer may have replaced the files while we were reading them;
+            # keep serving the old snapshot and pick the change up on the next check.
+            if self._signature() != signature and self._snapshot is not None:
+                return False
+
+            self._snapshot = (signature, index, metadata)
+            self.config = config
+            self.version += 1
+            return True
+
+    def _maybe_reload(self):
+        """Reload in the calling thread if the check interval has elapsed."""
+        if time.monotonic() - self._last_check < self.check_interval:
+            return
+        # Only one thread checks the files; the others carry on with the current snapshot.
+        if self._reload_lock.locked():
+            return
+        try:
+            self.reload()
+        except (OSError, RuntimeError, sqlite3.Error) as e:
+            print(f"Keeping previous FAISS snapshot, reload failed: {e}")
+
+    def refresh(self):
+        """
+        Pick up changed files if the check interval has elapsed.
+
+        Returns:
+            int: The version of the snapshot now being served; it changes on every reload.
+        """
+        self._maybe_reload()
+        return self.version
+
+    def set_search_params(self, **params):
+        """
+        Change search-time parameters (nprobe, ef_search) of the loaded index.
+
+        The values are kept across reloads of this retriever but are not written
+        to disk; store them in the index configuration to make them permanent.
+        """
+        supported = set(SEARCH_PARAMS) & set(DEFAULT_PARAMS[self.config["index_type"]])
+        unknown = set(params) - supported
+        if unknown:
+            raise ValueError(f"Unsupported search parameters for '{self.config['index_type']}': {sorted(unknown)}")
+
+        self._search_overrides.update(params)
+        self.config.update(params)  # Shared with the snapshot's index for filtered searches
+        apply_search_params(self._snapshot[1].base, self.config)
+
+    @property
+    def ntotal(self):
+        """Number of vectors in the current snapshot."""
+        return self._snapshot[1].ntotal
+
+    def search(self, embeddings, top_k=5, filters=None, queries=None):
+        """
+        Search the index for the nearest neighbours of one or more embeddings.
+
+        Args:
+            embeddings (array-like): Query embeddings of shape (n, dimension).
+            top_k (int, optional): Number of results per query. Defaults to 5.
+            filters (dict, optional): Restrict results by "start_date", "end_date" and
+                "doc_types" (see metadata_store.normalize_filters). Applied inside the
+                FAISS search, so all top_k slots go to matching chunks.
+            queries (list[str], optional): The query texts. When given, the vector hits
+                are fused with BM25 matches on the chunk text (hybrid search), so exact
+                terms such as "SOMA" or "25 basis points" are not missed.
+
+        Returns:
+            list[list[dict]]: For each query, the results as dicts with "text", "distance",
+            the FAISS row "id" and the chunk's metadata fields (meeting_date, doc_type, ...).
+            Hybrid results are ordered by their fused "score"; chunks found only by BM25
+            get the distance of their stored vector to the query.
+        """
+        self._maybe_reload()
+        snapshot = self._snapshot
+        with SEARCH_SECONDS.time(mode="hybrid" if queries is not None else "vector"):
+            filters = normalize_filters(filters)
+            return self._search_snapshot(snapshot, embeddings, top_k, self._select(snapshot, filters), filters,
+                                         queries)
+
+    def search_batch(self, embeddings, top_k=5, batch_size=1024, filters=None, queries=None):
+        """
+        Search many query embeddings in fixed-size blocks.
+
+        All blocks are answered from the same snapshot, so a reload in the middle
+        of a large batch cannot mix results from two index versions.
+
+        Args:
+            embeddings (array-like): Query embeddings of shape (n, dimension).
+            top_k (int, optional): Number of results per query. Defaults to 5.
+            batch_size (int, optional): Queries per FAISS search call. Defaults to 1024.
+            filters (dict, optional): Metadata filters, as for search().
+            queries (list[str], optional): Query texts for hybrid search, as for search().
+
+        Returns:
+            list[list[dict]]: Per-query results, in input order.
+        """
+        self._maybe_reload()
+        snapshot = self._snapshot
+        filters = normalize_filters(filters)
+        selection = self._select(snapshot, filters)
+
+        embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+        results = []
+        for start in range(0, len(embeddings), batch_size):
+            block_queries = queries[start:start + batch_size] if queries is not None else None
+            results.extend(self._search_snapshot(snapshot, embeddings[start:start + batch_size], top_k, selection,
+                                                 filters, block_queries))
+        return results
+
+    def _select(self, snapshot, filters):
+        """
+        Selection (row ids and FAISS selectors) matching normalized ``filters`` in a snapshot,
+        or None when unfiltered.
+        """
+        if filters is None:
+            return None
+
+        # The same few filters (this year, minutes only, ...) come up again and again;
+        # the ids and the O(ntotal) selector bitmaps are built once per snapshot
+        key = (snapshot[0], filters)
+        selection = self._selections.get(key)
+        if selection is None:
+            ids = snapshot[2].select_ids(filters)
+            ids = ids[ids < snapshot[1].ntotal]  # Rows of an append that was never committed
+            selection = snapshot[1].selection(ids)
+            self._selections.put(key, selection)
+        return selection
+
+    @staticmethod
+    def _search_snapshot(snapshot, embeddings, top_k, selection=None, filters=None, queries=None):
+        """Run one FAISS search (fused with BM25 when ``queries`` are given) and attach the metadata."""
+        _, index, store = snapshot
+
+        embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+        if selection is not None and len(selection.ids) == 0:
+            return [[] for _ in embeddings]
+        hybrid = queries is not None and store.has_lexical_index()
+
+        # Fusion needs a few more candidates from each side than it returns
+        candidates = top_k * 4 if hybrid else top_k
+        distances, indices = index.search(embeddings, candidates, selection=selection)
+
+        rankings = []
+        for i, (row_distances, row_indices) in enumerate(zip(distances, indices)):
+            # FAISS pads with -1 when the index holds fewer than top_k vectors
+            vector_hits = {int(idx): float(distance) for idx, distance in zip(row_indices, row_distances) if idx != -1}
+            if hybrid:
+                lexical_ids = store.lexical_search(queries[i], candidates, filters, max_id=index.ntotal)
+                scores = reciprocal_rank_fusion([list(vector_hits), lexical_ids])
+                ranked = sorted(scores, key=scores.get, reverse=True)[:top_k]
+                lexical_only = [idx for idx in ranked if idx not in vector_hits]
+                if lexical_only:
+                    stored = index.reconstruct(lexical_only)
+                    for idx, distance in zip(lexical_only, ((stored - embeddings[i]) ** 2).sum(axis=1)):
+                        vector_hits[idx] = float(distance)
+                rankings.append([(idx, vector_hits[idx], scores[idx]) for idx in ranked])
+            else:
+                rankings.append([(idx, distance, None) for idx, distance in vector_hits.items()])
+
+        rows = store.fetch({idx for ranking in rankings for idx, _, _ in ranking})
+
+        results = []
+        for ranking in rankings:
+            row_results = []
+            for idx, distance, score in ranking:
+                result = {"text": rows[idx]["text"], "distance": distance, **rows[idx]}
+                if hybrid:
+                    result["score"] = score
+                row_results.append(result)
+            results.append(row_results)
+        return results
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """
+    Fuse several rankings of row ids with reciprocal rank fusion.
+
+    Each list contributes 1 / (k + rank) to the score of the ids it contains, so
+    only ranks are compared and BM25 scores never have to be put on the same
+    scale as L2 distances.
+
+    Args:
+        rankings (list[list[int]]): Row ids, best first, one list per ranker.
+        k (int, optional): Fusion constant. Defaults to RRF_K.
+
+    Returns:
+        dict: Row id -> fused score (higher is better).
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, idx in enumerate(ranking, start=1):
+            scores[idx] = scores.get(idx, 0.0) + 1.0 / (k + rank)
+    return scores
+
+
+_retrievers = {}
+_retrievers_lock = threading.Lock()
+
+
+def get_retriever(index_path="faiss_index.index", metadata_path="metadata.db"):
+    """
+    Return the process-wide retriever for the given files, creating it on first use.
+
+    Streamlit runs every session in the same process, so all sessions share one
+    in-memory copy of the index.
+    """
+    key = (os.path.abspath(index_path), os.path.abspath(metadata_path))
+    with _retrievers_lock:
+        retriever = _retrievers.get(key)
+        if retriever is None:
+            retriever = FaissRetriever(index_path, metadata_path)
+            _retrievers[key] = retriever
+        return retriever
@@ -1,91 +1,246 @@
-from sentence_transformers import SentenceTransformer
-import faiss
-import pickle
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from fomc_dashboard.modules import ai_responder, metrics
+from fomc_dashboard.modules.answer_cache import context_key, get_answer_cache
+from fomc_dashboard.modules.cache import LRUCache
+from fomc_dashboard.modules.context_packer import DEFAULT_CONTEXT_TOKENS, pack_context
+from fomc_dashboard.modules.embedding_cache import EmbeddingCache
+from fomc_dashboard.modules.index_factory import build_index, config_path, make_index_config
+from fomc_dashboard.modules.index_store import append_segment, write_base
+from fomc_dashboard.modules.metadata_store import normalize_filters, to_record
+from fomc_dashboard.modules.retriever import get_retriever
+
+# Embedding model, loaded on first use by get_model()
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+dimension = 384  # Embedding size for the model
 
-# Initialize embedding model
-model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+_model = None
+_model_lock = threading.Lock()
 
-# FAISS Index Initialization
-dimension = 384  # Embedding size for the model
-index = faiss.IndexFlatL2(dimension)  # Use L2 distance for similarity search
-metadata = []  # To store corresponding metadata (e.g., paragraph ID or text)
+# Popular questions repeat a lot, especially right after a meeting
+_query_embeddings = LRUCache(max_size=4096, ttl=3600)
+_query_results = LRUCache(max_size=4096, ttl=600)
+
+EMBEDDING_SECONDS = metrics.histogram("rag_embedding_seconds", "Query encoding time, cache misses only")
 
 
-def store_in_faiss(paragraphs, metadata_file="metadata.pkl", index_file="faiss_index"):
+def get_model():
     """
-    Generate embeddings for paragraphs and store them in FAISS along with metadata.
+    Return the shared embedding model, loading it on first use.
+
+    sentence_transformers pulls in torch, so it is only imported here rather than
+    when this module is imported.
     """
-    global metadata
-    # Generate embeddings
-    embeddings = model.encode(paragraphs)
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(MODEL_NAME)
+    return _model
 
-    # Add embeddings to the FAISS index
+
+def store_in_faiss(paragraphs, metadata_file="metadata.db", index_file="faiss_index", index_type="flat",
+                   rebuild=False, embedding_cache="embedding_cache.db", encoder=None, **index_params):
+    """
+    Generate embeddings for paragraphs and store them in FAISS along with metadata.
+
+    Paragraphs are plain strings or dicts with "text" and optional per-chunk
+    fields (meeting_date, doc_type, section, source_url), which are kept in the
+    SQLite metadata store under the paragraph's FAISS row id.
+
+    If the index already exists, the paragraphs are appended as a delta segment:
+    only the new vectors and metadata are written, and segments are compacted
+    into the base index in the background. Otherwise (or with ``rebuild=True``)
+    a new index is built using ``index_type`` ("flat", "hnsw", "ivf_flat" or
+    "ivf_pq") and ``index_params`` (e.g. nlist=256, nprobe=8, ef_search=128,
+    or codec="float16"/"int8" to store the vectors at 1/2 or 1/4 of the memory);
+    IVF/PQ and int8 indexes are trained on these embeddings. Every file is replaced
+    atomically, so a crash never leaves a half-written index behind.
+
+    Embeddings are looked up in the persistent ``embedding_cache`` first and only
+    paragraphs the model has not seen before are encoded; pass None to disable it.
+    ``encoder`` replaces the in-process model for those, e.g. ``EncodingPool.encode``
+    to spread a bulk re-embed over several worker processes.
+    """
+    index_path = f"{index_file}.index"
+
+    records = [to_record(paragraph) for paragraph in paragraphs]
+
+    # Generate embeddings, reusing cached vectors for unchanged paragraphs
+    texts = [record["text"] for record in records]
+    encoder = encoder or (lambda texts: get_model().encode(texts))
+    if embedding_cache:
+        with EmbeddingCache(embedding_cache, model_name=MODEL_NAME) as cache:
+            embeddings = cache.encode(texts, encoder)
+    else:
+        embeddings = encoder(texts)
+
+    if not rebuild and (os.path.exists(config_path(index_path)) or os.path.exists(index_path)):
+        segments = append_segment(index_path, metadata_file, embeddings, records)
+        print(f"Appended {len(records)} paragraphs to '{index_path}' ({segments} delta segments).")
+        return
+
+    config = make_index_config(index_type, dimension, **index_params)
+    index = build_index(config, training_vectors=embeddings)
     index.add(embeddings)
+    write_base(index_path, metadata_file, index, records, config)
 
-    # Attach metadata
-    metadata.extend(paragraphs)
+    print(f"FAISS index saved to '{index_path}' and metadata saved to '{metadata_file}'.")
 
-    # Save FAISS index and metadata
-    faiss.write_index(index, f"{index_file}.index")
-    with open(metadata_file, "wb") as f:
-        pickle.dump(metadata, f)
 
-    print(f"FAISS index saved to '{index_file}.index' and metadata saved to '{metadata_file}'.")
+def normalize_query(query):
+    """
+    Normalize a question for cache lookups.
+
+    The MiniLM tokenizer is uncased, so case and whitespace do not change the embedding.
+    """
+    return " ".join(query.lower().split())
 
 
-# Example usage:
-paragraphs = [
-    "The FOMC decided to maintain interest rates at 5.25%.",
-    "Inflation expectations have declined compared to last quarter.",
-    "GDP growth was revised downward due to tighter credit conditions.",
-    "The Federal Reserve is monitoring labor market trends closely.",
-]
-store_in_faiss(paragraphs)
+def embed_query(query):
+    """
+    Return the embedding of a single query, served from an in-process LRU cache when possible.
+
+    Returns:
+        np.ndarray: Array of shape (1, dimension).
+    """
+    key = normalize_query(query)
+    embedding = _query_embeddings.get(key)
+    if embedding is None:
+        with EMBEDDING_SECONDS.time():
+            embedding = get_model().encode([key])
+        _query_embeddings.put(key, embedding)
+    return embedding
 
 
-def query_faiss(query, metadata_file="metadata.pkl", index_file="faiss_index", top_k=5):
+def query_faiss(query, metadata_file="metadata.db", index_file="faiss_index", top_k=5, filters=None, hybrid=True):
     """
     Query FAISS index to retrieve the most relevant paragraphs for a given query.
+
+    The index and metadata are held in memory by a shared retriever and only
+    re-read from disk when the files change. Results are cached per normalized
+    query and index version, so a reload of the index invalidates them.
+
+    ``filters`` restricts the search to matching chunks, e.g.
+    ``{"start_date": "2022-01-01", "end_date": "2022-12-31", "doc_types": ["minutes"]}``.
+
+    With ``hybrid`` (the default), the vector hits are fused with BM25 matches on
+    the chunk text, so questions naming exact terms ("SOMA", "25 basis points")
+    find the chunks containing them without raising top_k.
     """
-    # Load FAISS index and metadata
-    faiss_index = faiss.read_index(f"{index_file}.index")
-    with open(metadata_file, "rb") as f:
-        metadata = pickle.load(f)
+    retriever = get_retriever(f"{index_file}.index", metadata_file)
+
+    key = (retriever.index_path, retriever.refresh(), normalize_query(query), top_k, normalize_filters(filters),
+           hybrid)
+    results = _query_results.get(key)
+    if results is None:
+        # Search FAISS index and retrieve top-k results
+        results = retriever.search(embed_query(query), top_k, filters=filters,
+                                   queries=[query] if hybrid else None)[0]
+        _query_results.put(key, results)
 
-    # Generate query embedding
-    query_embedding = model.encode([query])
+    # Callers may modify the result dicts; keep the cached ones intact
+    return [dict(result) for result in results]
 
-    # Search FAISS index
-    distances, indices = faiss_index.search(query_embedding, top_k)
 
-    # Retrieve top-k results
-    results = [{"text": metadata[idx], "distance": distances[0][i]} for i, idx in enumerate(indices[0])]
+def query_faiss_batch(queries, metadata_file="metadata.db", index_file="faiss_index", top_k=5, batch_size=64,
+                      filters=None, hybrid=True):
+    """
+    Query FAISS index for many queries at once.
+
+    Queries are encoded and searched in blocks of ``batch_size``, so the model and
+    FAISS both work on whole batches while memory stays bounded for large inputs.
+    Batch queries bypass the query caches so that bulk jobs do not evict the
+    entries serving interactive users.
+
+    Returns:
+        list[list[dict]]: For each query, the same results query_faiss would return.
+    """
+    retriever = get_retriever(f"{index_file}.index", metadata_file)
+    model = get_model()
+
+    results = []
+    for start in range(0, len(queries), batch_size):
+        batch = queries[start:start + batch_size]
+        query_embeddings = model.encode(batch, batch_size=batch_size)
+        results.extend(retriever.search_batch(query_embeddings, top_k, batch_size=batch_size, filters=filters,
+                                              queries=batch if hybrid else None))
     return results
 
 
-# Example query:
-query = "What did the FOMC decide about interest rates?"
-results = query_faiss(query)
+def cache_stats():
+    """Hit/miss counters of the query embedding, query result and answer caches."""
+    return {
+        "query_embeddings": _query_embeddings.stats(),
+        "query_results": _query_results.stats(),
+        "answers": get_answer_cache().stats(),
+    }
+
 
-# Print the results
-print("\nTop Relevant Results:")
-for result in results:
-    print(f"Text: {result['text']} | Distance: {result['distance']:.4f}")
+def _cache_lookups():
+    for cache, stats in cache_stats().items():
+        yield {"cache": cache, "result": "hit"}, stats["hits"]
+        yield {"cache": cache, "result": "miss"}, stats["misses"]
 
-from openai import AzureOpenAI
-from sentence_transformers import SentenceTransformer
 
+metrics.register_collector("rag_cache_lookups_total",
+                           "Lookups in the query embedding, query result and answer caches", "counter", _cache_lookups)
 
-class AzureOpenAIHelper:
+
+def warm_up(metadata_file="metadata.db", index_file="faiss_index"):
     """
-    Helper class for interacting with the Azure OpenAI service and integrating FAISS-based context retrieval.
+    Load the embedding model and the FAISS index ahead of the first user query.
+
+    Meant to be called once per worker at deploy time, e.g.
+    ``python -m fomc_dashboard.modules.sentence_transformer --warm-up``.
+
+    Returns:
+        dict: Seconds spent loading the model, running a first encode and loading the index.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    model = get_model()
+    timings["model_load"] = time.perf_counter() - start
+
+    # The first encode call initializes the tokenizer and torch kernels
+    start = time.perf_counter()
+    model.encode(["warm-up"])
+    timings["first_encode"] = time.perf_counter() - start
+
+    index_path = f"{index_file}.index"
+    if os.path.exists(config_path(index_path)) or os.path.exists(index_path):
+        start = time.perf_counter()
+        get_retriever(index_path, metadata_file)
+        timings["index_load"] = time.perf_counter() - start
+
+    return timings
+
+
+class AzureOpenAIHelper(ai_responder.AzureOpenAIHelper):
     """
+    Helper class for interacting with the Azure OpenAI service and integrating FAISS-based context retrieval.
 
-    AZURE_ENDPOINT = "https://hkust.azure-api.net"  # Replace with your endpoint
-    API_VERSION = "2024-06-01"  # API version
-    DEFAULT_MODEL = "gpt-4o-mini"  # Default model to use
+    The API clients are the pooled ones of ai_responder.AzureOpenAIHelper, shared
+    with every other helper using the same key and endpoint. Answers generated
+    with context are kept in the shared SemanticAnswerCache, so a paraphrase of
+    a recent question that retrieves the same chunks is answered without a
+    chat completion.
 
-    def __init__(self, api_key, faiss_index_path="faiss_index.index", metadata_path="metadata.pkl"):
+    Each question is retrieved once: pass the user's question itself, not a
+    prompt that already contains context. The retrieved chunks are deduplicated
+    and packed into at most ``context_tokens`` tokens (see pack_context), so the
+    prompt size does not grow with top_k.
+    """
+
+    def __init__(self, api_key, faiss_index_path="faiss_index.index", metadata_path="metadata.db", endpoint=None,
+                 max_concurrency=ai_responder.DEFAULT_MAX_CONCURRENCY, answer_cache=True,
+                 context_tokens=DEFAULT_CONTEXT_TOKENS, **client_options):
         """
         Initialize the AzureOpenAIHelper instance.
 
@@ -93,36 +248,105 @@ class AzureOpenAIHelper:
             api_key (str): Your Azure OpenAI API key.
             faiss_index_path (str): Path to the FAISS index file.
             metadata_path (str): Path to the metadata file.
+            endpoint (str, optional): Service endpoint, as for ai_responder.AzureOpenAIHelper.
+            max_concurrency (int, optional): Requests in flight at once for this key and endpoint.
+            answer_cache (bool, optional): Serve and store answers in the shared answer cache.
+                Defaults to True.
+            context_tokens (int, optional): Token budget for the retrieved context.
+                Defaults to DEFAULT_CONTEXT_TOKENS.
+            **client_options: Quota, retry and hedging options of ai_responder.AzureOpenAIHelper
+                (requests_per_minute, tokens_per_minute, max_retries, hedge_after).
         """
-        self.client = AzureOpenAI(
-            azure_endpoint=self.AZURE_ENDPOINT,
-            api_version=self.API_VERSION,
-            api_key=api_key
-        )
+        super().__init__(api_key, endpoint=endpoint, max_concurrency=max_concurrency, **client_options)
         self.faiss_index_path = faiss_index_path
         self.metadata_path = metadata_path
-        self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        self.model = get_model()
+        self.answer_cache = get_answer_cache() if answer_cache else None
+        self.context_tokens = context_tokens
 
-        # Load FAISS index and metadata
-        self.index = faiss.read_index(self.faiss_index_path)
-        with open(self.metadata_path, "rb") as f:
-            self.metadata = pickle.load(f)
+        # Shared, in-memory FAISS index and metadata
+        self.retriever = get_retriever(self.faiss_index_path, self.metadata_path)
 
-    def retrieve_context(self, query, top_k=5):
+    def _retrieve(self, query, top_k=5, filters=None, hybrid=True):
+        """Return the query embedding and the retrieved chunks."""
+        embedding = embed_query(query)
+        results = self.retriever.search(embedding, top_k, filters=filters, queries=[query] if hybrid else None)[0]
+        return embedding, results
+
+    def _cached_answer(self, message, instruction, model, include_context):
+        """
+        Retrieve context and look the question up in the answer cache.
+
+        Returns:
+            tuple: (context text, cached answer or None, store) where ``store(answer)``
+            caches a newly generated answer.
+        """
+        if not include_context:
+            return "", None, lambda answer: None
+        model = model or self.DEFAULT_MODEL
+        embedding, results = self._retrieve(message)
+        context, packed, _ = pack_context(results, self.context_tokens, model)
+        if self.answer_cache is None:
+            return context, None, lambda answer: None
+
+        # Keyed on the chunks that made it into the prompt
+        key, scope = context_key(packed), (instruction, model)
+
+        def store(answer):
+            if answer:
+                self.answer_cache.put(embedding, key, answer, scope=scope, query=message)
+
+        return context, self.answer_cache.get(embedding, key, scope=scope), store
+
+    def retrieve_context(self, query, top_k=5, filters=None, hybrid=True):
         """
         Retrieve relevant context from FAISS index based on the user's query.
 
         Args:
             query (str): User's query.
             top_k (int, optional): Number of top results to retrieve. Defaults to 5.
+            filters (dict, optional): Meeting date range / document type filters, as for query_faiss.
+            hybrid (bool, optional): Fuse vector and BM25 matches, as for query_faiss. Defaults to True.
 
         Returns:
-            str: Concatenated relevant paragraphs as context.
+            str: Relevant paragraphs packed into the helper's token budget.
         """
-        query_embedding = self.model.encode([query])
-        distances, indices = self.index.search(query_embedding, top_k)
-        results = [self.metadata[idx] for idx in indices[0]]
-        return "\n".join(results)
+        _, results = self._retrieve(query, top_k, filters, hybrid)
+        return pack_context(results, self.context_tokens, self.DEFAULT_MODEL)[0]
+
+    def retrieve_context_batch(self, queries, top_k=5, batch_size=64, filters=None, hybrid=True):
+        """
+        Retrieve context for many queries with batched encoding and search.
+
+        Args:
+            queries (list[str]): User queries.
+            top_k (int, optional): Number of top results per query. Defaults to 5.
+            batch_size (int, optional): Queries encoded and searched together. Defaults to 64.
+            filters (dict, optional): Meeting date range / document type filters, as for query_faiss.
+            hybrid (bool, optional): Fuse vector and BM25 matches, as for query_faiss. Defaults to True.
+
+        Returns:
+            list[str]: Packed relevant paragraphs for each query, in input order.
+        """
+        contexts = []
+        for start in range(0, len(queries), batch_size):
+            batch = queries[start:start + batch_size]
+            query_embeddings = self.model.encode(batch, batch_size=batch_size)
+            for results in self.retriever.search_batch(query_embeddings, top_k, batch_size=batch_size,
+                                                       filters=filters, queries=batch if hybrid else None):
+                contexts.append(pack_context(results, self.context_tokens, self.DEFAULT_MODEL)[0])
+        return contexts
+
+    @staticmethod
+    def _prompt(message, instruction, context):
+        """Combine instruction, context, and user message into the prompt."""
+        return (
+            f"You are an assistant providing real-time updates on FOMC meetings. Use the context below to "
+            f"answer the user's question accurately:\n\n"
+            f"Context:\n{context}\n\n"
+            f"User Query:\n{message}\n\n"
+            f"Instruction:\n{instruction}"
+        )
 
     def get_response(self, message, instruction, model=None, temperature=1.0, include_context=True):
         """
@@ -138,49 +362,102 @@ class AzureOpenAIHelper:
         Returns:
             str: AI-generated response.
         """
-        model = model or self.DEFAULT_MODEL
-
         try:
             # Retrieve context if required
-            context = self.retrieve_context(message) if include_context else ""
-
-            # Combine instruction, context, and user message into the prompt
-            prompt = (
-                f"You are an assistant providing real-time updates on FOMC meetings. Use the context below to "
-                f"answer the user's question accurately:\n\n"
-                f"Context:\n{context}\n\n"
-                f"User Query:\n{message}\n\n"
-                f"Instruction:\n{instruction}"
-            )
-
-            # Send API request
-            response = self.client.chat.completions.create(
-                model=model,
-                temperature=temperature,
-                messages=[
-                    {"role": "system", "content": instruction},
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            # Print token usage
-            print(f"Token Usage: {response.usage}")
-            # Return the response content
-            return response.choices[0].message.content
-
+            context, answer, store = self._cached_answer(message, instruction, model, include_context)
         except Exception as e:
-            print(f"Error during API call: {e}")
+            print(f"Error during context retrieval: {e}")
             return None
+        if answer is not None:
+            return answer
+        answer = super().get_response(self._prompt(message, instruction, context), instruction, model, temperature)
+        store(answer)
+        return answer
 
+    def stream_response(self, message, instruction, model=None, temperature=1.0, include_context=True, timings=None):
+        """
+        Streaming variant of get_response: retrieves context, then yields the answer as it is generated.
+
+        ``timings`` receives the time to first token and the total latency, which
+        include the context retrieval, and "cached" telling whether the answer
+        came from the answer cache (in which case it is yielded in one piece).
+        """
+        timings = {} if timings is None else timings
+        start = time.perf_counter()
+        context, answer, store = self._cached_answer(message, instruction, model, include_context)
+        timings["retrieval"] = time.perf_counter() - start
+        timings["cached"] = answer is not None
+        if answer is not None:
+            timings["time_to_first_token"] = timings["total"] = timings["retrieval"]
+            yield answer
+            return
+
+        stream_timings = {}
+        pieces = []
+        try:
+            for piece in super().stream_response(self._prompt(message, instruction, context), instruction, model,
+                                                 temperature, timings=stream_timings):
+                pieces.append(piece)
+                yield piece
+            store("".join(pieces))
+        finally:
+            for key, value in stream_timings.items():
+                timings[key] = timings["retrieval"] + value
+
+    async def aget_response(self, message, instruction, model=None, temperature=1.0, include_context=True):
+        """
+        Async variant of get_response; retrieval runs in a worker thread so the event loop stays free.
+
+        Returns:
+            str: AI-generated response, or None if the request failed.
+        """
+        import asyncio
+
+        try:
+            context, answer, store = await asyncio.to_thread(self._cached_answer, message, instruction, model,
+                                                             include_context)
+        except Exception as e:
+            print(f"Error during context retrieval: {e}")
+            return None
+        if answer is not None:
+            return answer
+        answer = await super().aget_response(self._prompt(message, instruction, context), instruction, model,
+                                             temperature)
+        store(answer)
+        return answer
+
+
+def _run_example():
+    """Index a few example paragraphs in a scratch directory and query them."""
+    paragraphs = [
+        "The FOMC decided to maintain interest rates at 5.25%.",
+        "Inflation expectations have declined compared to last quarter.",
+        "GDP growth was revised downward due to tighter credit conditions.",
+        "The Federal Reserve is monitoring labor market trends closely.",
+    ]
+
+    # Never write the example index over the production files
+    scratch_dir = tempfile.mkdtemp(prefix="fomc_faiss_example_")
+    index_file = os.path.join(scratch_dir, "faiss_index")
+    metadata_file = os.path.join(scratch_dir, "metadata.db")
+    store_in_faiss(paragraphs, metadata_file=metadata_file, index_file=index_file)
+
+    # Example query:
+    query = "What did the FOMC decide about interest rates?"
+    results = query_faiss(query, metadata_file=metadata_file, index_file=index_file)
+
+    # Print the results
+    print("\nTop Relevant Results:")
+    for result in results:
+        print(f"Text: {result['text']} | Distance: {result['distance']:.4f}")
 
-# Example usage
-if __name__ == "__main__":
     PRIMARY_KEY = "198ee87d93034da5a0a72a684483c44e"  # Replace with your actual key
 
     # Initialize the helper with FAISS paths
     ai_helper = AzureOpenAIHelper(
         api_key=PRIMARY_KEY,
-        faiss_index_path="faiss_index.index",
-        metadata_path="metadata.pkl"
+        faiss_index_path=f"{index_file}.index",
+        metadata_path=metadata_file
     )
 
     # FOMC-specific instruction
@@ -198,3 +475,11 @@ if __name__ == "__main__":
     # Print the AI's response
     if response:
         print(f"AI Response: {response}")
+
+
+# Example usage
+if __name__ == "__main__":
+    if "--warm-up" in sys.argv:
+        print(f"Warm-up timings (s): {warm_up()}")
+    else:
+        _run_example()
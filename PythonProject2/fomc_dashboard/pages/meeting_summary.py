@@ -1,4 +1,35 @@
 import streamlit as st
+import os
+import sys
+
+# Dynamically add the project root to Python's path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from fomc_dashboard.modules.meeting_summaries import SummaryStore
+
+SUMMARY_STORE = os.environ.get("MEETING_SUMMARIES", "meeting_summaries.db")
+
+def render_generated(store_path=SUMMARY_STORE):
+    """
+    Render a meeting picked from the generated summaries (see meeting_summaries.summarize_meetings).
+
+    Returns:
+        bool: Whether there were summaries to show.
+    """
+    try:
+        with SummaryStore(store_path, readonly=True) as store:
+            meetings = store.meetings()
+            if not meetings:
+                return False
+            meeting_date = st.selectbox("Meeting", meetings)
+            summary = store.get(meeting_date)
+    except FileNotFoundError:
+        return False
+
+    st.subheader(f"🔑 Meeting of {meeting_date}")
+    st.markdown(summary["summary"])
+    st.caption(f"Generated by {summary['model']} from the meeting's {', '.join(summary['doc_types'])}.")
+    return True
 
 def render():
     """Render the Meeting Summary page."""
@@ -10,6 +41,10 @@ def render():
     - Insights into monetary policy goals and market implications.  
     """)
 
+    # Summaries generated from the ingested documents, when the batch job has run
+    if render_generated():
+        return
+
     # Key Meeting Highlights
     st.subheader("🔑 Key Highlights from the Latest Meeting")
     st.markdown("""
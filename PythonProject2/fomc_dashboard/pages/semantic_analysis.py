@@ -1,11 +1,17 @@
 import streamlit as st
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.naive_bayes import MultinomialNB
-import PyPDF2
+import os
 import re
+import sys
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
 
+# Dynamically add the project root to Python's path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from fomc_dashboard.modules.pdf_extraction import get_extractor
+
 # Load Predefined Hawkish/Dovish Words for Classification
 hawkish_terms = ["tighten", "inflation", "hike", "reduce liquidity", "restrictive"]
 dovish_terms = ["accommodative", "stimulus", "easing", "cut rates", "lower interest"]
@@ -33,13 +39,9 @@ def classify_sentiment(text):
         return "Neutral", hawkish_score, dovish_score
 
 
-# Function to extract text from PDF
+# Function to extract text from PDF (pages are extracted in parallel and cached by file content)
 def extract_text_from_pdf(pdf_file):
-    pdf_reader = PyPDF2.PdfReader(pdf_file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text()
-    return text
+    return get_extractor().extract_text(pdf_file)
 
 
 # Streamlit App
@@ -0,0 +1,81 @@
+import os
+import sys
+import zlib
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# The local stand-in servers of the benchmarks are reused by the tests
+for path in (PROJECT_ROOT, os.path.join(PROJECT_ROOT, "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture
+def openai_server():
+    """Start FakeOpenAIServer instances with the given options; they are stopped after the test."""
+    from fake_openai_server import FakeOpenAIServer
+
+    servers = []
+
+    def start(server_class=FakeOpenAIServer, **options):
+        server = server_class(**{"latency": 0.0, **options}).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def token_encoding(monkeypatch):
+    """
+    Make token counting work without network access.
+
+    tiktoken downloads its encodings on first use; when that fails, count one
+    token per byte instead, which is enough for tests of budgets and quotas.
+    """
+    import tiktoken
+
+    from fomc_dashboard.modules import context_packer
+
+    try:
+        context_packer.get_encoding()
+    except Exception:
+        encoding = tiktoken.Encoding("bytes", pat_str=r"\S+|\s+", special_tokens={},
+                                     mergeable_ranks={bytes([i]): i for i in range(256)})
+        monkeypatch.setitem(context_packer._encodings, context_packer.DEFAULT_MODEL, encoding)
+
+
+class StubEmbeddingModel:
+    """
+    Stand-in for the sentence-transformers model, which tests cannot download.
+
+    Every text gets a fixed vector near one of a few cluster centres, chosen by
+    a hash of the text, so equal texts embed equally and searches have structure.
+    """
+
+    def __init__(self, dimension=384, n_clusters=16, seed=0):
+        self.centroids = np.random.default_rng(seed).standard_normal((n_clusters, dimension)).astype("float32")
+        self.calls = 0
+
+    def encode(self, texts, batch_size=32, **options):
+        self.calls += 1
+        vectors = np.empty((len(texts), self.centroids.shape[1]), dtype="float32")
+        for row, text in enumerate(texts):
+            key = zlib.crc32(text.encode("utf-8"))
+            noise = np.random.default_rng(key).standard_normal(self.centroids.shape[1])
+            vectors[row] = self.centroids[key % len(self.centroids)] + 0.5 * noise
+        return vectors
+
+
+@pytest.fixture
+def embedding_model(monkeypatch):
+    """Install a StubEmbeddingModel as the process-wide embedding model."""
+    from fomc_dashboard.modules import sentence_transformer
+
+    model = StubEmbeddingModel()
+    monkeypatch.setattr(sentence_transformer, "_model", model)
+    return model
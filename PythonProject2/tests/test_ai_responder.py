@@ -0,0 +1,242 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+import pytest
+from fake_openai_server import FakeOpenAIServer
+
+from fomc_dashboard.modules.ai_responder import AzureOpenAIHelper
+
+INSTRUCTION = "You are an assistant providing insights on FOMC meetings."
+QUESTION = "What did the Committee decide about the federal funds rate?"
+REPLY = "The Committee kept the target range unchanged."
+
+
+class ScriptedServer(FakeOpenAIServer):
+    """FakeOpenAIServer answering its first requests with the given faults, then normally."""
+
+    def __init__(self, faults=(), **options):
+        super().__init__(**options)
+        self.faults = list(faults)
+
+    def fault(self):
+        with self._stats_lock:
+            if self.faults:
+                return self.faults.pop(0)
+        return super().fault()
+
+
+def helper_for(server, name, **options):
+    # Pools are shared per API key, so every test gets its own key
+    return AzureOpenAIHelper(f"test-{name}", endpoint=server.url, **options)
+
+
+def settled_tokens(helper):
+    """List receiving the actual tokens of every settled reservation of the helper's default model."""
+    limiter = helper.pool.limiter(helper.DEFAULT_MODEL)
+    settled = []
+    settle = limiter.settle
+    limiter.settle = lambda estimated, actual: (settled.append(actual), settle(estimated, actual))
+    return settled
+
+
+def test_throttled_requests_are_retried(openai_server):
+    server = openai_server(ScriptedServer, faults=[("throttle", 0.05)] * 3)
+    helper = helper_for(server, "throttled", max_retries=4)
+
+    assert helper.get_response(QUESTION, INSTRUCTION) == REPLY
+    assert server.stats["requests"] == 4
+
+
+def test_dropped_connections_are_retried(openai_server):
+    server = openai_server(ScriptedServer, faults=[("disconnect", None)] * 2)
+    helper = helper_for(server, "disconnects", max_retries=4)
+
+    assert helper.get_response(QUESTION, INSTRUCTION) == REPLY
+    assert server.stats["requests"] == 3
+
+
+def test_gives_up_after_max_retries(openai_server):
+    server = openai_server(ScriptedServer, faults=[("throttle", 0.05)] * 3)
+    helper = helper_for(server, "give-up", max_retries=1)
+
+    assert helper.get_response(QUESTION, INSTRUCTION) is None
+    assert server.stats["requests"] == 2
+
+
+def test_retry_waits_as_long_as_retry_after_asks(openai_server):
+    server = openai_server(ScriptedServer, faults=[("throttle", 0.6)])
+    helper = helper_for(server, "retry-after", max_retries=1)
+
+    start = time.perf_counter()
+    assert helper.get_response(QUESTION, INSTRUCTION) == REPLY
+    assert time.perf_counter() - start >= 0.6
+    assert server.stats["requests"] == 2
+
+
+def test_rate_limiter_holds_back_requests_over_the_quota(openai_server):
+    # The endpoint allows 66 requests per minute, 11 at once; the client keeps to 60, 10 at once
+    server = openai_server(requests_per_minute=66)
+    helper = helper_for(server, "rate-limited", requests_per_minute=60, max_retries=0)
+
+    start = time.perf_counter()
+    answers = [helper.get_response(QUESTION, INSTRUCTION) for _ in range(12)]
+    elapsed = time.perf_counter() - start
+
+    assert answers == [REPLY] * 12
+    assert server.stats["throttled"] == 0
+    assert elapsed >= 1.5  # The last two requests waited for the bucket to refill
+
+
+def test_without_rate_limiter_requests_over_the_quota_are_rejected(openai_server):
+    server = openai_server(requests_per_minute=60)
+    helper = helper_for(server, "not-rate-limited", max_retries=0)
+
+    answers = [helper.get_response(QUESTION, INSTRUCTION) for _ in range(12)]
+
+    assert server.stats["throttled"] > 0
+    assert answers.count(None) == server.stats["throttled"]
+
+
+def test_hedge_wins_when_the_primary_stalls(openai_server):
+    server = openai_server(ScriptedServer, faults=[("spike", 2.0)])
+    helper = helper_for(server, "hedged", hedge_after=0.2, max_concurrency=4)
+
+    start = time.perf_counter()
+    assert helper.get_response(QUESTION, INSTRUCTION) == REPLY
+    assert time.perf_counter() - start < 1.0
+    assert server.stats["requests"] == 2
+
+
+def test_async_hedge_wins_when_the_primary_stalls(openai_server):
+    server = openai_server(ScriptedServer, faults=[("spike", 2.0)])
+    helper = helper_for(server, "async-hedged", hedge_after=0.2, max_concurrency=4)
+
+    start = time.perf_counter()
+    assert asyncio.run(helper.aget_response(QUESTION, INSTRUCTION)) == REPLY
+    assert time.perf_counter() - start < 1.0
+    assert server.stats["requests"] == 2
+
+
+def test_no_hedge_without_a_free_slot(openai_server):
+    server = openai_server(latency=0.4)
+    helper = helper_for(server, "hedge-no-slot", hedge_after=0.1, max_concurrency=2)
+
+    with ThreadPoolExecutor(2) as pool:
+        answers = list(pool.map(lambda _: helper.get_response(QUESTION, INSTRUCTION), range(2)))
+
+    assert answers == [REPLY] * 2
+    assert server.stats["requests"] == 2
+
+
+def test_hedge_reservation_is_settled(openai_server, token_encoding):
+    server = openai_server(latency=0.3)
+    helper = helper_for(server, "hedge-settled", tokens_per_minute=1_000_000, hedge_after=0.05, max_concurrency=4)
+    settled = settled_tokens(helper)
+
+    assert helper.get_response(QUESTION, INSTRUCTION) == REPLY
+    time.sleep(0.5)  # The losing request settles once it finishes
+    assert server.stats["requests"] == 2
+    assert len(settled) == 2 and all(tokens > 0 for tokens in settled)
+
+    settled.clear()
+    assert asyncio.run(helper.aget_response(QUESTION, INSTRUCTION)) == REPLY
+    assert sorted(settled)[0] == 0  # The cancelled request is refunded
+    assert len(settled) == 2
+
+
+def test_failed_attempts_return_their_reservation(openai_server, token_encoding):
+    server = openai_server(ScriptedServer, faults=[("throttle", 0.05), ("disconnect", None)])
+    helper = helper_for(server, "failed-settled", tokens_per_minute=1_000_000, max_retries=4)
+    settled = settled_tokens(helper)
+
+    assert helper.get_response(QUESTION, INSTRUCTION) == REPLY
+    assert settled[:2] == [0, 0]
+    assert len(settled) == 3 and settled[2] > 0
+
+    server.faults = [("throttle", 0.05)]
+    settled.clear()
+    assert asyncio.run(helper.aget_response(QUESTION, INSTRUCTION)) == REPLY
+    assert settled[0] == 0 and len(settled) == 2
+
+
+def test_stream_reservation_is_settled_with_its_usage(openai_server, token_encoding):
+    server = openai_server()
+    helper = helper_for(server, "stream-settled", tokens_per_minute=1_000_000)
+    settled = settled_tokens(helper)
+
+    assert "".join(helper.stream_response(QUESTION, INSTRUCTION)) == REPLY
+    # The fake server counts words
+    assert settled == [len(INSTRUCTION.split()) + len(QUESTION.split()) + len(REPLY.split())]
+
+
+def test_stream_yields_pieces_as_they_arrive(openai_server):
+    server = openai_server(token_delay=0.05)
+    helper = helper_for(server, "stream-incremental")
+    timings, arrivals, pieces = {}, [], []
+
+    for piece in helper.stream_response(QUESTION, INSTRUCTION, timings=timings):
+        arrivals.append(time.perf_counter())
+        pieces.append(piece)
+
+    assert "".join(pieces) == REPLY
+    assert len(pieces) == len(REPLY.split())
+    # Each word is yielded when it arrives, not once the whole reply is in
+    assert arrivals[-1] - arrivals[0] >= 0.05 * (len(pieces) - 1) * 0.8
+    assert timings["time_to_first_token"] < timings["total"] - 0.2
+
+
+def test_stream_skips_the_content_filter_chunk(openai_server):
+    # The fake server, like Azure, starts every stream with a chunk of filter results and no choices
+    server = openai_server(stream_usage=False)
+    helper = helper_for(server, "stream-filter")
+
+    pieces = list(helper.stream_response(QUESTION, INSTRUCTION))
+
+    assert pieces == [word if i == 0 else f" {word}" for i, word in enumerate(REPLY.split(" "))]
+
+
+def test_stream_failure_after_text_is_raised_not_retried(openai_server):
+    server = openai_server(ScriptedServer, faults=[("cut", 3)])
+    helper = helper_for(server, "stream-cut", max_retries=4)
+    pieces = []
+
+    with pytest.raises(openai.APIConnectionError):  # Retryable, had the stream not started
+        for piece in helper.stream_response(QUESTION, INSTRUCTION):
+            pieces.append(piece)
+
+    assert "".join(pieces) == " ".join(REPLY.split(" ")[:3])
+    assert server.stats["requests"] == 1
+
+
+def test_client_pool_reuses_connections_across_calls_and_reruns(openai_server):
+    server = openai_server()
+    helper = helper_for(server, "pool-reuse")
+    answers = [helper.get_response(QUESTION, INSTRUCTION) for _ in range(5)]
+
+    # A Streamlit rerun creates a new helper with the same settings
+    rerun = helper_for(server, "pool-reuse")
+    answers += [rerun.get_response(QUESTION, INSTRUCTION) for _ in range(5)]
+
+    assert rerun.pool is helper.pool
+    assert answers == [REPLY] * 10
+    assert server.stats["connections"] == 1
+
+
+def test_client_pool_never_exceeds_its_concurrency_limit(openai_server):
+    server = openai_server(latency=0.1)
+    helper = helper_for(server, "pool-limit", max_concurrency=3)
+
+    with ThreadPoolExecutor(12) as pool:
+        answers = list(pool.map(lambda _: helper.get_response(QUESTION, INSTRUCTION), range(24)))
+    assert answers == [REPLY] * 24
+    assert server.stats["max_in_flight"] == 3
+    assert server.stats["connections"] <= 3
+
+    async def ask_all():
+        return await asyncio.gather(*(helper.aget_response(QUESTION, INSTRUCTION) for _ in range(24)))
+
+    server.reset_stats()
+    assert asyncio.run(ask_all()) == [REPLY] * 24
+    assert server.stats["max_in_flight"] == 3
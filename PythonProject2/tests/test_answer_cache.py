@@ -0,0 +1,128 @@
+import time
+
+import numpy as np
+import pytest
+from summary_batch import synthetic_records, write_index
+
+from fomc_dashboard.modules.answer_cache import SemanticAnswerCache, context_key
+from fomc_dashboard.modules.sentence_transformer import AzureOpenAIHelper
+
+CONTEXT = ((1, 2), b"digest")
+REPLY = "The Committee kept the target range unchanged."
+
+
+def unit(*values):
+    vector = np.zeros(8, dtype="float32")
+    vector[:len(values)] = values
+    return vector
+
+
+def test_threshold():
+    cache = SemanticAnswerCache(threshold=0.9)
+    cache.put(unit(1.0), CONTEXT, "answer")
+
+    assert cache.get(unit(1.0, 0.3), CONTEXT) == "answer"  # Cosine 0.96
+    assert cache.get(unit(1.0, 0.6), CONTEXT) is None  # Cosine 0.86
+    assert cache.get(unit(5.0), CONTEXT) == "answer"  # Only the direction counts
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_context_and_scope_must_match():
+    cache = SemanticAnswerCache()
+    cache.put(unit(1.0), CONTEXT, "answer", scope=("instruction", "gpt-4o-mini"))
+
+    assert cache.get(unit(1.0), CONTEXT, scope=("instruction", "gpt-4o-mini")) == "answer"
+    assert cache.get(unit(1.0), CONTEXT, scope=("instruction", "gpt-4o")) is None
+    assert cache.get(unit(1.0), ((1, 3), b"digest"), scope=("instruction", "gpt-4o-mini")) is None
+
+
+def test_paraphrase_replaces_its_entry():
+    cache = SemanticAnswerCache()
+    cache.put(unit(1.0), CONTEXT, "first")
+    cache.put(unit(1.0, 0.1), CONTEXT, "second")
+    cache.put(unit(0.0, 1.0), CONTEXT, "other question")
+
+    assert len(cache) == 2
+    assert cache.get(unit(1.0), CONTEXT) == "second"
+
+
+def test_entries_expire():
+    cache = SemanticAnswerCache(ttl=0.05)
+    cache.put(unit(1.0), CONTEXT, "answer")
+    assert cache.get(unit(1.0), CONTEXT) == "answer"
+
+    time.sleep(0.1)
+
+    assert cache.get(unit(1.0), CONTEXT) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = SemanticAnswerCache(max_size=2)
+    cache.put(unit(1.0), CONTEXT, "a")
+    cache.put(unit(0.0, 1.0), CONTEXT, "b")
+    assert cache.get(unit(1.0), CONTEXT) == "a"  # "b" is now the least recently used
+
+    cache.put(unit(0.0, 0.0, 1.0), CONTEXT, "c")
+
+    assert len(cache) == 2
+    assert cache.get(unit(0.0, 1.0), CONTEXT) is None
+    assert (cache.get(unit(1.0), CONTEXT), cache.get(unit(0.0, 0.0, 1.0), CONTEXT)) == ("a", "c")
+
+
+def test_entry_stats():
+    cache = SemanticAnswerCache()
+    cache.put(unit(1.0), CONTEXT, "a", query="What did the Fed decide?")
+    cache.put(unit(0.0, 1.0), CONTEXT, "b", query="What about inflation?")
+    for _ in range(3):
+        cache.get(unit(0.0, 1.0), CONTEXT)
+
+    stats = cache.entry_stats()
+
+    assert [(entry["query"], entry["hits"]) for entry in stats] == [("What about inflation?", 3),
+                                                                    ("What did the Fed decide?", 0)]
+    assert stats[0]["since_last_hit_s"] is not None and stats[1]["since_last_hit_s"] is None
+    assert cache.stats() == {"hits": 3, "misses": 0, "hit_rate": 1.0, "size": 2, "max_size": cache.max_size}
+
+
+def test_context_key():
+    results = [{"id": 4, "text": "Rates were held."}, {"id": 9, "text": "Inflation eased."}]
+
+    assert context_key(results) == context_key([dict(result) for result in results])
+    assert context_key(results)[0] == (4, 9)
+    assert context_key(results) != context_key(results[::-1])
+    # Same ids after a rebuild, different chunks
+    assert context_key(results) != context_key([{"id": 4, "text": "Rates were raised."}, results[1]])
+    # The separator keeps the chunk boundaries apart
+    assert context_key([{"id": 1, "text": "ab"}, {"id": 2, "text": "c"}]) != context_key(
+        [{"id": 1, "text": "a"}, {"id": 2, "text": "bc"}])
+
+
+@pytest.fixture
+def rag_helper(openai_server, embedding_model, token_encoding, tmp_path):
+    index_file = str(tmp_path / "faiss_index")
+    write_index(index_file, synthetic_records(4))
+    server = openai_server()
+    helper = AzureOpenAIHelper("test-rag-answer-cache", f"{index_file}.index", f"{index_file}.db",
+                               endpoint=server.url)
+    helper.answer_cache = SemanticAnswerCache()
+    helper.server = server
+    return helper
+
+
+def test_streamed_answers_are_cached(rag_helper):
+    question = "What did the Committee decide about the federal funds rate?"
+    timings = {}
+
+    assert "".join(rag_helper.stream_response(question, "Answer concisely.", timings=timings)) == REPLY
+    assert timings["cached"] is False
+
+    # Case does not change the embedding, so this retrieves the same chunks and hits the cache
+    assert "".join(rag_helper.stream_response(question.upper(), "Answer concisely.", timings=timings)) == REPLY
+    assert timings["cached"] is True
+    assert rag_helper.server.stats["requests"] == 1
+    assert rag_helper.answer_cache.entry_stats()[0]["hits"] == 1
+
+    # Another instruction is another scope
+    assert rag_helper.get_response(question, "Answer in detail.") == REPLY
+    assert rag_helper.server.stats["requests"] == 2
@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from fomc_dashboard.modules import sentence_transformer
+from fomc_dashboard.modules.cache import LRUCache
+from fomc_dashboard.modules.retriever import get_retriever
+from fomc_dashboard.modules.sentence_transformer import cache_stats, embed_query, query_faiss, store_in_faiss
+
+PARAGRAPHS = [
+    "The Committee decided to maintain the target range for the federal funds rate.",
+    "Inflation has eased over the past year but remains elevated.",
+    "Job gains have moderated and the unemployment rate has moved up.",
+    "The Committee will continue reducing its holdings of Treasury securities.",
+]
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+
+    cache.put("c", 3)
+
+    assert len(cache) == 2
+    assert (cache.get("a"), cache.get("b", "missing"), cache.get("c")) == (1, "missing", 3)
+
+
+def test_put_refreshes_an_existing_key():
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 10)
+    cache.put("c", 3)
+
+    assert (cache.get("a"), cache.get("b")) == (10, None)
+
+
+def test_entries_expire():
+    cache = LRUCache(ttl=0.05)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+
+    time.sleep(0.1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_stats():
+    cache = LRUCache(max_size=8)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    assert cache.stats() == {"hits": 2, "misses": 1, "hit_rate": 2 / 3, "size": 1, "max_size": 8}
+    cache.clear()
+    assert cache.stats()["size"] == 0 and cache.stats()["hits"] == 2  # Counters are kept
+
+
+@pytest.fixture
+def query_caches(monkeypatch):
+    monkeypatch.setattr(sentence_transformer, "_query_embeddings", LRUCache(max_size=16))
+    monkeypatch.setattr(sentence_transformer, "_query_results", LRUCache(max_size=16))
+
+
+def test_query_embeddings_are_cached_by_normalized_text(embedding_model, query_caches):
+    first = embed_query("What did the Committee decide?")
+    second = embed_query("  what did the committee   DECIDE? ")
+
+    assert second is first
+    assert embedding_model.calls == 1
+    assert cache_stats()["query_embeddings"]["hits"] == 1
+
+
+def test_query_results_are_invalidated_when_the_index_changes(embedding_model, query_caches, tmp_path):
+    index_file = str(tmp_path / "faiss_index")
+    metadata_file = f"{index_file}.db"
+    store_in_faiss(PARAGRAPHS, metadata_file, index_file, embedding_cache=None)
+    question = "What did the Committee decide?"
+
+    before = query_faiss(question, metadata_file, index_file, top_k=2, hybrid=False)
+    assert query_faiss(question, metadata_file, index_file, top_k=2, hybrid=False) == before
+    assert cache_stats()["query_results"]["hits"] == 1
+    before[0]["text"] = "changed by the caller"
+    assert query_faiss(question, metadata_file, index_file, top_k=2, hybrid=False)[0]["text"] != before[0]["text"]
+
+    # A chunk identical to the question is appended; the next refresh() installs a new snapshot
+    retriever = get_retriever(f"{index_file}.index", metadata_file)
+    retriever.check_interval = 0.0
+    version = retriever.version
+    store_in_faiss([question.lower()], metadata_file, index_file, embedding_cache=None)
+
+    after = query_faiss(question, metadata_file, index_file, top_k=2, hybrid=False)
+
+    assert retriever.version == version + 1
+    assert after[0]["text"] == question.lower()
+    assert cache_stats()["query_results"]["misses"] == 2
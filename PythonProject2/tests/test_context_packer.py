@@ -0,0 +1,61 @@
+import pytest
+
+from fomc_dashboard.modules.context_packer import SEPARATOR, count_tokens, pack_context
+
+RESULTS = [
+    {"id": 1, "text": "The Committee decided to maintain the target range at 5-1/4 to 5-1/2 percent."},
+    {"id": 2, "text": "The Committee  decided to maintain the target range at 5-1/4 to 5-1/2 percent.\n"},
+    {"id": 3, "text": "decided to maintain the target range"},
+    {"id": 4, "text": "Inflation has eased over the past year but remains elevated."},
+    {"id": 5, "text": "Job gains have moderated."},
+]
+
+
+@pytest.fixture(autouse=True)
+def encoding(token_encoding):
+    pass
+
+
+def test_duplicates_and_contained_chunks_are_skipped():
+    context, packed, tokens = pack_context(RESULTS, max_tokens=10_000)
+
+    assert [result["id"] for result in packed] == [1, 4, 5]
+    assert context == SEPARATOR.join([RESULTS[0]["text"], RESULTS[3]["text"], RESULTS[4]["text"]])
+    assert tokens == count_tokens(context)
+
+
+def test_context_stays_within_the_budget():
+    budget = count_tokens(RESULTS[0]["text"]) + count_tokens(SEPARATOR) + count_tokens(RESULTS[4]["text"])
+
+    context, packed, tokens = pack_context(RESULTS, max_tokens=budget)
+
+    # The inflation chunk would overflow; the shorter, less relevant one still fits
+    assert [result["id"] for result in packed] == [1, 5]
+    assert tokens == count_tokens(context) <= budget
+
+
+@pytest.mark.parametrize("budget", [50, 200, 400])
+def test_budget_is_never_exceeded(budget):
+    results = [{"id": i, "text": f"Participant {i} noted that inflation remained elevated in sector {i}."}
+               for i in range(40)]
+
+    context, packed, tokens = pack_context(results, max_tokens=budget)
+
+    assert tokens == count_tokens(context) <= budget
+    assert [result["id"] for result in packed] == list(range(len(packed)))  # Relevance order is kept
+
+
+def test_top_chunk_is_truncated_when_nothing_fits():
+    budget = count_tokens(RESULTS[3]["text"]) // 2
+
+    context, packed, tokens = pack_context(RESULTS[3:4], max_tokens=budget)
+
+    assert len(packed) == 1 and packed[0]["truncated"] and packed[0]["id"] == 4
+    assert packed[0]["text"] == context and RESULTS[3]["text"].startswith(context)
+    assert 0 < tokens <= budget
+    assert "truncated" not in RESULTS[3]  # The caller's result is not modified
+
+
+def test_empty_input_and_budget():
+    assert pack_context([], max_tokens=100) == ("", [], 0)
+    assert pack_context(RESULTS, max_tokens=0) == ("", [], 0)
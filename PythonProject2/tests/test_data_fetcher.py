@@ -0,0 +1,111 @@
+import os
+import sqlite3
+
+import pytest
+from document_sync import FakeDocumentServer
+
+from fomc_dashboard.modules.data_fetcher import DocumentCache, make_session, sync_documents
+
+N_DOCUMENTS = 24
+
+
+class RecordingServer(FakeDocumentServer):
+    """FakeDocumentServer that also keeps the validators each request was sent with."""
+
+    def __init__(self, documents, latency=0.0):
+        super().__init__(documents, latency)
+        self.validators = {}  # path -> (If-None-Match, If-Modified-Since) of its last request
+
+    def respond(self, handler):
+        with self._lock:
+            self.validators[handler.path] = (handler.headers.get("If-None-Match"),
+                                             handler.headers.get("If-Modified-Since"))
+        super().respond(handler)
+
+
+@pytest.fixture
+def server():
+    # Every sixth URL has no document (a meeting without minutes)
+    paths = [f"/monetarypolicy/files/fomcminutes{2000 + i // 8}{1 + i % 8:02d}15.pdf" for i in range(N_DOCUMENTS)]
+    server = RecordingServer({path: os.urandom(2000) for i, path in enumerate(paths) if i % 6 != 5}).start()
+    server.paths = paths
+    yield server
+    server.stop()
+
+
+def urls_of(server):
+    # Two host names for the same server, so the crawl sees two hosts
+    return [f"http://{'127.0.0.1' if i % 2 else 'localhost'}:{server.port}{path}"
+            for i, path in enumerate(server.paths)]
+
+
+def test_refresh_sends_conditional_requests_and_downloads_nothing(server, tmp_path):
+    urls, cache_dir = urls_of(server), str(tmp_path / "cache")
+    n_missing = N_DOCUMENTS - len(server.documents)
+
+    cold = sync_documents(urls, cache_dir)
+    assert (cold["downloaded"], cold["missing"], cold["failed"]) == (len(server.documents), n_missing, 0)
+    assert all(validators == (None, None) for validators in server.validators.values())
+
+    server.reset()
+    refresh = sync_documents(urls, cache_dir)
+    assert (refresh["downloaded"], refresh["unchanged"], refresh["bytes"]) == (0, len(server.documents), 0)
+    assert server.stats["not_modified"] == len(server.documents)
+    assert server.stats["bytes"] == 0
+    for path, (body, etag, last_modified) in server.documents.items():
+        assert server.validators[path] == (etag, last_modified)
+
+    with DocumentCache(cache_dir) as cache:
+        for url, path in zip(urls, server.paths):
+            if path in server.documents:
+                with open(cache.path(url), "rb") as f:
+                    assert f.read() == server.documents[path][0]
+            else:
+                assert cache.path(url) is None
+
+
+def test_only_changed_documents_are_downloaded(server, tmp_path):
+    urls, cache_dir = urls_of(server), str(tmp_path / "cache")
+    sync_documents(urls, cache_dir)
+    server.update(server.paths[0], b"revised minutes")
+
+    stats = sync_documents(urls, cache_dir)
+
+    assert (stats["downloaded"], stats["unchanged"]) == (1, len(server.documents) - 1)
+    assert stats["bytes"] == len(b"revised minutes")
+    with DocumentCache(cache_dir) as cache, open(cache.path(urls[0]), "rb") as f:
+        assert f.read() == b"revised minutes"
+
+
+def test_interrupted_crawl_resumes_where_it_stopped(server, tmp_path):
+    urls, cache_dir = urls_of(server), str(tmp_path / "cache")
+    server.fail_after = 8
+
+    interrupted = sync_documents(urls, cache_dir, session=make_session(retries=0))
+    settled = interrupted["downloaded"] + interrupted["missing"]
+    assert interrupted["failed"] == len(server.documents) - 8
+    with sqlite3.connect(os.path.join(cache_dir, "state.db")) as connection:
+        assert connection.execute("SELECT COUNT(*), COUNT(finished) FROM crawls").fetchone() == (1, 0)
+
+    server.fail_after = None
+    server.reset()
+    resumed = sync_documents(urls, cache_dir)
+    assert (resumed["skipped"], resumed["downloaded"], resumed["failed"]) == (settled, interrupted["failed"], 0)
+    assert server.stats["requests"] == N_DOCUMENTS - settled
+    with sqlite3.connect(os.path.join(cache_dir, "state.db")) as connection:
+        assert connection.execute("SELECT COUNT(*), COUNT(finished) FROM crawls").fetchone() == (1, 1)
+
+    # The crawl finished, so the next sync checks every URL again
+    server.reset()
+    again = sync_documents(urls, cache_dir)
+    assert (again["skipped"], again["unchanged"]) == (0, len(server.documents))
+    assert server.stats["requests"] == N_DOCUMENTS
+
+
+def test_connections_per_host_are_capped(server, tmp_path):
+    server.latency = 0.05
+
+    stats = sync_documents(urls_of(server), str(tmp_path / "cache"), max_workers=16, per_host=3)
+
+    assert stats["failed"] == 0
+    assert server.stats["max_active"] == {"127.0.0.1": 3, "localhost": 3}
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from fomc_dashboard.modules import embedding_cache
+from fomc_dashboard.modules.embedding_cache import EmbeddingCache, normalize_text, text_hash
+
+
+class CountingEncoder:
+    """Encodes each text to a vector derived from its length, remembering what it was asked for."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(text), 1.0, 0.0] for text in texts], dtype="float32")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "embedding_cache.db")
+
+
+def test_only_missing_texts_are_encoded(path):
+    encoder = CountingEncoder()
+    with EmbeddingCache(path) as cache:
+        first = cache.encode(["a", "bb", "a"], encoder)
+        assert encoder.calls == [["a", "bb"]]  # Duplicates are encoded once
+        assert (cache.hits, cache.misses) == (0, 2)
+
+    # Persistent across instances
+    with EmbeddingCache(path) as cache:
+        second = cache.encode(["bb", "ccc", "a"], encoder)
+        assert encoder.calls[1:] == [["ccc"]]
+        assert (cache.hits, cache.misses) == (2, 1)
+        assert cache.encode([], encoder).shape[0] == 0
+
+    assert first.dtype == second.dtype == np.float32
+    assert first[:, 0].tolist() == [1, 2, 1]
+    assert second[:, 0].tolist() == [2, 3, 1]
+
+
+def test_vectors_are_kept_per_model(path):
+    encoder = CountingEncoder()
+    with EmbeddingCache(path, model_name="model-a") as cache:
+        cache.encode(["text"], encoder)
+    with EmbeddingCache(path, model_name="model-b") as cache:
+        cache.encode(["text"], encoder)
+        assert cache.misses == 1
+    with EmbeddingCache(path, model_name="model-a") as cache:
+        cache.encode(["text"], encoder)
+        assert cache.hits == 1
+
+    assert len(encoder.calls) == 2
+
+
+def test_whitespace_and_unicode_forms_are_normalized(path):
+    assert normalize_text("  Rates  were\n\theld. ") == "Rates were held."
+    assert text_hash("café") == text_hash("café")  # NFC and NFD forms
+    assert text_hash("Rates were held.") != text_hash("rates were held.")  # Case matters to the model
+
+    encoder = CountingEncoder()
+    with EmbeddingCache(path) as cache:
+        cache.encode(["Rates were held."], encoder)
+        cache.encode(["Rates  were\nheld. "], encoder)
+
+    assert len(encoder.calls) == 1
+
+
+def test_least_recently_used_vectors_are_evicted(path, monkeypatch):
+    # A clock that ticks on every call, so each encode call has its own last_used
+    clock = iter(range(100))
+    monkeypatch.setattr(embedding_cache, "time", SimpleNamespace(time=lambda: float(next(clock))))
+    encoder = CountingEncoder()
+    with EmbeddingCache(path, max_entries=3) as cache:
+        cache.encode(["a", "b"], encoder)
+        cache.encode(["c"], encoder)
+        cache.encode(["a"], encoder)  # "b" is now the least recently used
+        cache.encode(["d"], encoder)  # Over the cap: "b" goes
+
+        (count,) = cache._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        assert count == 3
+        encoder.calls.clear()
+        cache.encode(["a", "c", "d"], encoder)
+        assert encoder.calls == []
+        cache.encode(["b"], encoder)
+        assert encoder.calls == [["b"]]
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from conftest import StubEmbeddingModel
+
+from fomc_dashboard.modules.encoding_pool import EncodingPool
+
+WORKERS = 2
+SHARD_SIZE = 8
+
+
+def load_stub(model_name):
+    # Module-level so the spawned workers can unpickle it
+    return StubEmbeddingModel()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with EncodingPool(WORKERS, shard_size=SHARD_SIZE, loader=load_stub) as pool:
+        pool.warm_up()
+        yield pool
+
+
+def texts(n):
+    return [f"Participants discussed item {i} of the outlook." for i in range(n)]
+
+
+def test_shards_match_in_process_encoding(pool):
+    chunks = texts(100)
+
+    shards = list(pool.iter_encode(chunks))
+
+    assert [len(shard) for shard in shards] == [SHARD_SIZE] * 12 + [4]
+    assert all(shard.dtype == np.float32 and shard.shape[1] == 384 for shard in shards)
+    expected = StubEmbeddingModel().encode(chunks)
+    assert np.array_equal(np.vstack(shards), expected)
+    assert np.array_equal(pool.encode(chunks), expected)
+
+
+def test_input_is_read_at_most_two_shards_per_worker_ahead(pool):
+    read = 0
+
+    def lazy_texts():
+        nonlocal read
+        for text in texts(200):
+            read += 1
+            yield text
+
+    for shard_number, _ in enumerate(pool.iter_encode(lazy_texts())):
+        in_flight = -(-read // SHARD_SIZE) - shard_number  # Shards submitted but not yet yielded
+        assert in_flight <= 2 * WORKERS
+    assert read == 200
+
+
+def test_empty_input(pool):
+    assert list(pool.iter_encode(iter([]))) == []
+    assert pool.encode([]).shape == (0, 0)
@@ -0,0 +1,226 @@
+import os
+
+import faiss
+import numpy as np
+import pytest
+
+from fomc_dashboard.modules import index_store
+from fomc_dashboard.modules.index_factory import build_index, make_index_config
+from fomc_dashboard.modules.index_store import (append_segment, compact, compact_in_background, load_segmented,
+                                                read_manifest, write_base)
+
+DIMENSION = 16
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).standard_normal((200, DIMENSION)).astype("float32")
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "faiss_index.index"), str(tmp_path / "faiss_index.db")
+
+
+def records(start, stop):
+    return [{"text": f"chunk {i}", "meeting_date": f"2023-{1 + i % 12:02d}-15", "doc_type": "minutes"}
+            for i in range(start, stop)]
+
+
+def build(paths, vectors, rows=100):
+    config = make_index_config("flat", DIMENSION)
+    index = build_index(config)
+    index.add(vectors[:rows])
+    write_base(*paths, index, records(0, rows), config)
+
+
+def nearest(paths, queries):
+    index, store, _ = load_segmented(*paths)
+    distances, ids = index.search(queries, 1)
+    texts = store.fetch(ids[:, 0])
+    return [texts[i]["text"] for i in ids[:, 0]], distances[:, 0]
+
+
+def test_appended_rows_are_searched_with_the_base(paths, vectors):
+    build(paths, vectors)
+    assert append_segment(*paths, vectors[100:150], records(100, 150)) == 1
+    assert append_segment(*paths, vectors[150:200], records(150, 200)) == 2
+
+    index, store, manifest = load_segmented(*paths)
+    assert index.ntotal == store.count() == 200
+    assert [segment["rows"] for segment in manifest["segments"]] == [50, 50]
+
+    texts, distances = nearest(paths, vectors[[5, 120, 199]])
+    assert texts == ["chunk 5", "chunk 120", "chunk 199"]
+    assert np.allclose(distances, 0.0)
+
+
+def test_append_needs_one_record_per_vector(paths, vectors):
+    build(paths, vectors)
+    with pytest.raises(ValueError):
+        append_segment(*paths, vectors[100:110], records(100, 105))
+
+
+def test_compaction_merges_segments_into_a_new_base(paths, vectors):
+    build(paths, vectors)
+    append_segment(*paths, vectors[100:150], records(100, 150))
+    append_segment(*paths, vectors[150:200], records(150, 200))
+
+    assert compact(*paths)
+    assert not compact(*paths)  # Nothing left to merge
+
+    manifest = read_manifest(*paths)
+    assert manifest["segments"] == [] and manifest["base"]["rows"] == 200
+    assert ".base-" in manifest["base"]["index"]
+    assert manifest["base"]["metadata"] == "faiss_index.db"  # Row ids do not change, so neither does the store
+    files = set(os.listdir(os.path.dirname(paths[0])))
+    assert "faiss_index.index" not in files
+    assert not any(name.endswith(".npy") for name in files)
+    texts, _ = nearest(paths, vectors[[5, 120, 199]])
+    assert texts == ["chunk 5", "chunk 120", "chunk 199"]
+
+
+def test_append_during_compaction_stays_a_segment(paths, vectors, monkeypatch):
+    build(paths, vectors)
+    append_segment(*paths, vectors[100:150], records(100, 150))
+
+    # Append while the compaction is writing its merged base, i.e. outside the write lock
+    write_index_file = index_store._write_index_file
+
+    def append_then_write(path, index):
+        append_segment(*paths, vectors[150:200], records(150, 200))
+        write_index_file(path, index)
+
+    monkeypatch.setattr(index_store, "_write_index_file", append_then_write)
+    compact_in_background(*paths).join()
+
+    manifest = read_manifest(*paths)
+    assert manifest["base"]["rows"] == 150
+    assert [segment["rows"] for segment in manifest["segments"]] == [50]
+    index, store, _ = load_segmented(*paths)
+    assert index.ntotal == store.count() == 200
+    texts, distances = nearest(paths, vectors[[5, 120, 199]])
+    assert texts == ["chunk 5", "chunk 120", "chunk 199"]
+    assert np.allclose(distances, 0.0)
+
+
+def test_rebuild_during_compaction_discards_the_merge(paths, vectors, monkeypatch):
+    build(paths, vectors)
+    append_segment(*paths, vectors[100:150], records(100, 150))
+
+    write_index_file = index_store._write_index_file
+
+    def rebuild_then_write(path, index):
+        monkeypatch.setattr(index_store, "_write_index_file", write_index_file)
+        build(paths, vectors, rows=60)
+        write_index_file(path, index)
+
+    monkeypatch.setattr(index_store, "_write_index_file", rebuild_then_write)
+    assert not compact(*paths)
+
+    manifest = read_manifest(*paths)
+    assert manifest["base"]["rows"] == 60 and manifest["segments"] == []
+    directory = os.path.dirname(paths[0])
+    assert sorted(name for name in os.listdir(directory) if ".base-" in name) == sorted(
+        [manifest["base"]["index"], manifest["base"]["metadata"]])
+
+
+def test_crash_before_the_manifest_write_leaves_the_index_as_it_was(paths, vectors, monkeypatch):
+    build(paths, vectors)
+
+    def crash(index_path, manifest):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(index_store, "_write_manifest", crash)
+        with pytest.raises(OSError):
+            append_segment(*paths, vectors[100:150], records(100, 150))
+
+    # The metadata rows were inserted, the vectors were never committed
+    index, store, manifest = load_segmented(*paths)
+    assert (index.ntotal, store.count()) == (100, 150)
+    assert manifest["segments"] == []
+    texts, _ = nearest(paths, vectors[[5, 120]])
+    assert texts[0] == "chunk 5" and texts[1] != "chunk 120"
+
+    # The next append replaces the leftover rows
+    replacement = [{"text": f"replacement {i}"} for i in range(20)]
+    append_segment(*paths, vectors[180:200], replacement)
+    index, store, _ = load_segmented(*paths)
+    assert index.ntotal == store.count() == 120
+    assert [row["text"] for row in store.fetch(range(100, 120)).values()] == [r["text"] for r in replacement]
+    assert nearest(paths, vectors[[185]])[0] == ["replacement 5"]
+    assert store.lexical_search("120", 5) == []  # The BM25 index forgot them too
+
+
+def test_rebuild_replaces_the_first_base_files(paths, vectors):
+    build(paths, vectors)
+    append_segment(*paths, vectors[100:150], records(100, 150))
+    directory = os.path.dirname(paths[0])
+    assert {"faiss_index.index", "faiss_index.db"} <= set(os.listdir(directory))
+
+    build(paths, vectors, rows=80)
+
+    manifest = read_manifest(*paths)
+    assert manifest["base"]["index"].startswith("faiss_index.index.base-")
+    assert manifest["base"]["metadata"].startswith("faiss_index.db.base-")
+    assert (manifest["base"]["rows"], manifest["segments"]) == (80, [])
+    files = set(os.listdir(directory))
+    # The first build's files and the segment are gone
+    assert not files & {"faiss_index.index", "faiss_index.db"}
+    assert not any(name.endswith(".npy") for name in files)
+
+    index, store, _ = load_segmented(*paths)
+    assert index.ntotal == store.count() == 80
+    assert nearest(paths, vectors[[79]])[0] == ["chunk 79"]
+
+    # A second rebuild removes the first rebuild's files
+    build(paths, vectors, rows=90)
+    assert not files & set(os.listdir(directory)) - {"faiss_index.index.json"}
+
+
+def test_mismatched_files_are_detected(paths, vectors):
+    build(paths, vectors)
+    faiss.write_index(faiss.IndexFlatL2(DIMENSION), paths[0])
+
+    with pytest.raises(RuntimeError):
+        load_segmented(*paths)
+
+
+def code_size(index):
+    """Bytes stored per vector (HNSW keeps its vectors in a separate storage index)."""
+    if isinstance(index, faiss.IndexHNSW):
+        index = faiss.downcast_index(index.storage)
+    ivf = faiss.try_extract_index_ivf(index)
+    return ivf.code_size if ivf is not None else index.sa_code_size()
+
+
+@pytest.mark.parametrize("index_type, params", [("flat", {}), ("hnsw", {}), ("ivf_flat", {"nlist": 8, "nprobe": 4})])
+@pytest.mark.parametrize("codec, ratio", [("float16", 2), ("int8", 4)])
+def test_compressed_codecs_round_trip(paths, index_type, params, codec, ratio):
+    rng = np.random.default_rng(1)
+    centers = rng.standard_normal((8, DIMENSION)).astype("float32")
+    vectors = (centers[rng.integers(0, 8, 2000)] + 0.3 * rng.standard_normal((2000, DIMENSION))).astype("float32")
+
+    config = make_index_config(index_type, DIMENSION, codec, **params)
+    index = build_index(config, vectors)
+    assert index.is_trained
+    index.add(vectors)
+    write_base(*paths, index, records(0, len(vectors)), config)
+
+    loaded, store, manifest = load_segmented(*paths)
+    assert manifest["codec"] == codec
+    assert loaded.ntotal == store.count() == len(vectors)
+    assert code_size(loaded.base) == DIMENSION * 4 // ratio
+
+    # Decoded vectors stay close to the originals
+    stored = loaded.reconstruct(range(0, len(vectors), 100))
+    assert np.abs(stored - vectors[::100]).max() < (0.01 if codec == "float16" else 0.1)
+
+    # Recall against an exact search
+    queries = vectors[::40] + 0.05 * rng.standard_normal((50, DIMENSION)).astype("float32")
+    _, found = loaded.search(queries, 10)
+    distances = ((queries[:, None, :] - vectors[None, :, :]) ** 2).sum(axis=2)
+    exact = np.argsort(distances, axis=1)[:, :10]
+    recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(found, exact)])
+    assert recall >= 0.9
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from ingestion_throughput import write_fixture_pdf
+
+from fomc_dashboard.modules import pdf_extraction
+from fomc_dashboard.modules.index_factory import load_index_config
+from fomc_dashboard.modules.index_store import load_segmented
+from fomc_dashboard.modules.ingestion import _batches, ingest_pdfs
+from fomc_dashboard.modules.pdf_extraction import PdfExtractor
+
+N_PAGES = 40
+
+
+@pytest.fixture(autouse=True)
+def extractor(monkeypatch):
+    # No worker processes and no page cache in the working directory
+    with PdfExtractor(1, None) as extractor:
+        monkeypatch.setattr(pdf_extraction, "_extractor", extractor)
+        yield extractor
+
+
+@pytest.fixture
+def pdf_paths(tmp_path):
+    paths = [str(tmp_path / f"fomcminutes2023{month:02d}01.pdf") for month in (1, 3)]
+    for seed, path in enumerate(paths):
+        write_fixture_pdf(path, N_PAGES, seed=seed)
+    return paths
+
+
+def ingest(paths, tmp_path, **options):
+    index_file = str(tmp_path / "faiss_index")
+    stats = ingest_pdfs(paths, f"{index_file}.db", index_file, max_tokens=50, overlap=10,
+                        embedding_cache=None, **options)
+    return stats, index_file
+
+
+def test_batches():
+    assert list(_batches(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(_batches(range(7), 3, first_size=5)) == [[0, 1, 2, 3, 4], [5, 6]]
+    assert list(_batches([], 3)) == []
+
+
+def test_ivf_index_is_trained_on_the_whole_corpus(embedding_model, pdf_paths, tmp_path):
+    stats, index_file = ingest(pdf_paths, tmp_path, batch_size=64, index_type="ivf_flat", nlist=16, nprobe=4)
+
+    assert stats["chunks"] > 39 * 16  # Enough for every list, though each batch alone would train one
+    assert load_index_config(f"{index_file}.index")["nlist"] == 16
+    index, store, manifest = load_segmented(f"{index_file}.index", f"{index_file}.db")
+    assert index.ntotal == store.count() == stats["chunks"]
+    assert manifest["segments"] == []
+
+    # Recall against an exact search over the same chunks
+    rows = store.fetch(range(index.ntotal))
+    vectors = embedding_model.encode([rows[i]["text"] for i in range(index.ntotal)])
+    queries = vectors[::25] + 0.1
+    _, found = index.search(queries, 10)
+    distances = ((queries[:, None, :] - vectors[None, :, :]) ** 2).sum(axis=2)
+    exact = np.argsort(distances, axis=1)[:, :10]
+    recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(found, exact)])
+    assert recall >= 0.9
+
+
+def test_later_batches_are_appended_not_rebuilt(embedding_model, pdf_paths, tmp_path):
+    first, index_file = ingest(pdf_paths[:1], tmp_path, batch_size=64, rebuild=True)
+    second, _ = ingest(pdf_paths[1:], tmp_path, batch_size=64, rebuild=False)
+
+    index, store, _ = load_segmented(f"{index_file}.index", f"{index_file}.db")
+    assert index.ntotal == store.count() == first["chunks"] + second["chunks"]
+
+    # rebuild=True replaces the index once, with every chunk of this run
+    third, _ = ingest(pdf_paths, tmp_path, batch_size=64, rebuild=True)
+    index, store, _ = load_segmented(f"{index_file}.index", f"{index_file}.db")
+    assert index.ntotal == store.count() == third["chunks"] == first["chunks"] + second["chunks"]
@@ -0,0 +1,88 @@
+import pytest
+from summary_batch import CHUNKS_PER_DOCUMENT, DOC_TYPES, synthetic_records, write_index
+
+from fomc_dashboard.modules.ai_responder import AzureOpenAIHelper
+from fomc_dashboard.modules.meeting_summaries import SummaryStore, summarize_meetings
+
+N_MEETINGS = 6
+
+
+@pytest.fixture
+def index_file(tmp_path, token_encoding):
+    path = str(tmp_path / "faiss_index")
+    write_index(path, synthetic_records(N_MEETINGS))
+    return path
+
+
+def summarize(helper, index_file, tmp_path, **options):
+    return summarize_meetings(helper, index_file, f"{index_file}.db", str(tmp_path / "summaries.db"), **options)
+
+
+def test_unchanged_meetings_make_no_requests(openai_server, index_file, tmp_path):
+    server = openai_server()
+    helper = AzureOpenAIHelper("test-summaries-rerun", endpoint=server.url)
+
+    first = summarize(helper, index_file, tmp_path)
+    assert (first["meetings"], first["generated"], first["failed"]) == (N_MEETINGS, N_MEETINGS, 0)
+    assert server.stats["requests"] == N_MEETINGS
+
+    second = summarize(helper, index_file, tmp_path)
+    assert (second["generated"], second["unchanged"]) == (0, N_MEETINGS)
+    assert server.stats["requests"] == N_MEETINGS
+
+
+def test_only_meetings_whose_documents_changed_are_regenerated(openai_server, index_file, tmp_path):
+    server = openai_server()
+    helper = AzureOpenAIHelper("test-summaries-changed", endpoint=server.url)
+    summarize(helper, index_file, tmp_path)
+    with SummaryStore(str(tmp_path / "summaries.db")) as store:
+        before = {meeting_date: store.get(meeting_date)["created"] for meeting_date in store.meetings()}
+
+    write_index(index_file, synthetic_records(N_MEETINGS, changed=2))
+    stats = summarize(helper, index_file, tmp_path)
+
+    assert (stats["generated"], stats["unchanged"]) == (1, N_MEETINGS - 1)
+    assert server.stats["requests"] == N_MEETINGS + 1
+    with SummaryStore(str(tmp_path / "summaries.db")) as store:
+        after = {meeting_date: store.get(meeting_date)["created"] for meeting_date in store.meetings()}
+    regenerated = [meeting_date for meeting_date in before if after[meeting_date] != before[meeting_date]]
+    assert regenerated == [synthetic_records(N_MEETINGS)[2 * len(DOC_TYPES) * CHUNKS_PER_DOCUMENT]["meeting_date"]]
+
+
+def test_force_regenerates_every_meeting(openai_server, index_file, tmp_path):
+    server = openai_server()
+    helper = AzureOpenAIHelper("test-summaries-force", endpoint=server.url)
+    summarize(helper, index_file, tmp_path)
+
+    stats = summarize(helper, index_file, tmp_path, force=True)
+
+    assert stats["generated"] == N_MEETINGS
+    assert server.stats["requests"] == 2 * N_MEETINGS
+
+
+def test_parallel_requests_are_bounded_by_max_workers(openai_server, index_file, tmp_path):
+    server = openai_server(latency=0.2)
+    helper = AzureOpenAIHelper("test-summaries-workers", endpoint=server.url, max_concurrency=16)
+
+    stats = summarize(helper, index_file, tmp_path, max_workers=3)
+
+    assert stats["generated"] == N_MEETINGS
+    assert server.stats["max_in_flight"] == 3
+
+
+def test_summary_store(tmp_path):
+    path = str(tmp_path / "summaries.db")
+    with pytest.raises(FileNotFoundError):
+        SummaryStore(path, readonly=True)
+
+    with SummaryStore(path) as store:
+        store.put("2023-07-26", "a", "Raised rates.", ["statement", "minutes"], "gpt-4o-mini")
+        store.put("2023-12-13", "b", "Held rates.", ["statement"], "gpt-4o-mini")
+        store.put("2023-12-13", "c", "Held rates again.", ["statement"], "gpt-4o-mini")
+
+    with SummaryStore(path, readonly=True) as store:
+        assert store.meetings() == ["2023-12-13", "2023-07-26"]
+        assert store.source_hashes() == {"2023-07-26": "a", "2023-12-13": "c"}
+        summary = store.get("2023-07-26")
+        assert (summary["summary"], summary["doc_types"]) == ("Raised rates.", ["statement", "minutes"])
+        assert store.get("2024-01-31") is None
@@ -0,0 +1,174 @@
+import json
+import pickle
+from datetime import date
+
+import faiss
+import numpy as np
+import pytest
+
+from fomc_dashboard.modules import metadata_store
+from fomc_dashboard.modules.index_factory import config_path, make_index_config
+from fomc_dashboard.modules.index_store import load_segmented, migrate_pickle_metadata
+from fomc_dashboard.modules.metadata_store import MetadataStore, build_store, normalize_filters, to_record, tokenize
+
+RECORDS = [
+    {"text": "The Committee raised the target range.", "meeting_date": "2023-07-26", "doc_type": "statement"},
+    {"text": "Participants discussed inflation.", "meeting_date": "2023-07-26", "doc_type": "minutes",
+     "section": "Economic outlook"},
+    {"text": "The Committee held the target range.", "meeting_date": "2023-12-13", "doc_type": "statement",
+     "source_url": "https://www.federalreserve.gov/monetarypolicy/files/monetary20231213a1.pdf"},
+    "A plain paragraph without metadata.",
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / "metadata.db")
+    build_store(path, RECORDS)
+    return MetadataStore(path)
+
+
+def test_to_record():
+    assert to_record("text") == {"text": "text", "meeting_date": None, "doc_type": None, "section": None,
+                                 "source_url": None}
+    with pytest.raises(ValueError):
+        to_record({"meeting_date": "2023-07-26"})
+
+
+def test_fetch(store):
+    assert store.count() == len(RECORDS)
+
+    rows = store.fetch([2, 0, 99])
+
+    assert sorted(rows) == [0, 2]
+    assert rows[2] == {"id": 2, **to_record(RECORDS[2])}
+    assert rows[0]["text"] == RECORDS[0]["text"]
+    assert store.fetch([]) == {}
+
+
+def test_select_ids(store):
+    def select(**filters):
+        return store.select_ids(normalize_filters(filters)).tolist()
+
+    assert select() == [0, 1, 2, 3]
+    assert select(doc_types="statement") == [0, 2]
+    assert select(doc_types=["minutes", "statement"]) == [0, 1, 2]
+    assert select(start_date="2023-08-01") == [2]
+    assert select(start_date="2023-07-26", end_date="2023-07-26") == [0, 1]
+    assert select(end_date="2023-12-31", doc_types=["minutes"]) == [1]
+    assert select(doc_types=["transcript"]) == []
+
+
+def test_normalize_filters():
+    assert normalize_filters({}) is None
+    assert normalize_filters({"start_date": None, "doc_types": []}) is None
+    assert normalize_filters({"doc_types": ["statement", "minutes"], "start_date": date(2023, 1, 1)}) == (
+        ("doc_types", ("minutes", "statement")), ("start_date", "2023-01-01"))
+    with pytest.raises(ValueError):
+        normalize_filters({"speaker": "Powell"})
+
+
+def test_meetings(store):
+    assert store.meetings() == {"2023-07-26": 2, "2023-12-13": 1}
+    assert [row["doc_type"] for row in store.meeting_chunks("2023-07-26")] == ["minutes", "statement"]
+
+
+def test_append_replaces_rows_from_its_start_id(store):
+    writable = MetadataStore(store.path, readonly=False)
+    writable.append(["new third", "new fourth", "fifth"], 2)
+    writable.close()
+
+    assert store.count() == 5
+    assert [row["text"] for row in store.fetch(range(5)).values()][2:] == ["new third", "new fourth", "fifth"]
+
+
+def test_lexical_search(store):
+    assert store.has_lexical_index()
+    assert store.lexical_search("Who raised the target range?", 5)[0] == 0
+    assert set(store.lexical_search("target range", 5)) == {0, 2}
+    assert store.lexical_search("target range", 5, normalize_filters({"start_date": "2023-08-01"})) == [2]
+    assert store.lexical_search("target range", 5, max_id=2) == [0]
+    assert store.lexical_search("quantitative tightening", 5) == []
+    assert store.lexical_search("?!", 5) == []
+    assert store.lexical_search('"OR" NEAR(* -', 5) == []  # Query syntax is matched as text
+
+
+def test_lexical_search_uses_the_rarest_terms_within_the_budget(tmp_path, monkeypatch):
+    path = str(tmp_path / "metadata.db")
+    build_store(path, [f"policy statement {i}" for i in range(50)] + ["policy statement on SOMA"])
+    store = MetadataStore(path)
+    monkeypatch.setattr(metadata_store, "LEXICAL_POSTINGS_BUDGET", 10)
+
+    # "policy" matches 51 chunks and is dropped; "soma" alone fits the budget
+    assert store.lexical_search("policy on SOMA", 5) == [50]
+    # Even the rarest term exceeds the budget: no lexical results at all
+    assert store.lexical_search("policy statement", 5) == []
+
+
+def test_tokenize():
+    assert tokenize("Raised by 25 basis-points; raised again.") == ["raised", "by", "25", "basis", "points", "again"]
+
+
+def test_missing_store():
+    with pytest.raises(FileNotFoundError):
+        MetadataStore("does-not-exist.db")
+
+
+def write_flat_index(path, rows):
+    index = faiss.IndexFlatL2(8)
+    index.add(np.random.default_rng(0).standard_normal((rows, 8)).astype("float32"))
+    faiss.write_index(index, path)
+
+
+def test_store_with_fewer_rows_than_the_index_is_rejected(tmp_path):
+    index_path, db_path = str(tmp_path / "faiss_index.index"), str(tmp_path / "metadata.db")
+    write_flat_index(index_path, len(RECORDS) + 1)
+    build_store(db_path, RECORDS)
+
+    with pytest.raises(RuntimeError):
+        load_segmented(index_path, db_path)
+
+    # Extra rows (from an append that never committed its vectors) are allowed
+    write_flat_index(index_path, len(RECORDS) - 1)
+    index, store, _ = load_segmented(index_path, db_path)
+    assert (index.ntotal, store.count()) == (len(RECORDS) - 1, len(RECORDS))
+
+
+def test_pickle_migration_keeps_every_row(tmp_path):
+    index_path, pickle_path = str(tmp_path / "faiss_index.index"), str(tmp_path / "metadata.pkl")
+    write_flat_index(index_path, len(RECORDS) - 1)
+    with open(pickle_path, "wb") as f:
+        pickle.dump(RECORDS[:3], f)
+    # One delta segment from before the metadata store, with its own pickle
+    np.save(str(tmp_path / "segment.npy"), np.zeros((1, 8), dtype="float32"))
+    with open(tmp_path / "segment.pkl", "wb") as f:
+        pickle.dump(RECORDS[3:], f)
+    manifest = {**make_index_config("flat", 8),
+                "base": {"index": "faiss_index.index", "metadata": "metadata.pkl", "rows": len(RECORDS) - 1},
+                "segments": [{"vectors": "segment.npy", "rows": 1, "metadata": "segment.pkl"}]}
+    with open(config_path(index_path), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(RuntimeError, match="migrate"):
+        load_segmented(index_path, pickle_path)
+
+    db_path = migrate_pickle_metadata(index_path, pickle_path)
+
+    assert db_path == str(tmp_path / "metadata.db")
+    index, store, manifest = load_segmented(index_path, pickle_path)
+    assert index.ntotal == store.count() == len(RECORDS)
+    assert manifest["base"]["metadata"] == "metadata.db"
+    assert "metadata" not in manifest["segments"][0]
+    assert list(store.fetch(range(len(RECORDS))).values()) == [
+        {"id": i, **to_record(record)} for i, record in enumerate(RECORDS)]
+
+
+def test_pickle_migration_checks_the_row_count(tmp_path):
+    index_path, pickle_path = str(tmp_path / "faiss_index.index"), str(tmp_path / "metadata.pkl")
+    write_flat_index(index_path, len(RECORDS) + 2)
+    with open(pickle_path, "wb") as f:
+        pickle.dump(RECORDS, f)
+
+    with pytest.raises(RuntimeError):
+        migrate_pickle_metadata(index_path, pickle_path)
+    assert not (tmp_path / "metadata.db").exists()
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+from fake_openai_server import FakeOpenAIServer
+
+from fomc_dashboard.modules import metrics
+from fomc_dashboard.modules.ai_responder import LLM_TOKENS, AzureOpenAIHelper
+from fomc_dashboard.modules.context_packer import count_tokens
+from fomc_dashboard.modules.metrics import Counter, Histogram, Registry
+
+INSTRUCTION = "You are an assistant providing insights on FOMC meetings."
+QUESTION = "What did the Committee decide about the federal funds rate?"
+
+
+def test_counter():
+    counter = Counter("requests_total", "Requests", ("model",))
+    counter.inc(model="a")
+    counter.inc(3, model="a")
+    counter.inc(model="b")
+
+    assert (counter.value(model="a"), counter.value(model="b"), counter.value(model="c")) == (4, 1, 0)
+    with pytest.raises(ValueError):
+        counter.inc(kind="a")
+
+
+def test_histogram():
+    histogram = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    with histogram.time():
+        pass
+
+    assert histogram.summary()["count"] == 5
+    assert histogram.summary()["sum"] == pytest.approx(2.65, abs=0.01)
+    buckets = {labels["le"]: value for name, labels, value in histogram.samples() if name.endswith("_bucket")}
+    assert buckets == {"0.1": 3, "1.0": 4, "+Inf": 5}  # Cumulative; a value on a bound falls in its bucket
+
+
+def test_registry_returns_existing_metrics():
+    registry = Registry()
+    counter = registry.get_or_create(Counter, "hits_total", "Hits", ("cache",))
+
+    assert registry.get_or_create(Counter, "hits_total", "Hits", ("cache",)) is counter
+    with pytest.raises(ValueError):
+        registry.get_or_create(Histogram, "hits_total", "Hits", ("cache",))
+    with pytest.raises(ValueError):
+        registry.get_or_create(Counter, "hits_total", "Hits", ("model",))
+
+
+def test_render_and_collectors():
+    registry = Registry()
+    registry.get_or_create(Counter, "hits_total", "Cache hits", ("cache",)).inc(2, cache='query "results"')
+    registry.register_collector("entries", "Cache entries", "gauge", lambda: [({"cache": "embeddings"}, 7)])
+
+    def broken():
+        raise RuntimeError("store closed")
+
+    registry.register_collector("broken", "Fails when collected", "gauge", broken)
+
+    text = registry.render()
+
+    assert "# TYPE hits_total counter" in text
+    assert 'hits_total{cache="query \\"results\\""} 2' in text
+    assert '# TYPE entries gauge\nentries{cache="embeddings"} 7' in text
+    assert "# HELP broken Fails when collected" in text  # A failing collector does not break the others
+    assert registry.snapshot() == {"hits_total": [{"labels": {"cache": 'query "results"'}, "value": 2}]}
+
+
+def test_log_event(tmp_path, monkeypatch):
+    path = tmp_path / "requests.jsonl"
+    metrics.log_event("chat_completion", model="gpt-4o-mini")  # METRICS_LOG unset: nothing is written
+
+    monkeypatch.setenv("METRICS_LOG", str(path))
+    metrics.log_event("chat_completion", model="gpt-4o-mini", seconds=0.25, error=None)
+    metrics.log_event("chat_completion", model="gpt-4o-mini", seconds=0.5)
+
+    events = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(events) == 2
+    assert {key: events[0][key] for key in ("event", "model", "seconds")} == {
+        "event": "chat_completion", "model": "gpt-4o-mini", "seconds": 0.25}
+    assert "error" not in events[0] and "ts" in events[0]
+
+
+def tokens(model):
+    return LLM_TOKENS.value(model=model, kind="prompt"), LLM_TOKENS.value(model=model, kind="completion")
+
+
+@pytest.mark.parametrize("stream_usage", [True, False])
+def test_streamed_completions_record_their_usage(openai_server, token_encoding, tmp_path, monkeypatch,
+                                                 stream_usage):
+    server = openai_server(FakeOpenAIServer, stream_usage=stream_usage)
+    helper = AzureOpenAIHelper(f"test-stream-usage-{stream_usage}", endpoint=server.url)
+    model = helper.DEFAULT_MODEL
+    monkeypatch.setenv("METRICS_LOG", str(tmp_path / "requests.jsonl"))
+    before = tokens(model)
+
+    reply = "".join(helper.stream_response(QUESTION, INSTRUCTION))
+
+    if stream_usage:
+        # The fake server counts words
+        expected = (len(INSTRUCTION.split()) + len(QUESTION.split()), len(reply.split()))
+    else:
+        # Counted locally when the service sends no usage chunk
+        expected = (count_tokens(INSTRUCTION) + count_tokens(QUESTION), count_tokens(reply))
+    after = tokens(model)
+    assert (after[0] - before[0], after[1] - before[1]) == expected
+    (event,) = [json.loads(line) for line in (tmp_path / "requests.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert (event["stream"], event["prompt_tokens"], event["completion_tokens"]) == (True, *expected)
@@ -0,0 +1,61 @@
+import io
+
+import pytest
+from pdf_extraction import concatenate_pages, synthetic_pdf
+
+from fomc_dashboard.modules.ingestion import iter_pdf_pages
+from fomc_dashboard.modules.pdf_extraction import PageCache, PdfExtractor, file_hash
+
+N_PAGES = 30
+
+
+@pytest.fixture(scope="module")
+def pdf():
+    return synthetic_pdf(N_PAGES, 60)
+
+
+@pytest.fixture
+def pdf_path(pdf, tmp_path):
+    path = tmp_path / "fomcminutes20231213.pdf"
+    path.write_bytes(pdf)
+    return str(path)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_extract_text_matches_the_page_loop(pdf, pdf_path, tmp_path, workers):
+    expected = concatenate_pages(pdf)
+    with PdfExtractor(workers, str(tmp_path / "pages.db"), pages_per_task=4) as extractor:
+        assert extractor.extract_text(pdf_path) == expected
+        assert extractor.extract_text(io.BytesIO(pdf)) == expected  # Cached by content, whatever the source
+        assert extractor.extract_pages(pdf) == [text for _, text in iter_pdf_pages(pdf_path, extractor)]
+
+
+def test_extract_text_without_cache(pdf):
+    with PdfExtractor(1, None) as extractor:
+        assert extractor.extract_text(pdf) == concatenate_pages(pdf)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pages_are_extracted_as_they_are_consumed(pdf, pdf_path, tmp_path, workers):
+    with PdfExtractor(workers, str(tmp_path / "pages.db"), pages_per_task=4) as extractor:
+        pages = iter_pdf_pages(pdf_path, extractor)
+        assert next(pages)[0] == 1
+        assert extractor.cache.numbers(file_hash(pdf)) == {1, 2, 3, 4}
+        pages.close()
+
+        assert [number for number, _ in iter_pdf_pages(pdf_path, extractor)] == list(range(1, N_PAGES + 1))
+        assert extractor.cache.numbers(file_hash(pdf)) == set(range(1, N_PAGES + 1))
+
+
+def test_page_cache(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.db"))
+    assert cache.page_count("abc") is None
+
+    cache.put("abc", 5, [(1, "one"), (2, "two"), (4, "four")])
+
+    assert cache.page_count("abc") == 5
+    assert cache.numbers("abc") == {1, 2, 4}
+    assert cache.get("abc") == {1: "one", 2: "two", 4: "four"}
+    assert cache.get("abc", 2, 3) == {2: "two"}
+    assert cache.get("abc", 2) == {2: "two", 4: "four"}
+    cache.close()
@@ -0,0 +1,117 @@
+import pandas as pd
+import pytest
+from rate_history import FakeWikiServer, synthetic_rate_page
+
+from fomc_dashboard.modules import rate_history
+from fomc_dashboard.modules.rate_history import (COLUMNS, load_rate_history, parse_rate_actions, parse_rate_history,
+                                                 read_action_tables, refresh_rate_history)
+
+
+def page(rows, headers=("Date", "Fed Funds Rate", "Votes")):
+    cells = "".join(f"<tr>{''.join(f'<td>{cell}</td>' for cell in row)}</tr>" for row in rows)
+    header = "".join(f"<th>{name}</th>" for name in headers)
+    return f"<html><body><table class=\"wikitable\"><tr>{header}</tr>{cells}</table></body></html>"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("September 18, 2024", "2024-09-18"),
+    ("Sept. 18, 2024", "2024-09-18"),
+    ("Sept 18, 2024", "2024-09-18"),
+    ("Sep. 18, 2024", "2024-09-18"),
+    ("Dec. 16, 2008", "2008-12-16"),
+    ("Dec 16, 2008", "2008-12-16"),
+    ("January 31, 2024<sup class=\"reference\">[12]</sup>", "2024-01-31"),
+    (" May 3, 2023 ", "2023-05-03"),
+])
+def test_dates(text, expected):
+    (table,) = read_action_tables(page([(text, "5.25%", "12-0")]))
+
+    parsed = parse_rate_actions(table)
+
+    assert list(parsed["date"]) == [pd.Timestamp(expected)]
+
+
+def test_rows_without_a_valid_date_are_dropped():
+    (table,) = read_action_tables(page([("TBD", "5.25%", "12-0"), ("July 26, 2023", "5.25%–5.50%", "11-0")]))
+
+    assert list(parse_rate_actions(table)["date"]) == [pd.Timestamp("2023-07-26")]
+
+
+@pytest.mark.parametrize("text, lower, upper", [
+    ("5.25%", 5.25, 5.25),
+    ("5.25%–5.50%", 5.25, 5.50),
+    ("5.25–5.50%", 5.25, 5.50),
+    ("4.75% – 5.00%", 4.75, 5.00),
+    ("0 to 0.25%", 0.0, 0.25),
+    ("5.25%[a]", 5.25, 5.25),
+])
+def test_rates(text, lower, upper):
+    (table,) = read_action_tables(page([("July 26, 2023", text, "12-0")]))
+
+    parsed = parse_rate_actions(table)
+
+    assert (parsed["lower"].iloc[0], parsed["upper"].iloc[0]) == (lower, upper)
+    assert parsed["lower"].dtype == parsed["upper"].dtype == "float64"
+
+
+@pytest.mark.parametrize("text, expected", [("12-0", "12-0"), ("11–1", "11-1"), ("10:2", "10-2"), ("n/a", None)])
+def test_votes(text, expected):
+    (table,) = read_action_tables(page([("July 26, 2023", "5.25%", text)]))
+
+    vote = parse_rate_actions(table)["vote"].iloc[0]
+
+    assert (None if pd.isna(vote) else vote) == expected
+
+
+def test_table_without_votes():
+    (table,) = read_action_tables(page([("July 26, 2023", "5.25%")], headers=("Date", "Fed Funds Rate")))
+
+    assert parse_rate_actions(table)["vote"].isna().all()
+
+
+def test_parse_rate_history():
+    history = parse_rate_history(page([
+        ("December 13, 2023", "5.25%–5.50%", "12-0"),
+        ("July 26, 2023", "5.25%–5.50%", "11-0"),
+        ("May 3, 2023", "5.00%–5.25%", "11-0"),
+        ("May 3, 2023", "5.00%–5.25%", "11-0"),
+    ]))
+
+    assert tuple(history.columns) == COLUMNS
+    assert list(history["date"]) == [pd.Timestamp(d) for d in ("2023-05-03", "2023-07-26", "2023-12-13")]
+    assert list(history["change_bp"].fillna(-1)) == [-1, 25, 0]
+
+
+def test_page_without_action_tables():
+    assert read_action_tables("<html><body><p>No tables</p></body></html>") == []
+    with pytest.raises(ValueError):
+        parse_rate_history(page([("Name", "Years")], headers=("Chair", "Term")))
+
+
+def test_synthetic_page_keeps_every_decision():
+    history = parse_rate_history(synthetic_rate_page(200))
+
+    assert len(history) == 200
+    assert history["date"].is_monotonic_increasing
+    assert history["upper"].notna().all()
+
+
+def test_refresh_and_load(tmp_path):
+    server = FakeWikiServer(synthetic_rate_page(50))
+    path = str(tmp_path / "rate_history.parquet")
+    try:
+        assert refresh_rate_history(path, server.url) == 50
+    finally:
+        server.stop()
+
+    history = load_rate_history(path)
+    assert tuple(history.columns) == COLUMNS
+    assert load_rate_history(path) is history  # Cached until RATE_HISTORY_TTL expires
+
+    rate_history._histories.clear()
+    history.drop(columns=["vote"]).to_parquet(path, index=False)
+    with pytest.raises(ValueError):
+        load_rate_history(path)
+    rate_history._histories.clear()
+    with pytest.raises(FileNotFoundError):
+        load_rate_history(str(tmp_path / "missing.parquet"))
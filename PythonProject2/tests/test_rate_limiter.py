@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from fomc_dashboard.modules.rate_limiter import RateLimiter, TokenBucket, backoff_delay
+
+
+def test_backoff_honors_long_retry_after():
+    # The cap only bounds the exponential backoff; a longer Retry-After is waited out in full
+    assert 45.0 <= backoff_delay(0, retry_after=45.0) <= 45.5
+    assert 0.0 <= backoff_delay(0, retry_after=0.0) <= 0.5
+
+
+@pytest.mark.parametrize("attempt, bound", [(0, 0.5), (3, 4.0), (20, 30.0)])
+def test_backoff_without_retry_after_is_capped(attempt, bound):
+    delays = [backoff_delay(attempt) for _ in range(200)]
+
+    assert all(0.0 <= delay <= bound for delay in delays)
+
+
+def test_token_bucket_reservations_wait_their_turn():
+    bucket = TokenBucket(rate=10.0, capacity=2.0)
+
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)  # In debt: wait for one token to refill
+    assert bucket.wait_time(1) == pytest.approx(0.2, abs=0.01)
+
+
+def test_settle_returns_unused_tokens():
+    limiter = RateLimiter(tokens_per_minute=600, window=10.0)  # 100 tokens at once, 10 per second
+    assert limiter.reserve(100) == 0.0
+    assert limiter.tokens.wait_time(50) > 0
+
+    limiter.settle(100, 40)
+
+    assert limiter.tokens.wait_time(50) == 0.0
+    limiter.settle(100, None)  # Unknown usage keeps the estimate
+    assert limiter.tokens.wait_time(50) == 0.0
+
+
+def test_try_acquire_does_not_queue():
+    limiter = RateLimiter(requests_per_minute=60, window=1.0)  # One request at once
+
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    start = time.perf_counter()
+    limiter.acquire()
+    assert time.perf_counter() - start >= 0.9
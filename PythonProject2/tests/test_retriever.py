@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from fomc_dashboard.modules.index_factory import build_index, make_index_config
+from fomc_dashboard.modules.index_store import append_segment, write_base
+from fomc_dashboard.modules.retriever import FaissRetriever, reciprocal_rank_fusion
+
+DIMENSION = 16
+DOC_TYPES = ("statement", "minutes", "transcript")
+MEETINGS = ("2022-12-14", "2023-03-22", "2023-07-26", "2023-12-13")
+
+
+def records(start, stop):
+    return [{"text": f"chunk {i}", "meeting_date": MEETINGS[i % len(MEETINGS)],
+             "doc_type": DOC_TYPES[i % len(DOC_TYPES)]} for i in range(start, stop)]
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).standard_normal((300, DIMENSION)).astype("float32")
+
+
+def write_index(tmp_path, vectors, rows, index_type="flat"):
+    index_path, metadata_path = str(tmp_path / "faiss_index.index"), str(tmp_path / "faiss_index.db")
+    config = make_index_config(index_type, DIMENSION)
+    index = build_index(config, training_vectors=vectors[:200])
+    index.add(vectors[:200])
+    write_base(index_path, metadata_path, index, rows[:200], config)
+    append_segment(index_path, metadata_path, vectors[200:250], rows[200:250])
+    return index_path, metadata_path
+
+
+@pytest.fixture
+def paths(tmp_path, vectors):
+    return write_index(tmp_path, vectors, records(0, 250))
+
+
+@pytest.mark.parametrize("filters, matches", [
+    ({"doc_types": ["minutes"]}, lambda row: row["doc_type"] == "minutes"),
+    ({"doc_types": ["statement", "transcript"]}, lambda row: row["doc_type"] != "minutes"),
+    ({"start_date": "2023-01-01", "end_date": "2023-07-26"},
+     lambda row: "2023-01-01" <= row["meeting_date"] <= "2023-07-26"),
+    ({"start_date": "2023-07-26", "doc_types": "minutes"},
+     lambda row: row["meeting_date"] >= "2023-07-26" and row["doc_type"] == "minutes"),
+])
+def test_filtered_search_returns_only_matching_rows(paths, vectors, filters, matches):
+    retriever = FaissRetriever(*paths)
+    expected = [i for i, row in enumerate(records(0, 250)) if matches(row)]
+
+    results = retriever.search_batch(vectors[:250], top_k=10, filters=filters)
+
+    for i, hits in enumerate(results):
+        assert len(hits) == 10  # Every slot goes to a matching chunk
+        assert all(matches(hit) for hit in hits)
+        if i in expected:
+            assert hits[0]["id"] == i and hits[0]["distance"] == pytest.approx(0.0, abs=1e-4)
+    # Rows of the delta segment are found like base rows
+    assert any(hit["id"] >= 200 for hits in results for hit in hits)
+
+
+def test_filter_without_matches(paths, vectors):
+    retriever = FaissRetriever(*paths)
+
+    assert retriever.search(vectors[:2], filters={"start_date": "2024-01-01"}) == [[], []]
+    with pytest.raises(ValueError):
+        retriever.search(vectors[:1], filters={"speaker": "Powell"})
+
+
+def test_selections_are_rebuilt_when_the_snapshot_changes(paths, vectors):
+    retriever = FaissRetriever(*paths, check_interval=0.0)
+    filters = {"doc_types": ["minutes"]}
+    query = vectors[[280]]  # Not in the index yet; minutes row 280 % 3 == 1
+    before = retriever.search(query, top_k=1, filters=filters)[0]
+    assert before[0]["id"] != 280
+    version = retriever.version
+
+    append_segment(*paths, vectors[250:300], records(250, 300))
+    assert retriever.refresh() == version + 1
+
+    after = retriever.search(query, top_k=1, filters=filters)[0]
+    assert after[0]["id"] == 280
+    signatures = {signature for signature, _ in retriever._selections._entries}
+    assert retriever._snapshot[0] in signatures
+
+
+def test_reciprocal_rank_fusion():
+    scores = reciprocal_rank_fusion([[1, 2, 3], [3, 4]], k=60)
+
+    assert scores == pytest.approx({1: 1 / 61, 2: 1 / 62, 3: 1 / 63 + 1 / 61, 4: 1 / 62})
+    assert sorted(scores, key=scores.get, reverse=True)[:2] == [3, 1]  # Found by both rankers first
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat"])
+def test_hybrid_search_finds_exact_terms(tmp_path, vectors, index_type):
+    rows = records(0, 250)
+    # Far from the query vector, but the only chunks naming the facility
+    rows[150]["text"] = "SOMA holdings of Treasury securities declined."
+    rows[230]["text"] = "The SOMA portfolio runoff continued."
+    retriever = FaissRetriever(*write_index(tmp_path, vectors, rows, index_type))
+
+    (hits,) = retriever.search(vectors[[7]], top_k=5, queries=["What happened to SOMA?"])
+
+    ids = [hit["id"] for hit in hits]
+    assert {150, 230} <= set(ids)
+    assert ids[0] == 7  # Top of the vector ranking and not in the BM25 one
+    scores = [hit["score"] for hit in hits]
+    assert scores == sorted(scores, reverse=True)
+    for hit in hits:
+        # Lexical-only hits get the distance of their stored vector, like vector hits
+        assert isinstance(hit["distance"], float)
+        assert hit["distance"] == pytest.approx(float(((vectors[hit["id"]] - vectors[7]) ** 2).sum()), rel=1e-4)
+
+    (vector_hits,) = retriever.search(vectors[[7]], top_k=5)
+    assert not {150, 230} & {hit["id"] for hit in vector_hits}
+    assert all("score" not in hit for hit in vector_hits)
+
+
+def test_hybrid_search_applies_filters_to_lexical_hits(paths, vectors):
+    retriever = FaissRetriever(*paths)
+
+    (hits,) = retriever.search(vectors[[0]], top_k=10, filters={"doc_types": ["minutes"]}, queries=["section 4"])
+
+    assert all(hit["doc_type"] == "minutes" for hit in hits)
+    assert 4 in {hit["id"] for hit in hits}  # Row 4 is minutes and the only chunk with the term "4"